@@ -0,0 +1,62 @@
+# binary chunk builder for the glb exporter
+# data is kept as a list of chunks and only written out on save, so adding a buffer view never copies earlier data
+
+class GLBBuffer:
+  def __init__(self, alignment=4):
+    self.alignment = alignment
+    self.chunks = []
+    self.byteLength = 0
+
+  def __len__(self):
+    return self.byteLength
+
+  def add(self, data, alignment=None):
+    # pad so that the new data starts on an aligned offset, then return that offset
+    padding = -self.byteLength % (alignment or self.alignment)
+    if padding:
+      self.chunks.append(bytes(padding))
+      self.byteLength += padding
+    offset = self.byteLength
+    # the data is referenced, not copied, so it shouldn't be modified until the buffer has been written
+    view = memoryview(data).cast("B")
+    self.chunks.append(view)
+    self.byteLength += len(view)
+    return offset
+
+  def getPadding(self):
+    # glb chunks must be padded to 4 bytes
+    return bytes(-self.byteLength % 4)
+
+  def write(self, f):
+    f.writelines(self.chunks)
+    f.write(self.getPadding())
+
+class GLBSpoolBuffer(GLBBuffer):
+  # writes data out to a temporary file as soon as it's added instead of keeping it, so it can be released straight away
+  # used for streaming conversion of scenes that don't fit into memory
+  def __init__(self, alignment=4, directory=None):
+    # only imported here, as only streaming conversion needs it
+    import tempfile
+    GLBBuffer.__init__(self, alignment)
+    self.spool = tempfile.TemporaryFile(dir=directory)
+
+  def add(self, data, alignment=None):
+    padding = -self.byteLength % (alignment or self.alignment)
+    if padding:
+      self.spool.write(bytes(padding))
+      self.byteLength += padding
+    offset = self.byteLength
+    view = memoryview(data).cast("B")
+    self.spool.write(view)
+    self.byteLength += len(view)
+    return offset
+
+  def write(self, f):
+    self.spool.seek(0)
+    for block in iter(lambda: self.spool.read(1 << 20), b""):
+      f.write(block)
+    self.spool.seek(0, 2)
+    f.write(self.getPadding())
+
+  def close(self):
+    self.spool.close()
@@ -5,9 +5,22 @@ import numpy as np
 from struct import pack
 import json
 
+from GLB.GLBBuffer import GLBBuffer, GLBSpoolBuffer
+# hashlib and GLB.GLBMeshopt are only needed for deduplicated or compressed data, so they're imported where they're used
+
 class GLBExporter:
-  def __init__(self):
-    self.data = bytes()
+  def __init__(self, dedupe=True, compress=False, spool=False):
+    # with spool, binary data is written to a temporary file as it's added, rather than kept in memory until saved
+    self.data = GLBSpoolBuffer() if spool else GLBBuffer()
+    # compress vertex and index data with EXT_meshopt_compression
+    # compressed buffer views point into a fallback buffer with no data, which is only there to give them offsets
+    self.compress = compress
+    self.fallbackLength = 0
+    # identical data, buffer views, accessors, images and samplers are only stored once
+    # these map a content key to the offset or index of the first copy
+    self.dedupe = dedupe
+    self.dataKeys = {}
+    self.itemKeys = {}
     self.asset = {"version": "2.0"}
     self.scene = 0
     self.scenes = [{
@@ -22,10 +35,17 @@ class GLBExporter:
     self.textures = []
     self.images = []
     self.samplers = []
+    self.animations = []
+    self.skins = []
+    self.extensionsUsed = []
+    self.extensionsRequired = []
 
   def addRootNodeIndex(self, index):
     self.scenes[0]["nodes"].append(index)
 
+  def setSceneExtras(self, extras):
+    self.scenes[0]["extras"] = extras
+
   def addNode(self, node):
     self.nodes.append(node)
 
@@ -36,31 +56,136 @@ class GLBExporter:
     self.materials.append(material)
 
   def addTexture(self, texture):
+    index = len(self.textures)
     self.textures.append(texture)
+    return index
+
+  def addAnimation(self, animation):
+    index = len(self.animations)
+    self.animations.append(animation)
+    return index
+
+  def addSkin(self, skin):
+    index = len(self.skins)
+    self.skins.append(skin)
+    return index
 
   def addImage(self, image):
-    self.images.append(image)
+    return self.addItem(self.images, "images", image)
 
   def addSampler(self, sampler):
-    self.samplers.append(sampler)
+    return self.addItem(self.samplers, "samplers", sampler)
   
+  def addExtension(self, name, required=False):
+    if name not in self.extensionsUsed:
+      self.extensionsUsed.append(name)
+    if required and name not in self.extensionsRequired:
+      self.extensionsRequired.append(name)
+
   def addData(self, data):
-    offset = len(self.data)
-    self.data += data
+    if not self.dedupe:
+      return self.data.add(data)
+    import hashlib
+    view = memoryview(data).cast("B")
+    key = (len(view), hashlib.blake2b(view, digest_size=16).digest())
+    offset = self.dataKeys.get(key)
+    if offset is None:
+      offset = self.data.add(view)
+      self.dataKeys[key] = offset
     return offset
   
-  def addBufferView(self, bufferView):
-    index = len(self.bufferViews)
-    self.bufferViews.append(bufferView)
+  def addBufferViewData(self, data, byteStride=None, target=None):
+    # adds data and a buffer view for it, compressing it if possible
+    # index data (target 34963) should be a typed array, so that the index size is known
+    if self.compress:
+      index = self.addCompressedBufferView(data, byteStride, target)
+      if index is not None:
+        return index
+    view = memoryview(data).cast("B")
+    bufferView = {
+      "buffer": 0,
+      "byteOffset": self.addData(view),
+    }
+    if byteStride is not None:
+      bufferView["byteStride"] = byteStride
+    bufferView["byteLength"] = len(view)
+    if target is not None:
+      bufferView["target"] = target
+    return self.addBufferView(bufferView)
+
+  def addCompressedBufferView(self, data, byteStride, target):
+    # returns None if the data can't be compressed
+    import hashlib
+    from GLB.GLBMeshopt import encodeVertexBuffer, encodeIndexSequence
+    view = memoryview(data)
+    if target == 34963:
+      if view.itemsize not in (2, 4):
+        return None
+      mode = "INDICES"
+      byteStride = view.itemsize
+    elif byteStride is None or byteStride % 4 or byteStride > 256 or view.nbytes % byteStride:
+      return None
+    else:
+      mode = "ATTRIBUTES"
+    view = view.cast("B")
+    byteLength = len(view)
+    count = byteLength // byteStride
+    # identical data would get a new fallback offset each time, so compressed views are deduplicated by their content here
+    key = ("compressed", mode, byteStride, target, byteLength, hashlib.blake2b(view, digest_size=16).digest())
+    if self.dedupe and key in self.itemKeys:
+      return self.itemKeys[key]
+    if mode == "INDICES":
+      encoded = encodeIndexSequence(np.frombuffer(view, dtype="<u2" if byteStride == 2 else "<u4"))
+    else:
+      encoded = encodeVertexBuffer(view, count, byteStride)
+    # compressed views are given space in the fallback buffer, without any data behind it
+    self.fallbackLength += -self.fallbackLength % 4
+    bufferView = {
+      "buffer": 1,
+      "byteOffset": self.fallbackLength,
+    }
+    if mode == "ATTRIBUTES":
+      bufferView["byteStride"] = byteStride
+    bufferView["byteLength"] = byteLength
+    if target is not None:
+      bufferView["target"] = target
+    bufferView["extensions"] = {
+      "EXT_meshopt_compression": {
+        "buffer": 0,
+        "byteOffset": self.addData(encoded),
+        "byteLength": len(encoded),
+        "byteStride": byteStride,
+        "mode": mode,
+        "count": count,
+      }
+    }
+    self.fallbackLength += byteLength
+    index = self.addBufferView(bufferView)
+    if self.dedupe:
+      self.itemKeys[key] = index
+    self.addExtension("EXT_meshopt_compression", required=True)
     return index
+
+  def addBufferView(self, bufferView):
+    return self.addItem(self.bufferViews, "bufferViews", bufferView)
   
   def addAccessor(self, accessor):
-    index = len(self.accessors)
-    self.accessors.append(accessor)
-    return index
+    return self.addItem(self.accessors, "accessors", accessor)
+
+  def addItem(self, items, kind, item):
+    # returns the index of an existing identical item if there is one
+    # items shouldn't be modified after being added, since they may be shared
+    if self.dedupe:
+      key = (kind, json.dumps(item, sort_keys=True))
+      index = self.itemKeys.get(key)
+      if index is not None:
+        return index
+      self.itemKeys[key] = len(items)
+    items.append(item)
+    return len(items) - 1
   
   def buildJSON(self):
-    return {
+    data = {
       "asset": self.asset,
       "scene": self.scene,
       "scenes": self.scenes,
@@ -74,22 +199,49 @@ class GLBExporter:
       "images": self.images,
       "samplers": self.samplers,
     }
+    if self.animations:
+      data["animations"] = self.animations
+    if self.skins:
+      data["skins"] = self.skins
+    if self.extensionsUsed:
+      data["extensionsUsed"] = self.extensionsUsed
+    if self.extensionsRequired:
+      data["extensionsRequired"] = self.extensionsRequired
+    return data
   
   def save(self, path):
+    # returns the number of bytes written
     with open(path, "wb") as f:
-      self.buffers.append({
-        "byteLength": len(self.data)
-      })
-      json_data = json.dumps(self.buildJSON())
-      # pad json data with spaces
-      json_data += " " * (4 - len(json_data) % 4)
-      # pad binary data with null bytes
-      self.data += bytes((4 - len(self.data) % 4))
-      # write fileheader
-      f.write(pack("<4sII", b'glTF', 2, len(json_data) + len(self.data) + 28))
-      # write json chunk
-      f.write(pack("<I4s", len(json_data), b'JSON'))
-      f.write(json_data.encode())
-      # write data chunk
-      f.write(pack("<I4s", len(self.data), b'BIN\x00'))
-      f.write(self.data)
\ No newline at end of file
+      self.write(f)
+      return f.tell()
+
+  def write(self, f):
+    buffer = {
+      "byteLength": len(self.data)
+    }
+    if self.buffers:
+      self.buffers[0] = buffer
+    else:
+      self.buffers.append(buffer)
+    if self.fallbackLength:
+      self.buffers[1:2] = [{
+        "byteLength": self.fallbackLength,
+        "extensions": {
+          "EXT_meshopt_compression": {
+            "fallback": True
+          }
+        }
+      }]
+    json_data = json.dumps(self.buildJSON()).encode()
+    # pad json data with spaces
+    json_data += b" " * (-len(json_data) % 4)
+    # binary data is padded with null bytes as it is written
+    data_length = len(self.data) + len(self.data.getPadding())
+    # write fileheader
+    f.write(pack("<4sII", b'glTF', 2, len(json_data) + data_length + 28))
+    # write json chunk
+    f.write(pack("<I4s", len(json_data), b'JSON'))
+    f.write(json_data)
+    # write data chunk, straight from the buffer's chunks
+    f.write(pack("<I4s", data_length, b'BIN\x00'))
+    self.data.write(f)
@@ -0,0 +1,184 @@
+# vertex and index buffer codecs for the EXT_meshopt_compression extension
+# https://github.com/KhronosGroup/glTF/tree/main/extensions/2.0/Vendor/EXT_meshopt_compression
+# these follow the bitstream written by meshoptimizer's meshopt_encodeVertexBuffer (version 0) and meshopt_encodeIndexSequence (version 1)
+
+import numpy as np
+
+MESHOPT_VERTEX_HEADER = 0xA0
+MESHOPT_INDEX_SEQUENCE_HEADER = 0xD1
+
+# vertex blocks are at most 256 vertices, or 8kb of vertex data
+MESHOPT_VERTEX_BLOCK_MAX_SIZE = 256
+MESHOPT_VERTEX_BLOCK_SIZE_BYTES = 8192
+MESHOPT_BYTE_GROUP_SIZE = 16
+# the first vertex is written at the end of the stream, padded to 32 bytes
+MESHOPT_TAIL_SIZE = 32
+
+def getVertexBlockSize(stride):
+  size = (MESHOPT_VERTEX_BLOCK_SIZE_BYTES // stride) & ~(MESHOPT_BYTE_GROUP_SIZE - 1)
+  return min(size, MESHOPT_VERTEX_BLOCK_MAX_SIZE)
+
+def zigzag8(values):
+  return (values << 1) ^ (values.view(np.int8) >> 7).view(np.uint8)
+
+def unzigzag8(values):
+  return (values >> 1) ^ (0 - (values & 1)).astype(np.uint8)
+
+def encodeByteGroups(columns):
+  # columns is a (numColumns, numGroups, 16) array of zigzagged deltas, one column per byte of the vertex within a block
+  # each column is written as 2-bit group modes packed into header bytes, followed by each group's data
+  # groups are stored as either all zeros (no data), 2 or 4 bits per byte with larger bytes written out after them, or 16 raw bytes
+  (numColumns, numGroups, groupSize) = columns.shape
+  over2 = columns >= 3
+  over4 = columns >= 15
+  # candidate sizes in the order the reference encoder prefers them when there's a tie: raw, zero, 2-bit, 4-bit
+  sizes = np.stack((
+    np.full((numColumns, numGroups), groupSize),
+    np.where(columns.any(axis=2), groupSize * 4, 0),
+    4 + over2.sum(axis=2),
+    8 + over4.sum(axis=2),
+  ), axis=2)
+  choice = sizes.argmin(axis=2)
+  lengths = np.take_along_axis(sizes, choice[:, :, None], axis=2)[:, :, 0]
+  modes = np.array([3, 0, 1, 2], dtype=np.uint8)[choice]
+
+  # packed values come first in each byte, then the bytes that didn't fit, in order
+  packed2 = np.minimum(columns, 3).reshape(numColumns, numGroups, 4, 4)
+  packed2 = (packed2[..., 0] << 6) | (packed2[..., 1] << 4) | (packed2[..., 2] << 2) | packed2[..., 3]
+  extra2 = np.take_along_axis(columns, np.argsort(~over2, axis=2, kind="stable"), axis=2)
+  packed4 = np.minimum(columns, 15).reshape(numColumns, numGroups, 8, 2)
+  packed4 = (packed4[..., 0] << 4) | packed4[..., 1]
+  extra4 = np.take_along_axis(columns, np.argsort(~over4, axis=2, kind="stable"), axis=2)
+  groups = np.select(
+    [choice[:, :, None] == 0, choice[:, :, None] == 2, choice[:, :, None] == 3],
+    [columns, np.concatenate((packed2, extra2), axis=2)[:, :, 0:groupSize], np.concatenate((packed4, extra4), axis=2)[:, :, 0:groupSize]],
+    0
+  ).astype(np.uint8)
+
+  # four group modes per header byte, starting from the low bits
+  headerSize = (numGroups + 3) // 4
+  headers = np.zeros((numColumns, headerSize * 4), dtype=np.uint8)
+  headers[:, 0:numGroups] = modes
+  headers = headers.reshape(numColumns, headerSize, 4) << np.array([0, 2, 4, 6], dtype=np.uint8)
+  headers = np.bitwise_or.reduce(headers, axis=2)
+
+  data = np.concatenate((headers, groups.reshape(numColumns, -1)), axis=1)
+  mask = np.concatenate((
+    np.ones((numColumns, headerSize), dtype=bool),
+    (np.arange(groupSize) < lengths[:, :, None]).reshape(numColumns, -1)
+  ), axis=1)
+  return data[mask]
+
+def encodeVertexBlocks(deltas):
+  # deltas is a (numBlocks, blockSize, stride) array
+  (numBlocks, blockSize, stride) = deltas.shape
+  paddedSize = -(-blockSize // MESHOPT_BYTE_GROUP_SIZE) * MESHOPT_BYTE_GROUP_SIZE
+  columns = np.zeros((numBlocks, stride, paddedSize), dtype=np.uint8)
+  columns[:, :, 0:blockSize] = deltas.transpose(0, 2, 1)
+  return encodeByteGroups(columns.reshape(numBlocks * stride, -1, MESHOPT_BYTE_GROUP_SIZE))
+
+def encodeVertexBuffer(data, count, stride):
+  # stride must be a multiple of 4, and no more than 256
+  assert stride % 4 == 0 and 0 < stride <= 256
+  vertices = np.frombuffer(data, dtype=np.uint8, count=count * stride).reshape(count, stride)
+  # every byte is stored as the difference from the same byte of the previous vertex, with the first vertex as its own baseline
+  previous = np.concatenate((vertices[0:1], vertices[0:-1]))
+  deltas = zigzag8(vertices - previous)
+  blockSize = getVertexBlockSize(stride)
+  numBlocks = count // blockSize
+  parts = [bytes([MESHOPT_VERTEX_HEADER])]
+  if numBlocks:
+    parts.append(encodeVertexBlocks(deltas[0:numBlocks * blockSize].reshape(numBlocks, blockSize, stride)).tobytes())
+  if count % blockSize:
+    parts.append(encodeVertexBlocks(deltas[numBlocks * blockSize:].reshape(1, -1, stride)).tobytes())
+  parts.append(bytes(max(MESHOPT_TAIL_SIZE - stride, 0)))
+  parts.append(vertices[0].tobytes() if count else bytes(stride))
+  return b"".join(parts)
+
+def encodeIndexSequence(indices):
+  # each index is stored as a zigzagged delta from the previous one, as a little endian base 128 varint
+  # the low bit of each value selects one of two baselines in the decoder; only the first is used here
+  indices = np.asarray(indices, dtype=np.uint32)
+  previous = np.concatenate((np.zeros(1, dtype=np.uint32), indices[0:-1]))
+  deltas = indices - previous
+  values = ((deltas << np.uint32(1)) ^ (deltas.view(np.int32) >> 31).view(np.uint32)).astype(np.uint64) << np.uint64(1)
+  values &= np.uint64(0xFFFFFFFF)
+  numBytes = 1 + (values >= 1 << 7) + (values >= 1 << 14) + (values >= 1 << 21) + (values >= 1 << 28)
+  byteIndex = np.arange(5, dtype=np.uint64)
+  varints = ((values[:, None] >> (byteIndex * np.uint64(7))) & np.uint64(0x7F)).astype(np.uint8)
+  varints |= ((byteIndex[None, :] + 1) < numBytes[:, None]).astype(np.uint8) << 7
+  return b"".join([
+    bytes([MESHOPT_INDEX_SEQUENCE_HEADER]),
+    varints[np.arange(5) < numBytes[:, None]].tobytes(),
+    bytes(4),
+  ])
+
+def decodeByteGroups(data, offset, numGroups):
+  # returns (values, offset)
+  headerSize = (numGroups + 3) // 4
+  header = data[offset:offset + headerSize]
+  offset += headerSize
+  values = np.zeros(numGroups * MESHOPT_BYTE_GROUP_SIZE, dtype=np.uint8)
+  for group in range(numGroups):
+    mode = (header[group // 4] >> ((group % 4) * 2)) & 3
+    start = group * MESHOPT_BYTE_GROUP_SIZE
+    if mode == 3:
+      values[start:start + MESHOPT_BYTE_GROUP_SIZE] = data[offset:offset + MESHOPT_BYTE_GROUP_SIZE]
+      offset += MESHOPT_BYTE_GROUP_SIZE
+    elif mode != 0:
+      bits = 2 if mode == 1 else 4
+      packedSize = MESHOPT_BYTE_GROUP_SIZE * bits // 8
+      packed = data[offset:offset + packedSize]
+      offset += packedSize
+      sentinel = (1 << bits) - 1
+      for i in range(MESHOPT_BYTE_GROUP_SIZE):
+        value = (packed[i * bits // 8] >> (8 - bits - (i * bits) % 8)) & sentinel
+        if value == sentinel:
+          value = data[offset]
+          offset += 1
+        values[start + i] = value
+  return (values, offset)
+
+def decodeVertexBuffer(data, count, stride):
+  data = np.frombuffer(data, dtype=np.uint8)
+  if data[0] != MESHOPT_VERTEX_HEADER:
+    raise ValueError("unsupported meshopt vertex stream header 0x%02x" % data[0])
+  vertices = np.zeros((count, stride), dtype=np.uint8)
+  previous = data[len(data) - stride:].copy()
+  blockSize = getVertexBlockSize(stride)
+  offset = 1
+  for start in range(0, count, blockSize):
+    size = min(blockSize, count - start)
+    numGroups = -(-size // MESHOPT_BYTE_GROUP_SIZE)
+    for k in range(stride):
+      (deltas, offset) = decodeByteGroups(data, offset, numGroups)
+      deltas = unzigzag8(deltas[0:size])
+      deltas[0:1] += previous[k:k + 1]
+      vertices[start:start + size, k] = np.cumsum(deltas, dtype=np.uint8)
+    previous = vertices[start + size - 1]
+  return vertices.tobytes()
+
+def decodeIndexSequence(data, count, indexSize=4):
+  data = bytes(data)
+  if data[0] != MESHOPT_INDEX_SEQUENCE_HEADER:
+    raise ValueError("unsupported meshopt index sequence header 0x%02x" % data[0])
+  indices = np.zeros(count, dtype=np.uint32 if indexSize == 4 else np.uint16)
+  last = [0, 0]
+  offset = 1
+  for i in range(count):
+    value = 0
+    shift = 0
+    while True:
+      byte = data[offset]
+      offset += 1
+      value |= (byte & 0x7F) << shift
+      shift += 7
+      if byte < 0x80:
+        break
+    baseline = value & 1
+    value >>= 1
+    delta = (value >> 1) ^ -(value & 1)
+    index = (last[baseline] + delta) & 0xFFFFFFFF
+    last[baseline] = index
+    indices[i] = index
+  return indices.tobytes()
@@ -0,0 +1,79 @@
+# vertex attribute quantization, for the KHR_mesh_quantization extension
+# https://github.com/KhronosGroup/glTF/tree/main/extensions/2.0/Khronos/KHR_mesh_quantization
+
+import numpy as np
+
+# numpy dtypes -> accessor component types
+GLBComponentTypes = {
+  np.dtype('i1'): 5120,
+  np.dtype('u1'): 5121,
+  np.dtype('<i2'): 5122,
+  np.dtype('<u2'): 5123,
+  np.dtype('<u4'): 5125,
+  np.dtype('<f4'): 5126,
+}
+
+GLBAccessorTypes = {
+  1: "SCALAR",
+  2: "VEC2",
+  3: "VEC3",
+  4: "VEC4",
+}
+
+def getComponentType(dtype):
+  return GLBComponentTypes[np.dtype(dtype).newbyteorder("<")]
+
+def getAccessorBounds(view):
+  # (min, max) lists of a (count, components) array, reduced without copying it even if it's a strided view
+  # these are always in the accessor's own component type, even for normalized accessors
+  return (view.min(axis=0).tolist(), view.max(axis=0).tolist())
+
+def quantizeNormalized(values, dtype):
+  # values should be within [-1, 1] for signed types, or [0, 1] for unsigned ones
+  info = np.iinfo(dtype)
+  values = np.clip(values, -1 if info.min < 0 else 0, 1)
+  return np.round(values * info.max).astype(dtype)
+
+def quantizePositions(positions, dtype=np.int16):
+  # positions are centered on their bounding box and uniformly scaled to fit [-1, 1]
+  # returns (quantized, center, scale), where position = center + scale * dequantized
+  positions = np.asarray(positions, dtype=np.float64)
+  if len(positions) == 0:
+    return (np.zeros(positions.shape, dtype=dtype), np.zeros(positions.shape[1]), 1.0)
+  lower = positions.min(axis=0)
+  upper = positions.max(axis=0)
+  center = (lower + upper) / 2
+  scale = float((upper - lower).max()) / 2
+  if scale == 0:
+    scale = 1.0
+  return (quantizeNormalized((positions - center) / scale, dtype), center, scale)
+
+def quantizeDirections(vectors, dtype=np.int8):
+  # vectors are made unit length first, so that no component gets clipped
+  vectors = np.asarray(vectors, dtype=np.float64)
+  lengths = np.sqrt(np.einsum("ij,ij->i", vectors, vectors))
+  lengths[lengths == 0] = 1
+  return quantizeNormalized(vectors / lengths[:, None], dtype)
+
+def quantizeTexCoords(uvs):
+  # returns None if the coordinates don't fit into a normalized range, since that would need KHR_texture_transform
+  if len(uvs) == 0 or (uvs.min() >= 0 and uvs.max() <= 1):
+    return quantizeNormalized(uvs, np.uint16)
+  if uvs.min() >= -1 and uvs.max() <= 1:
+    return quantizeNormalized(uvs, np.int16)
+  return None
+
+def interleave(arrays, numVertices):
+  # packs a list of (numVertices, components) arrays into one vertex buffer
+  # every attribute starts on a 4 byte boundary, as the glTF spec requires for vertex attributes
+  # returns (data, stride, offsets)
+  offsets = []
+  stride = 0
+  for array in arrays:
+    offsets.append(stride)
+    stride += -(-array.shape[1] * array.itemsize // 4) * 4
+  data = np.zeros((numVertices, stride), dtype=np.uint8)
+  for (array, offset) in zip(arrays, offsets):
+    size = array.shape[1] * array.itemsize
+    data[:, offset:offset + size] = np.ascontiguousarray(array).view(np.uint8).reshape(numVertices, size)
+  return (data, stride, offsets)
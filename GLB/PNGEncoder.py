@@ -0,0 +1,33 @@
+# minimal png encoder for 8-bit RGBA images, used to write out decoded textures
+# png spec: https://www.w3.org/TR/png/
+
+import zlib
+from struct import pack
+import numpy as np
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+def chunk(kind, data):
+  return pack(">I", len(data)) + kind + data + pack(">I", zlib.crc32(kind + data) & 0xFFFFFFFF)
+
+def encodePNG(pixels, level=6):
+  # pixels should be a (height, width, 4) uint8 array
+  pixels = np.ascontiguousarray(pixels, dtype=np.uint8)
+  (height, width, channels) = pixels.shape
+  assert channels == 4
+  # every row uses the "sub" filter, storing each byte as the difference from the same channel of the pixel to its left
+  rows = np.empty((height, width * 4 + 1), dtype=np.uint8)
+  rows[:, 0] = 1
+  rows[:, 1:5] = pixels[:, 0]
+  rows[:, 5:] = (pixels[:, 1:] - pixels[:, :-1]).reshape(height, -1)
+  return b"".join([
+    PNG_SIGNATURE,
+    # 8 bits per channel, colour type 6 (RGBA)
+    chunk(b'IHDR', pack(">IIBBBBB", width, height, 8, 6, 0, 0, 0)),
+    chunk(b'IDAT', zlib.compress(rows.tobytes(), level)),
+    chunk(b'IEND', b''),
+  ])
+
+def savePNG(path, pixels, level=6):
+  with open(path, "wb") as f:
+    f.write(encodePNG(pixels, level))
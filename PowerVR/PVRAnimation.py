@@ -1,9 +1,70 @@
+import numpy as np
+
 class EPVRAnimation:
   eHasPositionAnimation = 0x01
   eHasRotationAnimation = 0x02
   eHasScaleAnimation =    0x04
   eHasMatrixAnimation =   0x08
 
+# number of floats per frame for each kind of keyframe
+# scales have a "stretch rotation" quaternion after the scale itself, which is ignored here
+PVRAnimationKeySizes = {
+  "positions": 3,
+  "rotations": 4,
+  "scales":    7,
+  "matrices":  16,
+}
+
+def MatricesToQuaternions(matrices):
+  # (n, 3, 3) row-major rotation matrices -> (n, 4) xyzw quaternions
+  m = matrices
+  trace = m[:, 0, 0] + m[:, 1, 1] + m[:, 2, 2]
+  with np.errstate(divide="ignore", invalid="ignore"):
+    # each candidate is only accurate when the component it's based on is the largest
+    s = np.sqrt(np.maximum(np.stack((
+      1 + trace,
+      1 + m[:, 0, 0] - m[:, 1, 1] - m[:, 2, 2],
+      1 + m[:, 1, 1] - m[:, 0, 0] - m[:, 2, 2],
+      1 + m[:, 2, 2] - m[:, 0, 0] - m[:, 1, 1],
+    ), axis=1), 0)) * 2
+    candidates = np.stack((
+      np.stack(((m[:, 2, 1] - m[:, 1, 2]) / s[:, 0], (m[:, 0, 2] - m[:, 2, 0]) / s[:, 0], (m[:, 1, 0] - m[:, 0, 1]) / s[:, 0], s[:, 0] / 4), axis=1),
+      np.stack((s[:, 1] / 4, (m[:, 0, 1] + m[:, 1, 0]) / s[:, 1], (m[:, 0, 2] + m[:, 2, 0]) / s[:, 1], (m[:, 2, 1] - m[:, 1, 2]) / s[:, 1]), axis=1),
+      np.stack(((m[:, 0, 1] + m[:, 1, 0]) / s[:, 2], s[:, 2] / 4, (m[:, 1, 2] + m[:, 2, 1]) / s[:, 2], (m[:, 0, 2] - m[:, 2, 0]) / s[:, 2]), axis=1),
+      np.stack(((m[:, 0, 2] + m[:, 2, 0]) / s[:, 3], (m[:, 1, 2] + m[:, 2, 1]) / s[:, 3], s[:, 3] / 4, (m[:, 1, 0] - m[:, 0, 1]) / s[:, 3]), axis=1),
+    ), axis=1)
+  choice = np.stack((trace, m[:, 0, 0], m[:, 1, 1], m[:, 2, 2]), axis=1).argmax(axis=1)
+  return candidates[np.arange(len(m)), choice]
+
+def QuaternionsToMatrices(quaternions):
+  # (n, 4) xyzw quaternions -> (n, 3, 3) row-major rotation matrices
+  (x, y, z, w) = np.asarray(quaternions, dtype=np.float64).T
+  return np.stack((
+    np.stack((1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)), axis=1),
+    np.stack((2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)), axis=1),
+    np.stack((2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)), axis=1),
+  ), axis=1)
+
+def ComposeMatrices(translations, rotations, scales):
+  # (n, 4, 4) row-major matrices, applying scale, then rotation, then translation
+  matrices = np.zeros((len(translations), 4, 4))
+  matrices[:, 0:3, 0:3] = QuaternionsToMatrices(rotations) * np.asarray(scales, dtype=np.float64)[:, None, :]
+  matrices[:, 0:3, 3] = translations
+  matrices[:, 3, 3] = 1
+  return matrices
+
+def DecomposeMatrices(matrices):
+  # (n, 16) column-major matrices -> (translations, rotations, scales)
+  columns = np.asarray(matrices, dtype=np.float64).reshape(-1, 4, 4)
+  translations = columns[:, 3, 0:3]
+  axes = columns[:, 0:3, 0:3]
+  scales = np.linalg.norm(axes, axis=2)
+  # mirrored matrices are treated as a negative x scale
+  scales[np.linalg.det(axes) < 0, 0] *= -1
+  safeScales = np.where(scales == 0, 1, scales)
+  rotations = MatricesToQuaternions((axes / safeScales[:, :, None]).transpose(0, 2, 1))
+  return (translations, rotations, scales)
+
 class PVRAnimation:
   def __init__(self):
     self.flags = 0
@@ -15,4 +76,51 @@ class PVRAnimation:
     self.positionIndices = None
     self.rotationIndices = None
     self.scaleIndices =    None
-    self.matrixIndices =   None
\ No newline at end of file
+    self.matrixIndices =   None
+
+  def IsAnimated(self):
+    return self.flags != 0
+
+  def GetKeys(self, name, numFrames):
+    # keyframe data expanded to a (frames, size) array, following the index array if there is one
+    # if this kind of animation isn't used, only the first frame is returned
+    # returns None if there's no data
+    data = getattr(self, name)
+    if data is None:
+      return None
+    data = np.asarray(data, dtype=np.float32)
+    size = PVRAnimationKeySizes[name]
+    flag = {
+      "positions": EPVRAnimation.eHasPositionAnimation,
+      "rotations": EPVRAnimation.eHasRotationAnimation,
+      "scales":    EPVRAnimation.eHasScaleAnimation,
+      "matrices":  EPVRAnimation.eHasMatrixAnimation,
+    }[name]
+    if not self.flags & flag:
+      numFrames = 1
+    indices = getattr(self, name[0:-1] + "Indices")
+    if indices is not None:
+      # indices are offsets into the data, in floats
+      offsets = np.asarray(indices, dtype=np.int64)[0:numFrames]
+    else:
+      offsets = np.arange(numFrames, dtype=np.int64) * size
+    # drop frames that would run past the end of the data
+    offsets = offsets[offsets + size <= len(data)]
+    return data[offsets[:, None] + np.arange(size)]
+
+  def GetTransforms(self, numFrames):
+    # returns (translations, rotations, scales) keyframe arrays, decomposing matrix animation if that's used
+    if self.flags & EPVRAnimation.eHasMatrixAnimation or (self.matrices is not None and self.positions is None and self.rotations is None and self.scales is None):
+      matrices = self.GetKeys("matrices", numFrames)
+      if matrices is None or len(matrices) == 0:
+        matrices = np.identity(4, dtype=np.float32).reshape(1, 16)
+      (translations, rotations, scales) = DecomposeMatrices(matrices)
+      return (translations.astype(np.float32), rotations.astype(np.float32), scales.astype(np.float32))
+    translations = self.GetKeys("positions", numFrames)
+    rotations = self.GetKeys("rotations", numFrames)
+    scales = self.GetKeys("scales", numFrames)
+    return (
+      np.zeros((1, 3), dtype=np.float32) if translations is None or len(translations) == 0 else translations,
+      np.array([[0, 0, 0, 1]], dtype=np.float32) if rotations is None or len(rotations) == 0 else rotations,
+      np.ones((1, 3), dtype=np.float32) if scales is None or len(scales) == 0 else scales[:, 0:3],
+    )
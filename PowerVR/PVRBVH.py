@@ -0,0 +1,71 @@
+import numpy as np
+
+# bounding volume hierarchy over axis aligned boxes, stored as flat arrays in depth-first order
+# node i covers bounds[i] ((2, 3) minimum and maximum); inner nodes have a count of 0,
+# their first child straight after them at i + 1, and their second child at offsets[i]
+# leaves have counts[i] items, at items[offsets[i]:offsets[i] + counts[i]]
+
+class PVRBVH:
+  def __init__(self, leafSize=4):
+    # maximum number of items in each leaf
+    self.leafSize = max(leafSize, 1)
+    self.bounds = np.zeros((0, 2, 3))
+    self.offsets = np.zeros(0, dtype=np.int64)
+    self.counts = np.zeros(0, dtype=np.int64)
+    self.items = np.zeros(0, dtype=np.int64)
+
+  def Build(self, boxes, items=None):
+    # boxes is a (numBoxes, 2, 3) array, and items are what the leaves refer to, defaulting to the boxes' indices
+    # nodes are split at the median of their boxes' centers, along the axis the centers are most spread out on
+    boxes = np.asarray(boxes, dtype=np.float64)
+    numBoxes = len(boxes)
+    items = np.arange(numBoxes) if items is None else np.asarray(items, dtype=np.int64)
+    order = np.arange(numBoxes)
+    centers = boxes.mean(axis=1)
+    bounds = []
+    offsets = []
+    counts = []
+    # (start, end, node) ranges of order still to be built, where node is the parent to give the second child's index
+    stack = [(0, numBoxes, -1)] if numBoxes else []
+    while stack:
+      (start, end, parentIndex) = stack.pop()
+      nodeIndex = len(bounds)
+      if parentIndex >= 0:
+        offsets[parentIndex] = nodeIndex
+      indices = order[start:end]
+      bounds.append((boxes[indices, 0].min(axis=0), boxes[indices, 1].max(axis=0)))
+      if end - start <= self.leafSize:
+        offsets.append(start)
+        counts.append(end - start)
+        continue
+      nodeCenters = centers[indices]
+      axis = np.argmax(nodeCenters.max(axis=0) - nodeCenters.min(axis=0))
+      middle = (end - start) // 2
+      order[start:end] = indices[np.argpartition(nodeCenters[:, axis], middle)]
+      offsets.append(-1)
+      counts.append(0)
+      # the first child is popped next, so it's built straight after its parent
+      stack.append((start + middle, end, nodeIndex))
+      stack.append((start, start + middle, -1))
+
+    self.bounds = np.array(bounds).reshape(-1, 2, 3)
+    self.offsets = np.array(offsets, dtype=np.int64)
+    self.counts = np.array(counts, dtype=np.int64)
+    self.items = items[order]
+    return self
+
+  def Query(self, lower, upper):
+    # returns the items of every leaf whose bounds overlap the box from lower to upper
+    found = []
+    stack = [0] if len(self.bounds) else []
+    while stack:
+      nodeIndex = stack.pop()
+      if np.any(self.bounds[nodeIndex, 0] > upper) or np.any(self.bounds[nodeIndex, 1] < lower):
+        continue
+      if self.counts[nodeIndex]:
+        offset = self.offsets[nodeIndex]
+        found.extend(self.items[offset:offset + self.counts[nodeIndex]].tolist())
+      else:
+        stack.append(self.offsets[nodeIndex])
+        stack.append(nodeIndex + 1)
+    return found
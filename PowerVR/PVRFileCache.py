@@ -0,0 +1,92 @@
+import os
+import tempfile
+import threading
+
+# base for on-disk caches made of one file per entry, spread over subdirectories by the first two characters of their key
+# entries are written atomically, so several batch workers can share one cache directory
+# the counters are guarded by a lock, so one cache can be used from several conversion threads
+# once the cache grows past maxSize, the least recently used entries are evicted (hits refresh an entry's mtime)
+
+class PVRFileCache:
+  def __init__(self, directory, maxSize=1 << 30, ext=""):
+    self.directory = directory
+    self.maxSize = maxSize
+    self.ext = ext
+    self.hits = 0
+    self.misses = 0
+    self.evictions = 0
+    # estimated total size of the cache, only rescanned when it looks to be over the limit
+    self.size = None
+    self.lock = threading.Lock()
+    os.makedirs(directory, exist_ok=True)
+
+  def getPath(self, key):
+    return os.path.join(self.directory, key[0:2], key + self.ext)
+
+  def countHit(self, entry):
+    os.utime(entry)
+    with self.lock:
+      self.hits += 1
+
+  def countMiss(self):
+    with self.lock:
+      self.misses += 1
+
+  def write(self, key, write):
+    # write(f) writes the entry's contents to a temporary file first, so other workers never see a partial entry
+    entry = self.getPath(key)
+    os.makedirs(os.path.dirname(entry), exist_ok=True)
+    (fd, temp) = tempfile.mkstemp(dir=os.path.dirname(entry), suffix=".tmp")
+    try:
+      with os.fdopen(fd, "wb") as f:
+        write(f)
+      os.replace(temp, entry)
+    except BaseException:
+      os.unlink(temp)
+      raise
+    with self.lock:
+      if self.size is None:
+        self.size = self.scan()[1]
+      else:
+        self.size += os.path.getsize(entry)
+      if self.size > self.maxSize:
+        self.evict()
+    return entry
+
+  def scan(self):
+    entries = []
+    total = 0
+    for (root, dirs, files) in os.walk(self.directory):
+      for name in files:
+        if not name.endswith(self.ext) or name.endswith(".tmp"):
+          continue
+        entry = os.path.join(root, name)
+        try:
+          stat = os.stat(entry)
+        except FileNotFoundError:
+          continue
+        entries.append((stat.st_mtime, stat.st_size, entry))
+        total += stat.st_size
+    return (entries, total)
+
+  def evict(self):
+    (entries, total) = self.scan()
+    entries.sort()
+    for (mtime, size, entry) in entries:
+      if total <= self.maxSize:
+        break
+      try:
+        os.unlink(entry)
+        # evict() is only called with the lock held
+        self.evictions += 1
+      except FileNotFoundError:
+        pass
+      total -= size
+    self.size = total
+
+  def getStats(self):
+    return {
+      "hits": self.hits,
+      "misses": self.misses,
+      "evictions": self.evictions,
+    }
@@ -0,0 +1,44 @@
+from collections.abc import Sequence
+
+# list of scene blocks that are only decoded when they are first accessed
+# each entry is the (offset, length) of a block's contents within the loader's stream
+
+class PVRLazyList(Sequence):
+  def __init__(self, loader, reader):
+    self.loader = loader
+    self.reader = reader
+    self.blocks = []
+    self.items = []
+
+  def AddBlock(self, offset, length):
+    self.blocks.append((offset, length))
+    self.items.append(None)
+    return len(self.blocks) - 1
+
+  def IsLoaded(self, index):
+    return self.items[index] is not None
+
+  def Load(self, index):
+    item = self.items[index]
+    if item is None:
+      stream = self.loader.stream
+      (offset, length) = self.blocks[index]
+      # blocks can be materialized at any time, so the stream position has to be restored afterwards
+      position = stream.tell()
+      stream.seek(offset)
+      item = self.reader()
+      stream.seek(position)
+      self.items[index] = item
+    return item
+
+  def __len__(self):
+    return len(self.blocks)
+
+  def __getitem__(self, index):
+    if isinstance(index, slice):
+      return [self.Load(i) for i in range(*index.indices(len(self)))]
+    if index < 0:
+      index += len(self)
+    if index < 0 or index >= len(self):
+      raise IndexError("scene block index out of range")
+    return self.Load(index)
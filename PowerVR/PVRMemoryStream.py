@@ -0,0 +1,54 @@
+import os
+import mmap
+
+# minimal file-like wrapper around a memory map
+# read() returns memoryview slices into the mapping instead of copying bytes out of it
+
+class PVRMemoryStream:
+  def __init__(self, buffer):
+    self.buffer = buffer
+    self.view = memoryview(buffer)
+    self.position = 0
+
+  @classmethod
+  def open(cls, path):
+    with open(path, "rb") as f:
+      # empty files can't be mapped, and there's nothing in them to view anyway
+      if os.fstat(f.fileno()).st_size == 0:
+        return cls(b"")
+      # ACCESS_COPY gives a writable, copy-on-write mapping, so consumers can patch vertex data in place
+      # without touching the file on disk; the mapping stays valid after the file handle is closed
+      return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY))
+
+  def close(self):
+    # unmaps the file; arrays read from it must be gone by now, or closing the mapping raises a BufferError
+    self.view.release()
+    if isinstance(self.buffer, mmap.mmap):
+      self.buffer.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc):
+    self.close()
+
+  def read(self, length=-1):
+    start = self.position
+    if length is None or length < 0:
+      end = len(self.view)
+    else:
+      end = min(start + length, len(self.view))
+    self.position = end
+    return self.view[start:end]
+
+  def seek(self, offset, whence=0):
+    if whence == 0:
+      self.position = offset
+    elif whence == 1:
+      self.position += offset
+    elif whence == 2:
+      self.position = len(self.view) + offset
+    return self.position
+
+  def tell(self):
+    return self.position
@@ -1,3 +1,5 @@
+import numpy as np
+
 from PowerVR.EPOD import *
 
 class EPVRMesh:
@@ -34,6 +36,46 @@ class EPVRMesh:
     e16Bit = 3
     e32Bit = 17
 
+PVRFaceDataTypeMap = {
+  EPVRMesh.FaceData.e16Bit: '<u2',
+  EPVRMesh.FaceData.e32Bit: '<u4',
+}
+
+# vertex data types -> little-endian numpy dtypes for a single component
+# packed colour types store four bytes per component
+PVRVertexDataTypeMap = {
+  EPVRMesh.VertexData.eFloat:             '<f4',
+  EPVRMesh.VertexData.eInt:               '<i4',
+  EPVRMesh.VertexData.eUnsignedShort:     '<u2',
+  EPVRMesh.VertexData.eRGBA:              '4u1',
+  EPVRMesh.VertexData.eARGB:              '4u1',
+  EPVRMesh.VertexData.eD3DCOLOR:          '4u1',
+  EPVRMesh.VertexData.eUBYTE4:            '4u1',
+  EPVRMesh.VertexData.eDEC3N:             '<u4',
+  EPVRMesh.VertexData.eFixed16_16:        '<i4',
+  EPVRMesh.VertexData.eUnsignedByte:      'u1',
+  EPVRMesh.VertexData.eShort:             '<i2',
+  EPVRMesh.VertexData.eShortNorm:         '<i2',
+  EPVRMesh.VertexData.eByte:              'i1',
+  EPVRMesh.VertexData.eByteNorm:          'i1',
+  EPVRMesh.VertexData.eUnsignedByteNorm:  'u1',
+  EPVRMesh.VertexData.eUnsignedShortNorm: '<u2',
+  EPVRMesh.VertexData.eUnsignedInt:       '<u4',
+  EPVRMesh.VertexData.eABGR:              '4u1',
+}
+
+# vertex data types that are read as fractions of their integer range
+PVRNormalizedVertexDataTypes = (
+  EPVRMesh.VertexData.eRGBA,
+  EPVRMesh.VertexData.eARGB,
+  EPVRMesh.VertexData.eD3DCOLOR,
+  EPVRMesh.VertexData.eShortNorm,
+  EPVRMesh.VertexData.eByteNorm,
+  EPVRMesh.VertexData.eUnsignedByteNorm,
+  EPVRMesh.VertexData.eUnsignedShortNorm,
+  EPVRMesh.VertexData.eABGR,
+)
+
 class PVRMesh:
   def __init__(self):
     self.unpackMatrix = []
@@ -82,4 +124,161 @@ class PVRMesh:
       "offset": offset,
       "dataIndex": dataIndex,
     }
-    return EPODErrorCodes.eNoError
\ No newline at end of file
+    return EPODErrorCodes.eNoError
+
+  def GetElementData(self, semantic, writable=False):
+    element = self.vertexElements[semantic]
+    dataIndex = element["dataIndex"] if element["dataIndex"] >= 0 else 0
+    data = self.vertexElementData[dataIndex]
+    if writable and memoryview(data).readonly:
+      # the data was read straight from the file, so take a single writable copy of it
+      data = bytearray(data)
+      self.vertexElementData[dataIndex] = data
+    return data
+
+  def GetElementView(self, semantic, writable=False):
+    # strided numpy view of a single attribute inside the interleaved vertex data, shaped (numVertices, components)
+    element = self.vertexElements[semantic]
+    data = self.GetElementData(semantic, writable)
+    dtype = np.dtype(PVRVertexDataTypeMap[element["dataType"]])
+    numComponents = element["numComponents"] * (dtype.shape[0] if dtype.shape else 1)
+    dtype = dtype.base
+    return np.ndarray(
+      shape=(self.primitiveData["numVertices"], numComponents),
+      dtype=dtype,
+      buffer=data,
+      offset=element["offset"],
+      strides=(element["stride"], dtype.itemsize)
+    )
+
+  def GetBounds(self):
+    # (2, 3) minimum and maximum position, or None if the mesh has no positions
+    # positions that the POD exporter has quantized are unpacked, as they are by the glb's dequantization node
+    element = self.vertexElements.get("POSITION")
+    if element is None or self.primitiveData["numVertices"] == 0:
+      return None
+    # reduced straight from the interleaved vertex data, without copying the positions out
+    view = self.GetElementView("POSITION")[:, 0:3]
+    bounds = np.stack((view.min(axis=0), view.max(axis=0))).astype(np.float64)
+    if element["dataType"] in PVRNormalizedVertexDataTypes:
+      bounds /= np.iinfo(view.dtype).max
+    if element["dataType"] != EPVRMesh.VertexData.eFloat and len(self.unpackMatrix) == 16:
+      # unpack matrices are column-major, and can rotate, so all eight corners are transformed
+      unpack = np.array(self.unpackMatrix, dtype=np.float64).reshape(4, 4).T
+      corners = np.array(np.meshgrid(*bounds.T, indexing="ij")).reshape(3, -1).T
+      corners = corners @ unpack[0:3, 0:3].T + unpack[0:3, 3]
+      bounds = np.stack((corners.min(axis=0), corners.max(axis=0)))
+    return bounds
+
+  def IsStripped(self):
+    return self.primitiveData["numStrips"] > 0
+
+  def GetFaceIndices(self):
+    # face index data as a numpy array, without any strip expansion
+    data = self.faces["data"]
+    dtype = PVRFaceDataTypeMap[self.faces["indexType"]]
+    if data is None:
+      return np.zeros(0, dtype=dtype)
+    return np.frombuffer(data, dtype=dtype)
+
+  def GetStripLengths(self):
+    # strip lengths are stored as a triangle count for each strip, with each strip taking up length + 2 indices
+    indices = self.GetFaceIndices()
+    lengths = self.primitiveData["stripLengths"]
+    if lengths is None:
+      # no lengths, so the whole index list is one strip
+      return np.array([max(len(indices) - 2, 0)], dtype=np.int64)
+    lengths = np.asarray(lengths, dtype=np.int64)[0:self.primitiveData["numStrips"]]
+    if (lengths + 2).sum() > len(indices):
+      raise ValueError("mesh strip lengths add up to more than its %d indices" % len(indices))
+    return lengths
+
+  def GetTriangleList(self):
+    # face indices as a triangle list, expanding strips if the mesh has any
+    indices = self.GetFaceIndices()
+    if not self.IsStripped():
+      return indices
+    lengths = self.GetStripLengths()
+    numTriangles = lengths.sum()
+    firstTriangle = np.cumsum(lengths) - lengths
+    firstIndex = np.cumsum(lengths + 2) - (lengths + 2)
+    # the first index of every triangle, and its position within its own strip
+    triangle = np.arange(numTriangles)
+    base = np.repeat(firstIndex - firstTriangle, lengths) + triangle
+    odd = (triangle - np.repeat(firstTriangle, lengths)) & 1
+    # odd triangles have their winding flipped, matching the glTF triangle strip rules
+    a = indices[base]
+    b = indices[base + 1 + odd]
+    c = indices[base + 2 - odd]
+    # drop degenerate triangles, which are commonly used to stitch strips together
+    keep = (a != b) & (b != c) & (a != c)
+    return np.stack((a[keep], b[keep], c[keep]), axis=1).reshape(-1)
+
+  def GetTriangleStrip(self):
+    # all of the mesh's strips joined into one, using degenerate triangles between them
+    # returns None if the mesh isn't stripped
+    if not self.IsStripped():
+      return None
+    indices = self.GetFaceIndices()
+    lengths = self.GetStripLengths()
+    counts = lengths + 2
+    srcStart = np.cumsum(counts) - counts
+    # each strip after the first is joined by repeating the last index of the previous strip and its own first index
+    # plus one more if needed, so that every strip starts on an even triangle and keeps its winding
+    joins = np.zeros(len(counts), dtype=np.int64)
+    joins[1:] = 2 + (counts[:-1] & 1)
+    dstStart = np.cumsum(counts + joins) - counts
+    strip = np.empty(dstStart[-1] + counts[-1], dtype=indices.dtype)
+    strip[np.repeat(dstStart - srcStart, counts) + np.arange(counts.sum())] = indices[0:counts.sum()]
+    strip[dstStart[1:] - joins[1:]] = indices[srcStart[1:] - 1]
+    strip[dstStart[1:] - joins[1:] + 1] = indices[srcStart[1:]]
+    strip[dstStart[1:] - 1] = indices[srcStart[1:]]
+    return strip
+
+  def ReverseWinding(self):
+    # flips the winding of every triangle, for meshes whose vertices have been mirrored
+    indices = self.GetFaceIndices()
+    faceType = self.faces["indexType"]
+    if not self.IsStripped():
+      self.AddFaces(indices.reshape(-1, 3)[:, [0, 2, 1]].reshape(-1), faceType)
+      return
+    # repeating the first index of each strip puts a degenerate triangle in front of it, which swaps the winding of the rest
+    lengths = self.GetStripLengths()
+    counts = lengths + 2
+    starts = np.cumsum(counts) - counts
+    indices = indices[0:counts.sum()]
+    self.AddFaces(np.insert(indices, starts, indices[starts]), faceType)
+    self.primitiveData["numFaces"] = int((lengths + 1).sum())
+    self.primitiveData["numStrips"] = len(lengths)
+    self.primitiveData["stripLengths"] = lengths + 1
+
+  def IsSkinned(self):
+    return self.boneBatches["count"] > 0 and self.boneBatches["batches"] is not None and "JOINTS_0" in self.vertexElements and "WEIGHTS_0" in self.vertexElements
+
+  def GatherVertexData(self, vertices):
+    # copies of the interleaved vertex data blocks, holding only the given vertices, in order
+    numVertices = self.primitiveData["numVertices"]
+    # every element in a data block shares the block's stride
+    strides = {}
+    for element in self.vertexElements.values():
+      dataIndex = element["dataIndex"] if element["dataIndex"] >= 0 else 0
+      strides[dataIndex] = element["stride"]
+    vertexElementData = list(self.vertexElementData)
+    for (dataIndex, stride) in strides.items():
+      rows = np.frombuffer(self.vertexElementData[dataIndex], dtype=np.uint8, count=numVertices * stride).reshape(numVertices, stride)
+      vertexElementData[dataIndex] = bytearray(rows[vertices].tobytes())
+    return vertexElementData
+
+  def GetSubMesh(self, vertices, indices, semantics=None):
+    # a new mesh holding only the given vertices, and triangle list indices relative to them
+    # semantics can be used to only keep some of the vertex elements
+    mesh = PVRMesh()
+    mesh.unpackMatrix = self.unpackMatrix
+    mesh.primitiveData["numVertices"] = len(vertices)
+    mesh.vertexElementData = self.GatherVertexData(vertices)
+    for semantic in self.vertexElements:
+      if semantics is None or semantic in semantics:
+        mesh.vertexElements[semantic] = dict(self.vertexElements[semantic])
+    indexType = self.faces["indexType"] if len(vertices) <= 0x10000 else EPVRMesh.FaceData.e32Bit
+    mesh.AddFaces(np.asarray(indices).astype(PVRFaceDataTypeMap[indexType]), indexType)
+    return mesh
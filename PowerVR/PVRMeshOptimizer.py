@@ -0,0 +1,202 @@
+import numpy as np
+from collections import deque
+
+from PowerVR.PVRMesh import PVRFaceDataTypeMap
+
+# reorders a mesh's triangles and vertices for the gpu's post-transform vertex cache, for overdraw, and for vertex fetch
+# both triangle passes are from "Fast Triangle Reordering for Vertex Locality and Reduced Overdraw" (Sander et al. 2007):
+# tipsify orders triangles for the vertex cache, and then the overdraw pass splits that order into clusters,
+# and sorts the clusters so that the ones facing out from the middle of the mesh, which are the most likely
+# to hide the others, are drawn first
+# vertices are then renumbered in the order they're first used, and the interleaved vertex data is rearranged to match
+
+class PVRMeshOptimizer:
+  def __init__(self, cacheSize=16, overdrawThreshold=1.05):
+    self.cacheSize = cacheSize
+    # how much the overdraw pass can raise the ACMR of each run of triangles tipsify emitted between cache flushes,
+    # or None to only optimize for the vertex cache
+    self.overdrawThreshold = overdrawThreshold
+
+  def GetTriangleMisses(self, indices, numVertices):
+    # simulates a fifo vertex cache, returning the number of cache misses for each triangle
+    cache = deque()
+    cached = [False] * numVertices
+    misses = []
+    for triangle in indices.reshape(-1, 3).tolist():
+      count = 0
+      for v in triangle:
+        if not cached[v]:
+          count += 1
+          cached[v] = True
+          cache.append(v)
+          if len(cache) > self.cacheSize:
+            cached[cache.popleft()] = False
+      misses.append(count)
+    return np.array(misses, dtype=np.int64)
+
+  def GetCacheStats(self, indices, numVertices):
+    # returns (ACMR, ATVR)
+    # ACMR is cache misses per triangle, ATVR is cache misses per referenced vertex, 1.0 being the best possible
+    numTriangles = len(indices) // 3
+    if numTriangles == 0:
+      return (0.0, 0.0)
+    misses = int(self.GetTriangleMisses(indices, numVertices).sum())
+    numUsed = int(np.count_nonzero(np.bincount(indices, minlength=numVertices)))
+    return (misses / numTriangles, misses / numUsed)
+
+  def GetTriangleOrder(self, indices, numVertices):
+    # returns the new order of triangles, as indices into the original triangle list
+    triangles = indices.reshape(-1, 3)
+    numTriangles = len(triangles)
+    # vertex -> triangle adjacency, stored as offsets into a flat list of triangles
+    corners = triangles.reshape(-1)
+    adjacency = (np.argsort(corners, kind="stable") // 3).tolist()
+    offsets = np.zeros(numVertices + 1, dtype=np.int64)
+    np.cumsum(np.bincount(corners, minlength=numVertices), out=offsets[1:])
+    offsets = offsets.tolist()
+    triangles = triangles.tolist()
+    # number of triangles still to be emitted for each vertex
+    live = np.bincount(corners, minlength=numVertices).tolist()
+    cacheTime = [0] * numVertices
+    emitted = [False] * numTriangles
+    deadEnd = []
+    order = []
+    cacheSize = self.cacheSize
+    time = cacheSize + 1
+    cursor = 0
+    fan = 0 if numTriangles else -1
+    while fan >= 0:
+      candidates = []
+      for t in adjacency[offsets[fan]:offsets[fan + 1]]:
+        if emitted[t]:
+          continue
+        emitted[t] = True
+        order.append(t)
+        for v in triangles[t]:
+          candidates.append(v)
+          deadEnd.append(v)
+          live[v] -= 1
+          if time - cacheTime[v] > cacheSize:
+            cacheTime[v] = time
+            time += 1
+      # pick the next fanning vertex: the candidate that will still be in the cache once its remaining triangles are emitted,
+      # and has been in it the longest
+      fan = -1
+      best = -1
+      for v in candidates:
+        if live[v] > 0:
+          priority = 0
+          if time - cacheTime[v] + 2 * live[v] <= cacheSize:
+            priority = time - cacheTime[v]
+          if priority > best:
+            best = priority
+            fan = v
+      if fan == -1:
+        # dead end -- go back to a recently used vertex, or failing that, the next vertex with triangles left
+        while deadEnd:
+          v = deadEnd.pop()
+          if live[v] > 0:
+            fan = v
+            break
+        else:
+          while cursor < numVertices:
+            if live[cursor] > 0:
+              fan = cursor
+              break
+            cursor += 1
+    return np.array(order, dtype=np.int64)
+
+  def GetClusters(self, indices, numVertices):
+    # returns the first triangle of each cluster, for triangles already in tipsify's order
+    # runs start wherever the cache has been flushed, i.e. on triangles missing on all three vertices, which tipsify's dead ends lead to
+    misses = self.GetTriangleMisses(indices, numVertices)
+    numTriangles = len(misses)
+    runs = np.flatnonzero(misses == 3).tolist()
+    if not runs or runs[0] != 0:
+      runs.insert(0, 0)
+    runs.append(numTriangles)
+    triangles = indices.reshape(-1, 3).tolist()
+    starts = []
+    for (start, end) in zip(runs[:-1], runs[1:]):
+      # each run is split further, as soon as the cluster so far, starting from an empty cache as it will once clusters are sorted,
+      # has an ACMR within the threshold of the whole run's
+      limit = misses[start:end].sum() / (end - start) * self.overdrawThreshold
+      starts.append(start)
+      cache = deque()
+      cached = set()
+      clusterMisses = 0
+      for t in range(start, end):
+        for v in triangles[t]:
+          if v not in cached:
+            clusterMisses += 1
+            cached.add(v)
+            cache.append(v)
+            if len(cache) > self.cacheSize:
+              cached.discard(cache.popleft())
+        if t + 1 < end and clusterMisses <= limit * (t + 1 - starts[-1]):
+          starts.append(t + 1)
+          cache.clear()
+          cached.clear()
+          clusterMisses = 0
+    return np.array(starts, dtype=np.int64)
+
+  def GetClusterOrder(self, indices, positions, starts):
+    # returns the new order of triangles, with whole clusters sorted by how much they face out from the mesh's centroid
+    corners = positions[indices.reshape(-1, 3)]
+    numTriangles = len(corners)
+    normals = np.cross(corners[:, 1] - corners[:, 0], corners[:, 2] - corners[:, 0])
+    # the cross products' lengths are twice the triangles' areas, which is all the weighting needs
+    areas = np.linalg.norm(normals, axis=1)
+    centroids = corners.mean(axis=1) * areas[:, None]
+    meshCentroid = centroids.sum(axis=0) / max(areas.sum(), np.finfo(np.float64).tiny)
+    clusterAreas = np.add.reduceat(areas, starts)
+    clusterCentroids = np.add.reduceat(centroids, starts) / np.where(clusterAreas == 0, 1, clusterAreas)[:, None]
+    clusterNormals = np.add.reduceat(normals, starts)
+    lengths = np.linalg.norm(clusterNormals, axis=1)
+    clusterNormals /= np.where(lengths == 0, 1, lengths)[:, None]
+    potentials = np.einsum("ij,ij->i", clusterCentroids - meshCentroid, clusterNormals)
+    clusterOrder = np.argsort(-potentials, kind="stable")
+    counts = np.diff(np.append(starts, numTriangles))[clusterOrder]
+    # the triangles of each cluster in turn
+    return np.repeat(starts[clusterOrder] - (np.cumsum(counts) - counts), counts) + np.arange(numTriangles)
+
+  def GetVertexOrder(self, indices, numVertices):
+    # vertices in the order they're first referenced, followed by any unreferenced vertices
+    (used, firstUse) = np.unique(indices, return_index=True)
+    unused = np.setdiff1d(np.arange(numVertices), used)
+    return np.concatenate((used[np.argsort(firstUse)], unused))
+
+  def Optimize(self, mesh):
+    # reorders the mesh in place, expanding strips to a triangle list
+    # returns the ACMR and ATVR before and after optimization, and the number of overdraw clusters
+    numVertices = mesh.primitiveData["numVertices"]
+    indices = mesh.GetTriangleList().astype(np.int64)
+    (acmr, atvr) = self.GetCacheStats(indices, numVertices)
+    stats = {
+      "numTriangles": len(indices) // 3,
+      "acmrBefore": acmr,
+      "atvrBefore": atvr,
+    }
+
+    indices = indices.reshape(-1, 3)[self.GetTriangleOrder(indices, numVertices)].reshape(-1)
+    if self.overdrawThreshold is not None and "POSITION" in mesh.vertexElements and len(indices):
+      starts = self.GetClusters(indices, numVertices)
+      # positions quantized by the pod exporter are used as they are, which is close enough for sorting
+      positions = mesh.GetElementView("POSITION")[:, 0:3].astype(np.float64)
+      indices = indices.reshape(-1, 3)[self.GetClusterOrder(indices, positions, starts)].reshape(-1)
+      stats["numClusters"] = len(starts)
+    vertexOrder = self.GetVertexOrder(indices, numVertices)
+    remap = np.empty(numVertices, dtype=np.int64)
+    remap[vertexOrder] = np.arange(numVertices)
+    indices = remap[indices]
+    mesh.vertexElementData = mesh.GatherVertexData(vertexOrder)
+
+    faceType = mesh.faces["indexType"]
+    mesh.primitiveData["numStrips"] = 0
+    mesh.primitiveData["stripLengths"] = None
+    mesh.AddFaces(indices.astype(PVRFaceDataTypeMap[faceType]), faceType)
+
+    (acmr, atvr) = self.GetCacheStats(indices, numVertices)
+    stats["acmrAfter"] = acmr
+    stats["atvrAfter"] = atvr
+    return stats
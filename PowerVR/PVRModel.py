@@ -1,4 +1,8 @@
+import numpy as np
+
 from PowerVR.EPOD import *
+from PowerVR.PVRAnimation import ComposeMatrices
+from PowerVR.PVRBVH import PVRBVH
 
 class PVRModel:
   def __init__(self):
@@ -33,4 +37,136 @@ class PVRModel:
     self.units = 0.0
     self.flags = 0
 
-    self.cache = {}
\ No newline at end of file
+    self.cache = {}
+
+    # scene graph index, see BuildSceneGraph
+    self.childOffsets = None
+    self.children = None
+    self.rootNodes = None
+    self.nodeOrder = None
+    self.nodeParents = None
+    self.levelOffsets = None
+
+    # every node's rest pose, see GetRestTransforms
+    self.restTransforms = None
+
+    # world space bounds at the rest pose, see BuildBounds
+    self.nodeBounds = None
+    self.bvh = None
+
+  def BuildSceneGraph(self):
+    # the children of node i are children[childOffsets[i]:childOffsets[i + 1]], in node order
+    # nodes with no parent, or an invalid one, are treated as roots
+    numNodes = len(self.nodes)
+    nodeIndices = np.arange(numNodes)
+    parents = np.fromiter((node.parentIndex for node in self.nodes), dtype=np.int64, count=numNodes)
+    hasParent = (parents >= 0) & (parents < numNodes) & (parents != nodeIndices)
+    childNodes = nodeIndices[hasParent]
+    childParents = parents[hasParent]
+    # a stable sort keeps siblings in node order
+    self.children = childNodes[np.argsort(childParents, kind="stable")]
+    self.childOffsets = np.zeros(numNodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(childParents, minlength=numNodes), out=self.childOffsets[1:])
+    self.rootNodes = nodeIndices[~hasParent]
+    self.nodeParents = np.where(hasParent, parents, -1)
+    # breadth-first, so every node comes after its parent
+    # nodes that are only reachable through a parent cycle are left out
+    levels = []
+    level = self.rootNodes
+    while len(level):
+      levels.append(level)
+      starts = self.childOffsets[level]
+      counts = self.childOffsets[level + 1] - starts
+      # gather every child range of this level in one go
+      level = self.children[np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())]
+    self.nodeOrder = np.concatenate(levels) if levels else nodeIndices[0:0]
+    self.levelOffsets = np.cumsum([0] + [len(level) for level in levels])
+
+  def GetChildren(self, nodeIndex):
+    if self.childOffsets is None:
+      self.BuildSceneGraph()
+    return self.children[self.childOffsets[nodeIndex]:self.childOffsets[nodeIndex + 1]]
+
+  def GetRootNodes(self):
+    if self.rootNodes is None:
+      self.BuildSceneGraph()
+    return self.rootNodes
+
+  def GetNodeOrder(self):
+    if self.nodeOrder is None:
+      self.BuildSceneGraph()
+    return self.nodeOrder
+
+  def BuildBounds(self, meshBounds=None, leafSize=4):
+    # nodeBounds[i] is the (2, 3) world space minimum and maximum of node i's mesh and everything below it,
+    # or +inf and -inf if there are no meshes there
+    # bvh indexes the mesh nodes by the bounds of their own meshes, see PVRBVH
+    # meshBounds has each mesh's bounds, or None for meshes without positions, and defaults to the meshes' own
+    if meshBounds is None:
+      meshBounds = [mesh.GetBounds() for mesh in self.meshes]
+    numNodes = len(self.nodes)
+    bounds = np.empty((numNodes, 2, 3))
+    bounds[:, 0] = np.inf
+    bounds[:, 1] = -np.inf
+    meshNodes = [nodeIndex for (nodeIndex, node) in enumerate(self.nodes) if 0 <= node.index < len(meshBounds) and meshBounds[node.index] is not None]
+    if meshNodes:
+      local = np.array([meshBounds[self.nodes[nodeIndex].index] for nodeIndex in meshNodes])
+      world = self.GetWorldMatrices()[meshNodes]
+      # boxes are transformed by their center and half extent, which gives the tightest box around the transformed box
+      centers = local.mean(axis=1)
+      extents = (local[:, 1] - local[:, 0]) / 2
+      worldCenters = np.einsum("nij,nj->ni", world[:, 0:3, 0:3], centers) + world[:, 0:3, 3]
+      worldExtents = np.einsum("nij,nj->ni", np.abs(world[:, 0:3, 0:3]), extents)
+      bounds[meshNodes, 0] = worldCenters - worldExtents
+      bounds[meshNodes, 1] = worldCenters + worldExtents
+    self.bvh = PVRBVH(leafSize).Build(bounds[meshNodes], meshNodes)
+    # deepest level first, so that every level's bounds are finished before they're added to their parents'
+    for level in self.GetLevels()[:0:-1]:
+      parents = self.nodeParents[level]
+      np.minimum.at(bounds[:, 0], parents, bounds[level, 0])
+      np.maximum.at(bounds[:, 1], parents, bounds[level, 1])
+    self.nodeBounds = bounds
+
+  def GetNodeBounds(self):
+    if self.nodeBounds is None:
+      self.BuildBounds()
+    return self.nodeBounds
+
+  def GetBVH(self):
+    if self.bvh is None:
+      self.BuildBounds()
+    return self.bvh
+
+  def GetLevels(self):
+    # the node order split up by depth, starting with the root nodes
+    if self.levelOffsets is None:
+      self.BuildSceneGraph()
+    offsets = self.levelOffsets.tolist()
+    return [self.nodeOrder[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+  def GetRestTransforms(self):
+    # (translations, rotations, scales) float32 arrays of every node's rest pose, which is the first frame of its animation
+    # shaped (numNodes, 3), (numNodes, 4) and (numNodes, 3)
+    if self.restTransforms is None:
+      transforms = [node.animation.GetTransforms(1) for node in self.nodes]
+      if transforms:
+        self.restTransforms = tuple(np.concatenate([transform[i][0:1] for transform in transforms]) for i in range(3))
+      else:
+        self.restTransforms = (np.zeros((0, 3), dtype=np.float32), np.zeros((0, 4), dtype=np.float32), np.zeros((0, 3), dtype=np.float32))
+    return self.restTransforms
+
+  def GetWorldMatrices(self):
+    # (numNodes, 4, 4) row-major world matrices for every node's rest pose
+    numNodes = len(self.nodes)
+    world = np.tile(np.identity(4), (numNodes, 1, 1))
+    if numNodes == 0:
+      return world
+    local = ComposeMatrices(*self.GetRestTransforms())
+    # a level at a time, as parents are always on the level before their children
+    # nodes that are only reachable through a parent cycle are left at the identity
+    levels = self.GetLevels()
+    if levels:
+      world[levels[0]] = local[levels[0]]
+    for level in levels[1:]:
+      world[level] = world[self.nodeParents[level]] @ local[level]
+    return world
@@ -0,0 +1,25 @@
+# file-like wrapper that reports reads and skips to an observer, used by PVRPODLoader when profiling
+# the loader only ever seeks relative to the current position to skip over a tag's payload,
+# so relative seeks are reported as skips
+
+class PVRObservedStream:
+  def __init__(self, stream, observer):
+    self.stream = stream
+    self.observer = observer
+
+  def read(self, length=-1):
+    data = self.stream.read(length)
+    self.observer.OnRead(len(data))
+    return data
+
+  def seek(self, offset, whence=0):
+    if whence == 1:
+      self.observer.OnSkip(offset)
+    return self.stream.seek(offset, whence)
+
+  def tell(self):
+    return self.stream.tell()
+
+  def close(self):
+    if hasattr(self.stream, "close"):
+      self.stream.close()
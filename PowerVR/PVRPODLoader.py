@@ -1,7 +1,12 @@
 import struct
 import array
+import numpy as np
 
 from PowerVR.EPOD import *
+from PowerVR.PVRMemoryStream import PVRMemoryStream
+from PowerVR.PVRObservedStream import PVRObservedStream
+from PowerVR.PVRLazyList import PVRLazyList
+from PowerVR.PVRPODSchema import *
 from PowerVR.PVRModel import PVRModel
 from PowerVR.PVRMesh import PVRMesh, EPVRMesh
 from PowerVR.PVRMaterial import PVRMaterial, EPVRMaterial
@@ -12,389 +17,206 @@ from PowerVR.PVRNode import PVRNode
 
 # https://github.com/powervr-graphics/WebGL_SDK/blob/4.0/Tools/PVRPODLoader.js
 
+# array typecodes -> little-endian numpy dtypes, used when reading from a memory mapped file
+PVRArrayTypeMap = {
+  'f': '<f4',
+  'H': '<u2',
+  'I': '<u4',
+}
+
+# scene blocks that are handed out one at a time in streaming mode, see ReadItems
+PVRStreamedBlocks = {
+  EPODIdentifiers.eSceneMesh:     ("meshes", "ReadMeshBlock"),
+  EPODIdentifiers.eSceneNode:     ("nodes", "ReadNodeBlock"),
+  EPODIdentifiers.eSceneTexture:  ("textures", "ReadTextureBlock"),
+  EPODIdentifiers.eSceneMaterial: ("materials", "ReadMaterialBlock"),
+}
+
+class PVRPODFormatError(ValueError):
+  pass
+
 class PVRPODLoader:
-  def __init__(self, stream):
+  def __init__(self, stream, lazy=False, observer=None, streaming=False):
     self.stream = stream
+    # tags whose payloads run past the end of the stream are from a truncated file
+    position = stream.tell()
+    self.streamSize = stream.seek(0, 2)
+    stream.seek(position)
+    # when reading from a memory map, arrays are numpy views into the mapping rather than copies
+    self.zeroCopy = isinstance(stream, PVRMemoryStream)
+    # in lazy mode scene child blocks are only indexed, and get decoded on first access
+    # the stream must stay open for as long as the scene is in use
+    self.lazy = lazy
+    # the observer gets OnTag(ident, length) for every tag read, OnSkip(length) for every tag payload skipped
+    # (including blocks that are only indexed in lazy mode), and OnRead(numBytes) for every read from the stream
+    # without one the loader runs as if there were no profiling at all
+    self.observer = observer
+    if observer is not None:
+      self.stream = PVRObservedStream(stream, observer)
+      self.ReadTag = self.ReadObservedTag
     self.scene = None
     self.versionString = None
-    self.Read()
+    # in streaming mode nothing is read up front, and the scene is read a block at a time through ReadItems
+    if not streaming:
+      self.Read()
 
   @classmethod
-  def open(cls, path):
+  def open(cls, path, memoryMap=False, lazy=False, observer=None, streaming=False):
+    if memoryMap:
+      return cls(PVRMemoryStream.open(path), lazy=lazy, observer=observer, streaming=streaming)
+    if lazy or streaming:
+      return cls(open(path, "rb"), lazy=lazy, observer=observer, streaming=streaming)
     with open(path, "rb") as buffer:
-      return cls(buffer)
-  
-  def Read(self):
-    for (ident, length) in self.ReadTags():
-      # Read version block
-      if ident == EPODIdentifiers.eFormatVersion | EPODDefines.startTagMask:
-        self.versionString = self.ReadString(length)
-      
-      # Read scene block
-      elif ident == EPODIdentifiers.eScene | EPODDefines.startTagMask:
-        self.scene = self.ReadSceneBlock()
-      
-      # Skip unimplemented block types
-      else:
-        self.stream.seek(length, 1)
-
-  def ReadTag(self):
-    try:
-      return struct.unpack("<II", self.stream.read(8))
-    except struct.error:
-      return None
-  
-  def ReadTags(self):
-    tag = self.ReadTag()
-    while tag:
-      yield tag
-      tag = self.ReadTag()
-
-  def ReadSceneBlock(self):
-    model = PVRModel()
-    for (ident, length) in self.ReadTags():
-
-      if ident == EPODIdentifiers.eScene | EPODDefines.endTagMask:
-        # do final checks, break tag loop
-        return model
-
-      elif ident == EPODIdentifiers.eSceneClearColour | EPODDefines.startTagMask:
-        model.clearColour = array.array('f', self.stream.read(12))
-
-      elif ident == EPODIdentifiers.eSceneAmbientColour | EPODDefines.startTagMask:
-        model.ambientColour = array.array('f', self.stream.read(12))
-
-      elif ident == EPODIdentifiers.eSceneNumCameras | EPODDefines.startTagMask:
-        model.numCameras = struct.unpack("<i", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eSceneNumLights | EPODDefines.startTagMask:
-        model.numLights = struct.unpack("<i", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eSceneNumMeshes | EPODDefines.startTagMask:
-        model.numMeshes = struct.unpack("<i", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eSceneNumNodes | EPODDefines.startTagMask:
-        model.numNodes = struct.unpack("<i", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eSceneNumMeshNodes | EPODDefines.startTagMask:
-        model.numMeshNodes = struct.unpack("<i", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eSceneNumTextures | EPODDefines.startTagMask:
-        model.numTextures = struct.unpack("<i", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eSceneNumMaterials | EPODDefines.startTagMask:
-        model.numMaterials = struct.unpack("<i", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eSceneNumFrames | EPODDefines.startTagMask:
-        model.numFrames = struct.unpack("<i", self.stream.read(4))[0]
+      return cls(buffer, observer=observer)
 
-      elif ident == EPODIdentifiers.eSceneFlags | EPODDefines.startTagMask:
-        model.flags = struct.unpack("<i", self.stream.read(4))[0]
+  def close(self):
+    # in memory mapped mode this unmaps the file, so the scene's arrays mustn't be in use any more
+    if hasattr(self.stream, "close"):
+      self.stream.close()
 
-      elif ident == EPODIdentifiers.eSceneFPS | EPODDefines.startTagMask:
-        model.fps = struct.unpack("<i", self.stream.read(4))[0]
-        
-      elif ident == EPODIdentifiers.eSceneUserData | EPODDefines.startTagMask:
-        model.userData = self.stream.read(length)
+  def __enter__(self):
+    return self
 
-      elif ident == EPODIdentifiers.eSceneUnits | EPODDefines.startTagMask:
-        model.units = struct.unpack("<i", self.stream.read(4))[0]
+  def __exit__(self, *exc):
+    self.close()
 
-      elif ident == EPODIdentifiers.eSceneCamera | EPODDefines.startTagMask:
-        print("camera not implemented")
-        self.stream.read(length)
-
-      elif ident == EPODIdentifiers.eSceneLight | EPODDefines.startTagMask:
-        print("light not implemented")
-        self.stream.read(length)
-
-      elif ident == EPODIdentifiers.eSceneMesh | EPODDefines.startTagMask:
-        mesh = self.ReadMeshBlock()
-        model.meshes.append(mesh)
-
-      elif ident == EPODIdentifiers.eSceneNode | EPODDefines.startTagMask:
-        node = self.ReadNodeBlock()
-        model.nodes.append(node)
-
-      elif ident == EPODIdentifiers.eSceneTexture | EPODDefines.startTagMask:
-        texture = self.ReadTextureBlock()
-        model.textures.append(texture)
-
-      elif ident == EPODIdentifiers.eSceneMaterial | EPODDefines.startTagMask:
-        material = self.ReadMaterialBlock()
-        model.materials.append(material)
+  def Read(self):
+    self.ReadBlock(PVRFileSchema, self)
+    self.CheckScene()
 
-      # Skip unimplemented block types
-      else:
-        self.stream.seek(length, 1)
-
-  def ReadNodeBlock(self):
-    node = PVRNode()
-    animation = node.animation
-    isOldFormat = False
+  def CheckScene(self):
+    if self.scene is None:
+      raise PVRPODFormatError("no scene found, this isn't a .pod file")
 
+  def ReadBlock(self, schema, target):
+    handlers = schema.handlers
+    endTag = schema.endTag
     for (ident, length) in self.ReadTags():
-      if ident == EPODIdentifiers.eSceneNode | EPODDefines.endTagMask:
-        # do final checks
-        return node
-
-      elif ident == EPODIdentifiers.eNodeIndex | EPODDefines.startTagMask:
-        node.index = struct.unpack("<i", self.stream.read(4))[0]
-      
-      elif ident == EPODIdentifiers.eNodeName | EPODDefines.startTagMask:
-        node.name = self.ReadString(length)
-      
-      elif ident == EPODIdentifiers.eNodeMaterialIndex | EPODDefines.startTagMask:
-        node.materialIndex = struct.unpack("<i", self.stream.read(4))[0]
-      
-      elif ident == EPODIdentifiers.eNodeParentIndex | EPODDefines.startTagMask:
-        node.parentIndex = struct.unpack("<i", self.stream.read(4))[0]
-      
-      elif ident == EPODIdentifiers.eNodePosition | EPODDefines.startTagMask: # Deprecated
-        pos = array.array('f', self.stream.read(length))
-        isOldFormat = True;
-      
-      elif ident == EPODIdentifiers.eNodeRotation | EPODDefines.startTagMask: # Deprecated
-        rotation = array.array('f', self.stream.read(length))
-        isOldFormat = True;
-      
-      elif ident == EPODIdentifiers.eNodeScale | EPODDefines.startTagMask: # Deprecated
-        scale = array.array('f', self.stream.read(length))
-        isOldFormat = True;
-      		
-      elif ident == EPODIdentifiers.eNodeMatrix | EPODDefines.startTagMask:	# Deprecated
-        matrix = array.array('f', self.stream.read(length))
-        isOldFormat = True;
-      
-      elif ident == EPODIdentifiers.eNodeAnimationPosition | EPODDefines.startTagMask:
-        animation.positions = array.array('f', self.stream.read(length))
-      
-      elif ident == EPODIdentifiers.eNodeAnimationRotation | EPODDefines.startTagMask:
-        animation.rotations = array.array('f', self.stream.read(length))
-      
-      elif ident == EPODIdentifiers.eNodeAnimationScale | EPODDefines.startTagMask:
-        animation.scales = array.array('f', self.stream.read(length))
-      
-      elif ident == EPODIdentifiers.eNodeAnimationMatrix | EPODDefines.startTagMask:
-        animation.matrices = array.array('f', self.stream.read(length))
-      
-      elif ident == EPODIdentifiers.eNodeAnimationFlags | EPODDefines.startTagMask:
-        animation.flags = struct.unpack("<I", self.stream.read(4))[0]
-      
-      elif ident == EPODIdentifiers.eNodeAnimationPositionIndex | EPODDefines.startTagMask:
-        animation.positionIndices = array.array('L', self.stream.read(length))
-      
-      elif ident == EPODIdentifiers.eNodeAnimationRotationIndex | EPODDefines.startTagMask:
-        animation.rotationIndices = array.array('L', self.stream.read(length))
-      
-      elif ident == EPODIdentifiers.eNodeAnimationScaleIndex | EPODDefines.startTagMask:
-        animation.scaleIndices = array.array('L', self.stream.read(length))
-      
-      elif ident == EPODIdentifiers.eNodeAnimationMatrixIndex | EPODDefines.startTagMask:
-        animation.matrixIndices = array.array('L', self.stream.read(length))
-      
-      elif ident == EPODIdentifiers.eNodeUserData | EPODDefines.startTagMask:
-        node.userData = self.stream.read(length)
-      
-      # skip unkown blocks
-      else:
+      if ident == endTag:
+        break
+      handler = handlers.get(ident)
+      if handler is None:
+        # Skip unimplemented block types
         self.stream.seek(length, 1)
-
-  def ReadMeshBlock(self):
-    mesh = PVRMesh()
-    numUVWs = 0
-    podUVWs = 0
-    interleavedDataIndex = -1
+      else:
+        handler(self, target, ident, length)
+    else:
+      if endTag is not None:
+        self.MissingEndTag(endTag)
+    return target
+
+  def ReadItems(self):
+    # yields a (listName, index, item) tuple for each mesh, node, texture and material as soon as it's been read,
+    # e.g. ("meshes", 0, mesh), without keeping any of them, so memory use is bounded by the largest single block
+    # the scene's own fields are read into self.scene as they come, but its lists are left empty
+    handlers = PVRFileSchema.handlers
     for (ident, length) in self.ReadTags():
-
-      if ident == EPODIdentifiers.eSceneMesh | EPODDefines.endTagMask:
-        # do final checks
-        # break tag loop
-        return mesh
-
-      elif ident == EPODIdentifiers.eMeshNumVertices | EPODDefines.startTagMask:
-        mesh.primitiveData["numVertices"] = struct.unpack("<I", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eMeshNumFaces | EPODDefines.startTagMask:
-        mesh.primitiveData["numFaces"] = struct.unpack("<I", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eMeshNumUVWChannels | EPODDefines.startTagMask:
-        podUVWs = struct.unpack("<i", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eMeshStripLength | EPODDefines.startTagMask:
-        mesh.primitiveData["stripLengths"] = array.array('L', self.stream.read(length))
-
-      elif ident == EPODIdentifiers.eMeshNumStrips | EPODDefines.startTagMask:
-        mesh.primitiveData["numStrips"] = struct.unpack("<I", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eMeshInteravedDataList | EPODDefines.startTagMask:
-        mesh.AddData(self.stream.read(length))
-
-      elif ident == EPODIdentifiers.eMeshBoneBatchIndexList | EPODDefines.startTagMask:
-        mesh.boneBatches["batches"] = array.array('L', self.stream.read(length))
-
-      elif ident == EPODIdentifiers.eMeshNumBoneIndicesPerBatch | EPODDefines.startTagMask:
-        mesh.boneBatches["boneCounts"] = array.array('L', self.stream.read(length))
-
-      elif ident == EPODIdentifiers.eMeshBoneOffsetPerBatch | EPODDefines.startTagMask:
-        mesh.boneBatches["offsets"] = array.array('L', self.stream.read(length))
-
-      elif ident == EPODIdentifiers.eMeshMaxNumBonesPerBatch | EPODDefines.startTagMask:
-        mesh.boneBatches["boneMax"] = struct.unpack("<I", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eMeshMaxNumBonesPerBatch | EPODDefines.startTagMask:
-        mesh.boneBatches["count"] = struct.unpack("<I", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eMeshUnpackMatrix | EPODDefines.startTagMask:
-        mesh.unpackMatrix = array.array('f', self.stream.read(length))
-
-      elif ident == EPODIdentifiers.eMeshUnpackMatrix | EPODDefines.startTagMask:
-        mesh.unpackMatrix = array.array('f', self.stream.read(length))
-
-      elif ident == EPODIdentifiers.eMeshVertexIndexList | EPODDefines.startTagMask:
-        (data, dataType) = self.ReadVertexIndexData()
-        mesh.AddFaces(data, dataType)
-
-      elif ident == EPODIdentifiers.eMeshVertexList | EPODDefines.startTagMask:
-        self.ReadVertexData(mesh, "POSITION", ident, interleavedDataIndex)
-
-      elif ident == EPODIdentifiers.eMeshNormalList | EPODDefines.startTagMask:
-        self.ReadVertexData(mesh, "NORMAL", ident, interleavedDataIndex)
-
-      elif ident == EPODIdentifiers.eMeshTangentList | EPODDefines.startTagMask:
-        self.ReadVertexData(mesh, "TANGENT", ident, interleavedDataIndex)
-
-      elif ident == EPODIdentifiers.eMeshBinormalList | EPODDefines.startTagMask:
-        self.ReadVertexData(mesh, "BINORMAL", ident, interleavedDataIndex)
-
-      elif ident == EPODIdentifiers.eMeshUVWList | EPODDefines.startTagMask:
-        self.ReadVertexData(mesh, "TEXCOORD_" + str(numUVWs), ident, interleavedDataIndex)
-        numUVWs += 1
-      
-      elif ident == EPODIdentifiers.eMeshVertexColourList | EPODDefines.startTagMask:
-        self.ReadVertexData(mesh, "COLOR_0", ident, interleavedDataIndex)
-      
-      elif ident == EPODIdentifiers.eMeshBoneIndexList | EPODDefines.startTagMask:
-        self.ReadVertexData(mesh, "JOINTS_0", ident, interleavedDataIndex)
-      
-      elif ident == EPODIdentifiers.eMeshBoneWeightList | EPODDefines.startTagMask:
-        self.ReadVertexData(mesh, "WEIGHTS_0", ident, interleavedDataIndex)
-
+      if ident == EPODIdentifiers.eScene:
+        self.scene = PVRModel()
+        yield from self.ReadSceneItems(self.scene)
+      elif ident in handlers:
+        handlers[ident](self, self, ident, length)
       else:
         self.stream.seek(length, 1)
+    self.CheckScene()
 
-  def ReadTextureBlock(self):
-    texture = PVRTexture()
+  def ReadSceneItems(self, model):
+    handlers = PVRSceneSchema.handlers
+    endTag = PVRSceneSchema.endTag
+    counts = {}
     for (ident, length) in self.ReadTags():
-      if ident == EPODIdentifiers.eSceneTexture | EPODDefines.endTagMask:
-        # do final checks
-        return texture
-
-      elif ident == EPODIdentifiers.eTextureFilename | EPODDefines.startTagMask:
-        texture.setName(self.ReadString(length))
-        
-      # skip unkown blocks
+      if ident == endTag:
+        break
+      streamed = PVRStreamedBlocks.get(ident)
+      if streamed is not None:
+        (listName, readerName) = streamed
+        index = counts.get(listName, 0)
+        counts[listName] = index + 1
+        yield (listName, index, getattr(self, readerName)())
+      elif ident in handlers:
+        handlers[ident](self, model, ident, length)
       else:
+        # Skip unimplemented block types
         self.stream.seek(length, 1)
-
-  def ReadMaterialBlock(self):
-    material = PVRMaterial()
-
+    else:
+      self.MissingEndTag(endTag)
+
+  def ReadChildBlock(self, items, reader, blockIdentifier):
+    if self.lazy:
+      self.IndexBlock(items, blockIdentifier)
+    else:
+      items.append(reader())
+
+  def IndexBlock(self, blocks, blockIdentifier):
+    # walk over the block's tags without decoding them, recording where its contents start and end
+    offset = self.stream.tell()
     for (ident, length) in self.ReadTags():
-      if ident == EPODIdentifiers.eSceneMaterial | EPODDefines.endTagMask:
-        # do final checks
-        return material
-
-      elif ident == EPODIdentifiers.eMaterialName | EPODDefines.startTagMask:
-        material.name = self.ReadString(length)
-
-      elif ident == EPODIdentifiers.eMaterialDiffuseTextureIndex | EPODDefines.startTagMask:
-        material.diffuseTextureIndex = struct.unpack("<i", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eMaterialOpacity | EPODDefines.startTagMask:
-        material.opacity = struct.unpack("<f", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eMaterialAmbientColour | EPODDefines.startTagMask:
-        material.ambient = array.array('f', self.stream.read(12))
-        
-      elif ident == EPODIdentifiers.eMaterialDiffuseColour | EPODDefines.startTagMask:
-        material.diffuse = array.array('f', self.stream.read(12))
-
-      elif ident == EPODIdentifiers.eMaterialSpecularColour | EPODDefines.startTagMask:
-        material.specular = array.array('f', self.stream.read(12))
-
-      elif ident == EPODIdentifiers.eMaterialShininess | EPODDefines.startTagMask:
-        material.specular = struct.unpack("<f", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eMaterialEffectFile | EPODDefines.startTagMask:
-        material.effectFile = self.ReadString(length)
-
-      elif ident == EPODIdentifiers.eMaterialEffectName | EPODDefines.startTagMask:
-        material.effectName = self.ReadString(length)
-
-      elif ident == EPODIdentifiers.eMaterialAmbientTextureIndex | EPODDefines.startTagMask:
-        material.ambientTextureIndex = struct.unpack("<i", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eMaterialSpecularColourTextureIndex | EPODDefines.startTagMask:
-        material.specularColourTextureIndex = struct.unpack("<i", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eMaterialSpecularLevelTextureIndex | EPODDefines.startTagMask:
-        material.specularLevelTextureIndex = struct.unpack("<i", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eMaterialBumpMapTextureIndex | EPODDefines.startTagMask:
-        material.bumpMapTextureIndex = struct.unpack("<i", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eMaterialEmissiveTextureIndex | EPODDefines.startTagMask:
-        material.emissiveTextureIndex = struct.unpack("<i", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eMaterialGlossinessTextureIndex | EPODDefines.startTagMask:
-        material.glossinessTextureIndex = struct.unpack("<i", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eMaterialOpacityTextureIndex | EPODDefines.startTagMask:
-        material.opacityTextureIndex = struct.unpack("<i", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eMaterialReflectionTextureIndex | EPODDefines.startTagMask:
-        material.reflectionTextureIndex = struct.unpack("<i", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eMaterialRefractionTextureIndex | EPODDefines.startTagMask:
-        material.refractionTextureIndex = struct.unpack("<i", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eMaterialBlendingRGBSrc | EPODDefines.startTagMask:
-        material.blendSrcRGB = struct.unpack("<I", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eMaterialBlendingAlphaSrc | EPODDefines.startTagMask:
-        material.blendSrcA = struct.unpack("<I", self.stream.read(4))[0]
-
-      elif ident == EPODIdentifiers.eMaterialBlendingRGBDst | EPODDefines.startTagMask:
-        material.blendDstRGB = struct.unpack("<I", self.stream.read(4))[0]
+      if ident == blockIdentifier | EPODDefines.endTagMask:
+        break
+      self.stream.seek(length, 1)
+    else:
+      self.MissingEndTag(blockIdentifier | EPODDefines.endTagMask)
+    return blocks.AddBlock(offset, self.stream.tell() - offset)
 
-      elif ident == EPODIdentifiers.eMaterialBlendingAlphaDst | EPODDefines.startTagMask:
-        material.blendDstA = struct.unpack("<I", self.stream.read(4))[0]
+  def ReadTag(self):
+    # None at the end of the stream
+    data = self.stream.read(8)
+    if len(data) < 8:
+      if len(data):
+        raise PVRPODFormatError("the .pod file ends in the middle of a tag")
+      return None
+    (ident, length) = struct.unpack("<II", data)
+    if self.stream.tell() + length > self.streamSize:
+      raise PVRPODFormatError("tag %d runs past the end of the .pod file, which is truncated or not a .pod file at all" % ident)
+    return (ident, length)
 
-      elif ident == EPODIdentifiers.eMaterialBlendingRGBOperation | EPODDefines.startTagMask:
-        material.blendOpRGB = struct.unpack("<I", self.stream.read(4))[0]
+  def MissingEndTag(self, endTag):
+    raise PVRPODFormatError("the .pod file ends before end tag %d, so it's truncated" % endTag)
+  
+  def ReadObservedTag(self):
+    tag = PVRPODLoader.ReadTag(self)
+    if tag:
+      self.observer.OnTag(*tag)
+    return tag
 
-      elif ident == EPODIdentifiers.eMaterialBlendingAlphaOperation | EPODDefines.startTagMask:
-        material.blendOpA = struct.unpack("<I", self.stream.read(4))[0]
+  def ReadTags(self):
+    tag = self.ReadTag()
+    while tag:
+      yield tag
+      tag = self.ReadTag()
 
-      elif ident == EPODIdentifiers.eMaterialBlendingRGBAColour | EPODDefines.startTagMask:
-        material.blendColour = array.array('f', self.stream.read(length))
+  def ReadSceneBlock(self):
+    model = PVRModel()
+    if self.lazy:
+      model.meshes = PVRLazyList(self, self.ReadMeshBlock)
+      model.nodes = PVRLazyList(self, self.ReadNodeBlock)
+      model.textures = PVRLazyList(self, self.ReadTextureBlock)
+      model.materials = PVRLazyList(self, self.ReadMaterialBlock)
+    model = self.ReadBlock(PVRSceneSchema, model)
+    # when lazy, the scene graph is built on first use instead, since it needs every node to be read
+    if not self.lazy:
+      model.BuildSceneGraph()
+    return model
 
-      elif ident == EPODIdentifiers.eMaterialBlendingFactorArray | EPODDefines.startTagMask:
-        material.blendFactor =  array.array('f', self.stream.read(length))
+  def ReadNodeBlock(self):
+    return self.ReadBlock(PVRNodeSchema, PVRNode())
 
-      elif ident == EPODIdentifiers.eMaterialFlags | EPODDefines.startTagMask:
-        material.flags = struct.unpack("<I", self.stream.read(4))[0]
+  def ReadMeshBlock(self):
+    return self.ReadBlock(PVRMeshSchema, PVRMesh())
 
-      elif ident == EPODIdentifiers.eMaterialUserData | EPODDefines.startTagMask:
-        material.userData = self.stream.read(length)
+  def ReadTextureBlock(self):
+    return self.ReadBlock(PVRTextureSchema, PVRTexture())
 
-      # skip unkown blocks
-      else:
-        self.stream.seek(length, 1)
+  def ReadMaterialBlock(self):
+    return self.ReadBlock(PVRMaterialSchema, PVRMaterial())
 
   def ReadString(self, length):
-    return self.stream.read(length).decode("utf-8").strip("\x00")
+    return str(self.stream.read(length), "utf-8").strip("\x00")
+
+  def ReadArray(self, typecode, length):
+    if self.zeroCopy:
+      return np.frombuffer(self.stream.read(length), dtype=PVRArrayTypeMap[typecode])
+    return array.array(typecode, self.stream.read(length))
 
   def ReadVertexIndexData(self):
     data = None
@@ -415,12 +237,13 @@ class PVRPODLoader:
 
       elif ident == EPODIdentifiers.eBlockData | EPODDefines.startTagMask:
         if dataType == EPVRMesh.FaceData.e16Bit:
-          data = array.array('H', self.stream.read(length))
+          data = self.ReadArray('H', length)
         elif dataType == EPVRMesh.FaceData.e32Bit:
-          data = array.array('L', self.stream.read(length))
+          data = self.ReadArray('I', length)
       
       else:
         self.stream.seek(length, 1)
+    self.MissingEndTag(EPODIdentifiers.eMeshVertexIndexList | EPODDefines.endTagMask)
 
   def ReadVertexData(self, mesh, semanticName, blockIdentifier, dataIndex):
     numComponents = 0
@@ -454,3 +277,5 @@ class PVRPODLoader:
 
       else: 
         self.stream.seek(length, 1)
+    else:
+      self.MissingEndTag(blockIdentifier | EPODDefines.endTagMask)
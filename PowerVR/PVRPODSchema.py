@@ -0,0 +1,198 @@
+import struct
+
+from PowerVR.EPOD import *
+
+# declarative tag layout for each POD block
+# every block schema maps a start tag to a handler(loader, target, ident, length) that decodes the tag's payload
+# into the block's target object, so tags are dispatched with a single dict lookup
+
+def Setter(path):
+  # "name" sets target.name, "child.name" sets target.child.name and ("dict", "key") sets target.dict["key"]
+  if isinstance(path, str):
+    if "." in path:
+      (attr, name) = path.split(".")
+      return lambda target, value: setattr(getattr(target, attr), name, value)
+    return lambda target, value: setattr(target, path, value)
+  (attr, key) = path
+  return lambda target, value: getattr(target, attr).__setitem__(key, value)
+
+def Scalar(fmt, path):
+  unpack = struct.Struct(fmt).unpack_from
+  setter = Setter(path)
+  def handler(loader, target, ident, length):
+    setter(target, unpack(loader.stream.read(length))[0])
+  return handler
+
+def Int(path):
+  return Scalar("<i", path)
+
+def UInt(path):
+  return Scalar("<I", path)
+
+def Float(path):
+  return Scalar("<f", path)
+
+def Array(typecode, path):
+  setter = Setter(path)
+  def handler(loader, target, ident, length):
+    setter(target, loader.ReadArray(typecode, length))
+  return handler
+
+def String(path):
+  setter = Setter(path)
+  def handler(loader, target, ident, length):
+    setter(target, loader.ReadString(length))
+  return handler
+
+def Bytes(path):
+  setter = Setter(path)
+  def handler(loader, target, ident, length):
+    setter(target, loader.stream.read(length))
+  return handler
+
+def Child(listName, readerName):
+  # nested scene block, e.g. a mesh or node
+  def handler(loader, model, ident, length):
+    loader.ReadChildBlock(getattr(model, listName), getattr(loader, readerName), ident)
+  return handler
+
+def Unsupported(name):
+  def handler(loader, target, ident, length):
+    print(name, "not implemented")
+    loader.stream.seek(length, 1)
+  return handler
+
+def VertexList(semantic):
+  def handler(loader, mesh, ident, length):
+    loader.ReadVertexData(mesh, semantic, ident, -1)
+  return handler
+
+def UVWList(loader, mesh, ident, length):
+  # UVW channels are numbered in the order they appear in the mesh block
+  channel = sum(1 for name in mesh.vertexElements if name.startswith("TEXCOORD_"))
+  loader.ReadVertexData(mesh, "TEXCOORD_" + str(channel), ident, -1)
+
+def VertexIndexList(loader, mesh, ident, length):
+  (data, dataType) = loader.ReadVertexIndexData()
+  mesh.AddFaces(data, dataType)
+
+def InterleavedDataList(loader, mesh, ident, length):
+  mesh.AddData(loader.stream.read(length))
+
+def TextureFilename(loader, texture, ident, length):
+  texture.setName(loader.ReadString(length))
+
+class PODSchema:
+  def __init__(self, blockIdentifier, fields):
+    # top level tags have no enclosing block, so they never see an end tag
+    self.endTag = None if blockIdentifier is None else blockIdentifier | EPODDefines.endTagMask
+    self.handlers = {}
+    for ident in fields:
+      self.AddField(ident, fields[ident])
+
+  def AddField(self, ident, handler):
+    self.handlers[ident | EPODDefines.startTagMask] = handler
+
+PVRFileSchema = PODSchema(None, {
+  EPODIdentifiers.eFormatVersion: String("versionString"),
+  EPODIdentifiers.eScene:         lambda loader, target, ident, length: setattr(target, "scene", loader.ReadSceneBlock()),
+})
+
+PVRSceneSchema = PODSchema(EPODIdentifiers.eScene, {
+  EPODIdentifiers.eSceneClearColour:   Array('f', "clearColour"),
+  EPODIdentifiers.eSceneAmbientColour: Array('f', "ambientColour"),
+  EPODIdentifiers.eSceneNumCameras:    Int("numCameras"),
+  EPODIdentifiers.eSceneNumLights:     Int("numLights"),
+  EPODIdentifiers.eSceneNumMeshes:     Int("numMeshes"),
+  EPODIdentifiers.eSceneNumNodes:      Int("numNodes"),
+  EPODIdentifiers.eSceneNumMeshNodes:  Int("numMeshNodes"),
+  EPODIdentifiers.eSceneNumTextures:   Int("numTextures"),
+  EPODIdentifiers.eSceneNumMaterials:  Int("numMaterials"),
+  EPODIdentifiers.eSceneNumFrames:     Int("numFrames"),
+  EPODIdentifiers.eSceneFlags:         Int("flags"),
+  EPODIdentifiers.eSceneFPS:           Int("fps"),
+  EPODIdentifiers.eSceneUserData:      Bytes("userData"),
+  EPODIdentifiers.eSceneUnits:         Int("units"),
+  EPODIdentifiers.eSceneCamera:        Unsupported("camera"),
+  EPODIdentifiers.eSceneLight:         Unsupported("light"),
+  EPODIdentifiers.eSceneMesh:          Child("meshes", "ReadMeshBlock"),
+  EPODIdentifiers.eSceneNode:          Child("nodes", "ReadNodeBlock"),
+  EPODIdentifiers.eSceneTexture:       Child("textures", "ReadTextureBlock"),
+  EPODIdentifiers.eSceneMaterial:      Child("materials", "ReadMaterialBlock"),
+})
+
+# the deprecated eNodePosition/Rotation/Scale/Matrix tags are left out, so they get skipped
+PVRNodeSchema = PODSchema(EPODIdentifiers.eSceneNode, {
+  EPODIdentifiers.eNodeIndex:                  Int("index"),
+  EPODIdentifiers.eNodeName:                   String("name"),
+  EPODIdentifiers.eNodeMaterialIndex:          Int("materialIndex"),
+  EPODIdentifiers.eNodeParentIndex:            Int("parentIndex"),
+  EPODIdentifiers.eNodeAnimationPosition:      Array('f', "animation.positions"),
+  EPODIdentifiers.eNodeAnimationRotation:      Array('f', "animation.rotations"),
+  EPODIdentifiers.eNodeAnimationScale:         Array('f', "animation.scales"),
+  EPODIdentifiers.eNodeAnimationMatrix:        Array('f', "animation.matrices"),
+  EPODIdentifiers.eNodeAnimationFlags:         UInt("animation.flags"),
+  EPODIdentifiers.eNodeAnimationPositionIndex: Array('I', "animation.positionIndices"),
+  EPODIdentifiers.eNodeAnimationRotationIndex: Array('I', "animation.rotationIndices"),
+  EPODIdentifiers.eNodeAnimationScaleIndex:    Array('I', "animation.scaleIndices"),
+  EPODIdentifiers.eNodeAnimationMatrixIndex:   Array('I', "animation.matrixIndices"),
+  EPODIdentifiers.eNodeUserData:               Bytes("userData"),
+})
+
+PVRMeshSchema = PODSchema(EPODIdentifiers.eSceneMesh, {
+  EPODIdentifiers.eMeshNumVertices:            UInt(("primitiveData", "numVertices")),
+  EPODIdentifiers.eMeshNumFaces:               UInt(("primitiveData", "numFaces")),
+  EPODIdentifiers.eMeshStripLength:            Array('I', ("primitiveData", "stripLengths")),
+  EPODIdentifiers.eMeshNumStrips:              UInt(("primitiveData", "numStrips")),
+  EPODIdentifiers.eMeshInteravedDataList:      InterleavedDataList,
+  EPODIdentifiers.eMeshBoneBatchIndexList:     Array('I', ("boneBatches", "batches")),
+  EPODIdentifiers.eMeshNumBoneIndicesPerBatch: Array('I', ("boneBatches", "boneCounts")),
+  EPODIdentifiers.eMeshBoneOffsetPerBatch:     Array('I', ("boneBatches", "offsets")),
+  EPODIdentifiers.eMeshMaxNumBonesPerBatch:    UInt(("boneBatches", "boneMax")),
+  EPODIdentifiers.eMeshNumBoneBatches:         UInt(("boneBatches", "count")),
+  EPODIdentifiers.eMeshUnpackMatrix:           Array('f', "unpackMatrix"),
+  EPODIdentifiers.eMeshVertexIndexList:        VertexIndexList,
+  EPODIdentifiers.eMeshVertexList:             VertexList("POSITION"),
+  EPODIdentifiers.eMeshNormalList:             VertexList("NORMAL"),
+  EPODIdentifiers.eMeshTangentList:            VertexList("TANGENT"),
+  EPODIdentifiers.eMeshBinormalList:           VertexList("BINORMAL"),
+  EPODIdentifiers.eMeshUVWList:                UVWList,
+  EPODIdentifiers.eMeshVertexColourList:       VertexList("COLOR_0"),
+  EPODIdentifiers.eMeshBoneIndexList:          VertexList("JOINTS_0"),
+  EPODIdentifiers.eMeshBoneWeightList:         VertexList("WEIGHTS_0"),
+})
+
+PVRTextureSchema = PODSchema(EPODIdentifiers.eSceneTexture, {
+  EPODIdentifiers.eTextureFilename: TextureFilename,
+})
+
+PVRMaterialSchema = PODSchema(EPODIdentifiers.eSceneMaterial, {
+  EPODIdentifiers.eMaterialName:                       String("name"),
+  EPODIdentifiers.eMaterialDiffuseTextureIndex:        Int("diffuseTextureIndex"),
+  EPODIdentifiers.eMaterialOpacity:                    Float("opacity"),
+  EPODIdentifiers.eMaterialAmbientColour:              Array('f', "ambient"),
+  EPODIdentifiers.eMaterialDiffuseColour:              Array('f', "diffuse"),
+  EPODIdentifiers.eMaterialSpecularColour:             Array('f', "specular"),
+  EPODIdentifiers.eMaterialShininess:                  Float("shininess"),
+  EPODIdentifiers.eMaterialEffectFile:                 String("effectFile"),
+  EPODIdentifiers.eMaterialEffectName:                 String("effectName"),
+  EPODIdentifiers.eMaterialAmbientTextureIndex:        Int("ambientTextureIndex"),
+  EPODIdentifiers.eMaterialSpecularColourTextureIndex: Int("specularTextureIndex"),
+  EPODIdentifiers.eMaterialSpecularLevelTextureIndex:  Int("specularLevelTextureIndex"),
+  EPODIdentifiers.eMaterialBumpMapTextureIndex:        Int("bumpMapTextureIndex"),
+  EPODIdentifiers.eMaterialEmissiveTextureIndex:       Int("emissiveTextureIndex"),
+  EPODIdentifiers.eMaterialGlossinessTextureIndex:     Int("glossinessTextureIndex"),
+  EPODIdentifiers.eMaterialOpacityTextureIndex:        Int("opacityTextureIndex"),
+  EPODIdentifiers.eMaterialReflectionTextureIndex:     Int("reflectionTextureIndex"),
+  EPODIdentifiers.eMaterialRefractionTextureIndex:     Int("refractionTextureIndex"),
+  EPODIdentifiers.eMaterialBlendingRGBSrc:             UInt("blendSrcRGB"),
+  EPODIdentifiers.eMaterialBlendingAlphaSrc:           UInt("blendSrcA"),
+  EPODIdentifiers.eMaterialBlendingRGBDst:             UInt("blendDstRGB"),
+  EPODIdentifiers.eMaterialBlendingAlphaDst:           UInt("blendDstA"),
+  EPODIdentifiers.eMaterialBlendingRGBOperation:       UInt("blendOpRGB"),
+  EPODIdentifiers.eMaterialBlendingAlphaOperation:     UInt("blendOpA"),
+  EPODIdentifiers.eMaterialBlendingRGBAColour:         Array('f', "blendColour"),
+  EPODIdentifiers.eMaterialBlendingFactorArray:        Array('f', "blendFactor"),
+  EPODIdentifiers.eMaterialFlags:                      UInt("flags"),
+  EPODIdentifiers.eMaterialUserData:                   Bytes("userData"),
+})
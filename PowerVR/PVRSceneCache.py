@@ -0,0 +1,159 @@
+import os
+import mmap
+import json
+import math
+import array
+import struct
+import hashlib
+import numpy as np
+from collections.abc import Sequence
+
+from PowerVR.PVRFileCache import PVRFileCache
+from PowerVR.PVRModel import PVRModel
+from PowerVR.PVRMesh import PVRMesh
+from PowerVR.PVRNode import PVRNode
+from PowerVR.PVRAnimation import PVRAnimation
+from PowerVR.PVRTexture import PVRTexture
+from PowerVR.PVRMaterial import PVRMaterial
+from PowerVR.PVRBVH import PVRBVH
+
+# on-disk cache of parsed scenes, so that loading the same .pod file again skips the tag walk
+# each entry is a small json header describing the scene's objects, followed by their raw arrays, each aligned for mmap
+# cached scenes are memory mapped copy-on-write, so their arrays are zero-copy views that can still be modified in place
+
+PVRSceneCacheMagic = b"PVRC"
+# bump this whenever the parsed scene objects change, so that older entries are ignored
+PVRSceneCacheVersion = 1
+PVRSceneCacheHeader = struct.Struct("<4sII")
+PVRSceneCacheAlignment = 16
+
+PVRSceneCacheClasses = {cls.__name__: cls for cls in (PVRModel, PVRMesh, PVRNode, PVRAnimation, PVRTexture, PVRMaterial, PVRBVH)}
+
+class PVRSceneCacheWriter:
+  # turns a scene into json, collecting its arrays into a separate data section
+  def __init__(self):
+    self.blocks = []
+    self.size = 0
+
+  def AddBlock(self, data):
+    offset = self.size
+    self.blocks.append((offset, data))
+    self.size += -(-data.nbytes // PVRSceneCacheAlignment) * PVRSceneCacheAlignment
+    return offset
+
+  def Encode(self, value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+      return value
+    if isinstance(value, np.generic):
+      return value.item()
+    if isinstance(value, dict):
+      return {key: self.Encode(value[key]) for key in value}
+    if isinstance(value, list):
+      return [self.Encode(item) for item in value]
+    if isinstance(value, tuple):
+      return {"$tuple": [self.Encode(item) for item in value]}
+    if isinstance(value, array.array):
+      value = np.frombuffer(value, dtype=np.dtype(value.typecode).newbyteorder("<"))
+    if isinstance(value, np.ndarray):
+      value = np.ascontiguousarray(value)
+      return {"$array": {"offset": self.AddBlock(value), "dtype": value.dtype.str, "shape": list(value.shape)}}
+    if isinstance(value, (bytes, bytearray, memoryview)):
+      data = memoryview(value).cast("B")
+      return {"$bytes": {"offset": self.AddBlock(data), "length": data.nbytes}}
+    if type(value).__name__ in PVRSceneCacheClasses:
+      return {"$object": type(value).__name__, "fields": self.Encode(vars(value))}
+    if isinstance(value, Sequence):
+      # lazily loaded scene blocks get loaded and stored like any other list
+      return [self.Encode(item) for item in value]
+    raise TypeError("can't cache scene values of type %s" % type(value).__name__)
+
+  def Write(self, f, scene):
+    header = json.dumps(self.Encode(scene), separators=(",", ":")).encode()
+    f.write(PVRSceneCacheHeader.pack(PVRSceneCacheMagic, PVRSceneCacheVersion, len(header)))
+    f.write(header)
+    start = PVRSceneCacheHeader.size + len(header)
+    f.write(bytes(-start % PVRSceneCacheAlignment))
+    for (offset, data) in self.blocks:
+      f.write(data)
+      f.write(bytes(-data.nbytes % PVRSceneCacheAlignment))
+
+class PVRSceneCacheReader:
+  def __init__(self, buffer):
+    self.view = memoryview(buffer)
+    (magic, version, headerLength) = PVRSceneCacheHeader.unpack_from(self.view)
+    if magic != PVRSceneCacheMagic or version != PVRSceneCacheVersion:
+      raise ValueError("not a current scene cache entry")
+    self.headerStart = PVRSceneCacheHeader.size
+    self.headerLength = headerLength
+    start = self.headerStart + headerLength
+    self.dataOffset = start + -start % PVRSceneCacheAlignment
+
+  def Decode(self, value):
+    # json object hook, so values are decoded as the header is parsed, innermost first
+    if "$array" in value:
+      info = value["$array"]
+      return np.frombuffer(self.view, dtype=info["dtype"], count=math.prod(info["shape"]), offset=self.dataOffset + info["offset"]).reshape(info["shape"])
+    if "$bytes" in value:
+      info = value["$bytes"]
+      start = self.dataOffset + info["offset"]
+      return self.view[start:start + info["length"]]
+    if "$tuple" in value:
+      return tuple(value["$tuple"])
+    if "$object" in value:
+      target = PVRSceneCacheClasses[value["$object"]]()
+      vars(target).update(value["fields"])
+      return target
+    return value
+
+  def Read(self):
+    header = self.view[self.headerStart:self.headerStart + self.headerLength]
+    return json.loads(bytes(header), object_hook=self.Decode)
+
+class PVRSceneCache(PVRFileCache):
+  def __init__(self, directory, maxSize=1 << 30, useHash=False):
+    PVRFileCache.__init__(self, directory, maxSize, ".podc")
+    # entries are keyed by the .pod file's path, size and modification time, or by its contents if useHash is set
+    self.useHash = useHash
+
+  def getKey(self, podPath):
+    digest = hashlib.sha256()
+    if self.useHash:
+      with open(podPath, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+          digest.update(block)
+    else:
+      stat = os.stat(podPath)
+      digest.update(json.dumps([os.path.abspath(podPath), stat.st_size, stat.st_mtime_ns]).encode())
+    digest.update(struct.pack("<I", PVRSceneCacheVersion))
+    return digest.hexdigest()
+
+  def get(self, key):
+    # returns the cached scene, or None if there isn't one
+    entry = self.getPath(key)
+    try:
+      with open(entry, "rb") as f:
+        # ACCESS_COPY, like PVRMemoryStream, so the scene's vertex data can be patched without touching the entry
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_COPY)
+      scene = PVRSceneCacheReader(buffer).Read()
+      self.countHit(entry)
+      return scene
+    except FileNotFoundError:
+      # not cached, or evicted by another worker in the meantime
+      pass
+    except (ValueError, KeyError, TypeError, struct.error):
+      # an entry from an older version, or a broken one; it gets replaced by put()
+      pass
+    self.countMiss()
+    return None
+
+  def put(self, key, scene):
+    self.write(key, lambda f: PVRSceneCacheWriter().Write(f, scene))
+
+  def load(self, podPath, parse):
+    # parse(podPath) returns a PVRModel, and is only called on a cache miss
+    key = self.getKey(podPath)
+    scene = self.get(key)
+    if scene is None:
+      scene = parse(podPath)
+      self.put(key, scene)
+    return scene
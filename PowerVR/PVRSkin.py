@@ -0,0 +1,140 @@
+import numpy as np
+
+from PowerVR.PVRMesh import EPVRMesh, PVRNormalizedVertexDataTypes
+
+# splits a skinned mesh into parts that each have a single palette of joint nodes
+# POD meshes are split into bone batches, and each vertex's bone indices point into the palette of its batch
+# here they're remapped to point into the palette of their part, which covers as many batches as fit within the joint limit
+# vertices are assumed to belong to a single batch, as they do in meshes batched by the PowerVR tools
+# triangles that need more joints than the limit by themselves lose their weakest joints, so that every part stays within it
+
+class PVRSkin:
+  def __init__(self, jointLimit=None):
+    # maximum number of joints in each part, or None to put the whole mesh into one part
+    if jointLimit is not None and jointLimit < 1:
+      raise ValueError("the joint limit has to be at least 1, not %d" % jointLimit)
+    self.jointLimit = jointLimit
+
+  def GetWeights(self, mesh):
+    # (numVertices, bonesPerVertex) float bone weights
+    element = mesh.vertexElements["WEIGHTS_0"]
+    weights = mesh.GetElementView("WEIGHTS_0")[:, 0:element["numComponents"]]
+    if element["dataType"] in PVRNormalizedVertexDataTypes:
+      return weights / np.iinfo(weights.dtype).max
+    return weights.astype(np.float64)
+
+  def GetVertexNodes(self, mesh, triangles):
+    # returns (nodes, weights) arrays, giving the node index and weight of each of every vertex's bones
+    batches = mesh.boneBatches
+    numBatches = batches["count"]
+    boneMax = max(batches["boneMax"], 1)
+    batchNodes = np.asarray(batches["batches"], dtype=np.int64)[0:numBatches * boneMax].reshape(numBatches, boneMax)
+    # batch offsets are the first triangle of each batch
+    offsets = np.zeros(numBatches, dtype=np.int64) if batches["offsets"] is None else np.asarray(batches["offsets"], dtype=np.int64)[0:numBatches]
+    triangleBatches = np.maximum(np.searchsorted(offsets, np.arange(len(triangles)), side="right") - 1, 0)
+    # every vertex takes the batch of the first triangle that uses it
+    vertexBatches = np.zeros(mesh.primitiveData["numVertices"], dtype=np.int64)
+    (used, firstUse) = np.unique(triangles.reshape(-1), return_index=True)
+    vertexBatches[used] = triangleBatches[firstUse // 3]
+
+    weights = self.GetWeights(mesh)
+    bones = mesh.GetElementView("JOINTS_0")[:, 0:weights.shape[1]].astype(np.int64)
+    nodes = batchNodes[vertexBatches[:, None], np.clip(bones, 0, boneMax - 1)]
+    if weights.shape[1] > 4:
+      # glTF only has room for four influences per vertex in a single set, so keep the strongest ones
+      strongest = np.argsort(-weights, axis=1, kind="stable")[:, 0:4]
+      nodes = np.take_along_axis(nodes, strongest, axis=1)
+      weights = np.take_along_axis(weights, strongest, axis=1)
+    return (nodes, weights, triangleBatches)
+
+  def LimitTriangleJoints(self, triangles, nodes, weights):
+    # drops the weakest joints of triangles that use more than the limit, in place
+    # every vertex keeps its strongest joint, so joints only ever get dropped, and triangles can't go back over the limit
+    # the weights left are renormalized later, when the parts are built
+    # returns the number of triangles that lost joints
+    cornerNodes = np.where(weights[triangles] > 0, nodes[triangles], -1).reshape(len(triangles), -1)
+    cornerNodes.sort(axis=1)
+    numJoints = ((np.diff(cornerNodes, axis=1) != 0) & (cornerNodes[:, 1:] >= 0)).sum(axis=1) + (cornerNodes[:, 0] >= 0)
+    overLimit = np.flatnonzero(numJoints > self.jointLimit)
+    for triangle in overLimit.tolist():
+      # vertices are shared, so earlier triangles may have already dropped some of this one's joints
+      corners = triangles[triangle]
+      influences = weights[corners] > 0
+      (joints, inverse) = np.unique(nodes[corners][influences], return_inverse=True)
+      if len(joints) <= self.jointLimit:
+        continue
+      strongest = np.unique(nodes[corners, np.argmax(weights[corners], axis=1)][influences.any(axis=1)])
+      if len(strongest) > self.jointLimit:
+        raise ValueError("triangle %d has %d vertices bound to different joints, which doesn't fit in a joint limit of %d" % (triangle, len(strongest), self.jointLimit))
+      # the rest of the joints are ranked by their total weight over the triangle's corners
+      totals = np.bincount(inverse, weights=weights[corners][influences])
+      ranked = joints[np.argsort(-totals, kind="stable")]
+      ranked = ranked[~np.isin(ranked, strongest)]
+      kept = np.concatenate((strongest, ranked[0:self.jointLimit - len(strongest)]))
+      weights[corners] = np.where(np.isin(nodes[corners], kept), weights[corners], 0)
+    return len(overLimit)
+
+  def GroupTriangles(self, triangles, triangleBatches, nodes, weights):
+    # returns a list of triangle index arrays, one for each part
+    numTriangles = len(triangles)
+    if self.jointLimit is None:
+      return [np.arange(numTriangles)]
+    # triangles are grouped a batch at a time, or a triangle at a time within batches that are over the limit by themselves
+    units = []
+    batchStarts = np.flatnonzero(np.diff(triangleBatches, prepend=-1))
+    batchEnds = np.append(batchStarts[1:], numTriangles)
+    for (start, end) in zip(batchStarts.tolist(), batchEnds.tolist()):
+      corners = triangles[start:end].reshape(-1)
+      joints = set(nodes[corners][weights[corners] > 0].tolist())
+      if len(joints) <= self.jointLimit:
+        units.append((start, end, joints))
+        continue
+      for triangle in range(start, end):
+        corners = triangles[triangle]
+        units.append((triangle, triangle + 1, set(nodes[corners][weights[corners] > 0].tolist())))
+
+    groups = []
+    (groupStart, groupJoints) = (0, set())
+    for (start, end, joints) in units:
+      merged = groupJoints | joints
+      if len(merged) > self.jointLimit and start > groupStart:
+        groups.append(np.arange(groupStart, start))
+        (groupStart, merged) = (start, joints)
+      groupJoints = merged
+    if numTriangles > groupStart:
+      groups.append(np.arange(groupStart, numTriangles))
+    return groups
+
+  def Split(self, mesh):
+    # returns a list of (jointNodes, mesh) parts
+    # each part's mesh has its joints and weights in a second block of vertex data, padded to four influences
+    triangles = mesh.GetTriangleList().reshape(-1, 3).astype(np.int64)
+    (nodes, weights, triangleBatches) = self.GetVertexNodes(mesh, triangles)
+    if self.jointLimit is not None:
+      self.LimitTriangleJoints(triangles, nodes, weights)
+    semantics = [name for name in mesh.vertexElements if name not in ("JOINTS_0", "WEIGHTS_0")]
+    parts = []
+    for group in self.GroupTriangles(triangles, triangleBatches, nodes, weights):
+      (vertices, indices) = np.unique(triangles[group].reshape(-1), return_inverse=True)
+      partNodes = nodes[vertices]
+      partWeights = weights[vertices]
+      influences = partWeights > 0
+      jointNodes = np.unique(partNodes[influences])
+      if len(jointNodes) == 0:
+        jointNodes = partNodes[0:1, 0]
+      joints = np.where(influences, np.searchsorted(jointNodes, partNodes), 0)
+      # weights have to add up to 1, vertices without any get fully bound to the first joint
+      totals = partWeights.sum(axis=1, keepdims=True)
+      partWeights = np.where(totals > 0, partWeights / np.where(totals > 0, totals, 1), np.arange(partWeights.shape[1]) == 0)
+      padding = ((0, 0), (0, 4 - partWeights.shape[1]))
+      joints = np.pad(joints, padding).astype("u1" if len(jointNodes) <= 256 else "<u2")
+      partWeights = np.pad(partWeights, padding).astype("<f4")
+
+      part = mesh.GetSubMesh(vertices, indices.reshape(-1), semantics)
+      skinData = np.concatenate((joints.view(np.uint8), partWeights.view(np.uint8)), axis=1)
+      dataIndex = part.AddData(bytearray(skinData.tobytes()))
+      stride = skinData.shape[1]
+      part.AddElement("JOINTS_0", EPVRMesh.VertexData.eUnsignedByte if joints.itemsize == 1 else EPVRMesh.VertexData.eUnsignedShort, 4, stride, 0, dataIndex)
+      part.AddElement("WEIGHTS_0", EPVRMesh.VertexData.eFloat, 4, stride, joints.itemsize * 4, dataIndex)
+      parts.append((jointNodes, part))
+    return parts
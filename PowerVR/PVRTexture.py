@@ -3,20 +3,50 @@
 from os import path
 
 class EPVRTexture:
+  # pixel formats with a zero high word; other formats spell out their channel names and bit widths
+  class PixelFormats:
+    PVRTCI_2bpp_RGB  = 0
+    PVRTCI_2bpp_RGBA = 1
+    PVRTCI_4bpp_RGB  = 2
+    PVRTCI_4bpp_RGBA = 3
+    PVRTCII_2bpp     = 4
+    PVRTCII_4bpp     = 5
+    ETC1             = 6
+    DXT1             = 7
+    DXT2             = 8
+    DXT3             = 9
+    DXT4             = 10
+    DXT5             = 11
+    BC4              = 12
+    BC5              = 13
+    BC6              = 14
+    BC7              = 15
+    UYVY             = 16
+    YUY2             = 17
+    BW1bpp           = 18
+    SharedExponentR9G9B9E5 = 19
+    RGBG8888         = 20
+    GRGB8888         = 21
+    ETC2_RGB         = 22
+    ETC2_RGBA        = 23
+    ETC2_RGB_A1      = 24
+    EAC_R11          = 25
+    EAC_RG11         = 26
+
   class ChannelTypes:
-    UnsignedByteNorm = 0,
-    SignedByteNorm = 1,
-    UnsignedByte = 2,
-    SignedByte = 3,
-    UnsignedShortNorm = 4,
-    SignedShortNorm = 5,
-    UnsignedShort = 6,
-    SignedShort = 7,
-    UnsignedIntegerNorm = 8,
-    SignedIntegerNorm = 9,
-    UnsignedInteger = 10,
-    SignedInteger = 11,
-    SignedFloat = 12,
+    UnsignedByteNorm = 0
+    SignedByteNorm = 1
+    UnsignedByte = 2
+    SignedByte = 3
+    UnsignedShortNorm = 4
+    SignedShortNorm = 5
+    UnsignedShort = 6
+    SignedShort = 7
+    UnsignedIntegerNorm = 8
+    SignedIntegerNorm = 9
+    UnsignedInteger = 10
+    SignedInteger = 11
+    SignedFloat = 12
     Float = 12 # the name Float is now deprecated.
     UnsignedFloat = 13
 
@@ -36,6 +66,7 @@ class PVRTexture:
     self.numFaces = 1
     self.MIPMapCount = 1
     self.metaDataSize = 0
+    self.metaData = None
 
   def setName(self, name):
     self.name = path.splitext(name)[0]
@@ -0,0 +1,46 @@
+import os
+import json
+import shutil
+import hashlib
+
+from PowerVR.PVRFileCache import PVRFileCache
+
+# on-disk cache of converted textures, keyed by a hash of the source .pvr contents plus the conversion settings
+
+class PVRTextureCache(PVRFileCache):
+  def __init__(self, directory, maxSize=1 << 30, ext=".png"):
+    PVRFileCache.__init__(self, directory, maxSize, ext)
+
+  def getKey(self, inpath, settings=None):
+    digest = hashlib.sha256()
+    with open(inpath, "rb") as f:
+      for block in iter(lambda: f.read(1 << 20), b""):
+        digest.update(block)
+    digest.update(json.dumps(settings, sort_keys=True).encode())
+    return digest.hexdigest()
+
+  def get(self, key, outpath):
+    # copies a cached entry to outpath, returning False if there isn't one
+    entry = self.getPath(key)
+    try:
+      shutil.copyfile(entry, outpath)
+      self.countHit(entry)
+    except FileNotFoundError:
+      # not cached, or evicted by another worker in the meantime
+      self.countMiss()
+      return False
+    return True
+
+  def put(self, key, path):
+    with open(path, "rb") as src:
+      self.write(key, lambda f: shutil.copyfileobj(src, f))
+
+  def convert(self, inpath, outpath, convert, settings=None):
+    # convert(inpath, outpath) is only called on a cache miss
+    key = self.getKey(inpath, settings)
+    if self.get(key, outpath):
+      return True
+    convert(inpath, outpath)
+    if os.path.exists(outpath):
+      self.put(key, outpath)
+    return False
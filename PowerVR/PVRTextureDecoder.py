@@ -0,0 +1,403 @@
+import numpy as np
+
+from PowerVR.PVRTexture import EPVRTexture
+
+# vectorized decoders for common PVR pixel formats
+# every decoder returns a (height, width, 4) uint8 RGBA array
+# ETC: https://registry.khronos.org/DataFormat/specs/1.3/dataformat.1.3.html#ETC2
+# PVRTC: https://github.com/powervr-graphics/Native_SDK/blob/master/framework/PVRCore/texture/PVRTDecompress.cpp
+
+PixelFormats = EPVRTexture.PixelFormats
+
+ETC1Modifiers = np.array([
+  [ 2,   8,  -2,   -8],
+  [ 5,  17,  -5,  -17],
+  [ 9,  29,  -9,  -29],
+  [13,  42, -13,  -42],
+  [18,  60, -18,  -60],
+  [24,  80, -24,  -80],
+  [33, 106, -33, -106],
+  [47, 183, -47, -183],
+], dtype=np.int32)
+
+# punch-through blocks without the opaque bit lose their small modifiers
+ETC1ModifiersNonOpaque = ETC1Modifiers * np.array([0, 1, 0, 1], dtype=np.int32)
+
+ETC2Distances = np.array([3, 6, 11, 16, 23, 32, 41, 64], dtype=np.int32)
+
+EACModifiers = np.array([
+  [-3, -6,  -9, -15, 2, 5, 8, 14],
+  [-3, -7, -10, -13, 2, 6, 9, 12],
+  [-2, -5,  -8, -13, 1, 4, 7, 12],
+  [-2, -4,  -6, -13, 1, 3, 5, 12],
+  [-3, -6,  -8, -12, 2, 5, 7, 11],
+  [-3, -7,  -9, -11, 2, 6, 8, 10],
+  [-4, -7,  -8, -11, 3, 6, 7, 10],
+  [-3, -5,  -8, -11, 2, 4, 7, 10],
+  [-2, -6,  -8, -10, 1, 5, 7,  9],
+  [-2, -5,  -8, -10, 1, 4, 7,  9],
+  [-2, -4,  -8, -10, 1, 3, 7,  9],
+  [-2, -5,  -7, -10, 1, 4, 6,  9],
+  [-3, -4,  -7, -10, 2, 3, 6,  9],
+  [-1, -2,  -3, -10, 0, 1, 2,  9],
+  [-4, -6,  -8,  -9, 3, 5, 7,  8],
+  [-3, -5,  -7,  -9, 2, 4, 6,  8],
+], dtype=np.int32)
+
+ETCFormats = (PixelFormats.ETC1, PixelFormats.ETC2_RGB, PixelFormats.ETC2_RGBA, PixelFormats.ETC2_RGB_A1)
+PVRTCFormats = (PixelFormats.PVRTCI_2bpp_RGB, PixelFormats.PVRTCI_2bpp_RGBA, PixelFormats.PVRTCI_4bpp_RGB, PixelFormats.PVRTCI_4bpp_RGBA)
+
+class PVRTextureFormatError(ValueError):
+  pass
+
+def IsCompressed(texture):
+  return texture.pixelFormatH == 0
+
+def GetChannels(texture):
+  # uncompressed formats store up to four channel names in the low word, and their bit widths in the high word
+  channels = []
+  for i in range(4):
+    name = (texture.pixelFormatL >> (8 * i)) & 0xFF
+    bits = (texture.pixelFormatH >> (8 * i)) & 0xFF
+    if name == 0:
+      break
+    channels.append((chr(name), bits))
+  return channels
+
+def GetDataSize(texture, width, height):
+  if not IsCompressed(texture):
+    return width * height * sum(bits for (name, bits) in GetChannels(texture)) // 8
+  pixelFormat = texture.pixelFormatL
+  if pixelFormat in ETCFormats:
+    blockSize = 16 if pixelFormat == PixelFormats.ETC2_RGBA else 8
+    return ((width + 3) // 4) * ((height + 3) // 4) * blockSize
+  if pixelFormat in PVRTCFormats:
+    blockWidth = 8 if pixelFormat in (PixelFormats.PVRTCI_2bpp_RGB, PixelFormats.PVRTCI_2bpp_RGBA) else 4
+    return max(width // blockWidth, 2) * max(height // 4, 2) * 8
+  raise PVRTextureFormatError("unsupported pixel format %d" % pixelFormat)
+
+def Decode(texture, data):
+  if not IsCompressed(texture):
+    return DecodeUncompressed(texture, data)
+  pixelFormat = texture.pixelFormatL
+  if pixelFormat in ETCFormats:
+    return DecodeETC(data, texture.width, texture.height, pixelFormat)
+  if pixelFormat in PVRTCFormats:
+    bpp = 2 if pixelFormat in (PixelFormats.PVRTCI_2bpp_RGB, PixelFormats.PVRTCI_2bpp_RGBA) else 4
+    return DecodePVRTC(data, texture.width, texture.height, bpp)
+  raise PVRTextureFormatError("unsupported pixel format %d" % pixelFormat)
+
+def ExpandBits(values, bits):
+  # scale an n-bit unsigned value up to 8 bits
+  if bits == 8:
+    return values
+  maxValue = (1 << bits) - 1
+  return (values.astype(np.uint32) * 255 + maxValue // 2) // maxValue
+
+def DecodeUncompressed(texture, data):
+  width = texture.width
+  height = texture.height
+  channels = GetChannels(texture)
+  if not channels:
+    raise PVRTextureFormatError("texture has no channels")
+  pixelBits = sum(bits for (name, bits) in channels)
+  numPixels = width * height
+  channelType = texture.channelType
+  isFloat = channelType in (EPVRTexture.ChannelTypes.SignedFloat, EPVRTexture.ChannelTypes.UnsignedFloat)
+
+  values = []
+  if all(bits in (8, 16, 32) for (name, bits) in channels):
+    # byte aligned channels are stored in memory order
+    dtype = []
+    for (index, (name, bits)) in enumerate(channels):
+      if isFloat and bits > 8:
+        dtype.append(("c%d" % index, "<f%d" % (bits // 8)))
+      else:
+        dtype.append(("c%d" % index, "<u%d" % (bits // 8)))
+    pixels = np.frombuffer(data, dtype=np.dtype(dtype), count=numPixels)
+    for (index, (name, bits)) in enumerate(channels):
+      channel = pixels["c%d" % index]
+      if channel.dtype.kind == "f":
+        channel = np.clip(channel * 255 + 0.5, 0, 255)
+      elif bits > 8:
+        channel = channel >> (bits - 8)
+      values.append(channel.astype(np.uint8))
+  elif pixelBits in (8, 16, 32):
+    # packed formats like r5g6b5 are read as a single integer, with the first channel in the most significant bits
+    pixels = np.frombuffer(data, dtype="<u%d" % (pixelBits // 8), count=numPixels).astype(np.uint32)
+    shift = pixelBits
+    for (name, bits) in channels:
+      shift -= bits
+      channel = (pixels >> shift) & ((1 << bits) - 1)
+      values.append(ExpandBits(channel, bits).astype(np.uint8))
+  else:
+    raise PVRTextureFormatError("unsupported channel layout %r" % channels)
+
+  rgba = np.zeros((numPixels, 4), dtype=np.uint8)
+  rgba[:, 3] = 255
+  for ((name, bits), channel) in zip(channels, values):
+    if name in "rgba":
+      rgba[:, "rgba".index(name)] = channel
+    elif name == "l":
+      rgba[:, 0:3] = channel[:, None]
+    elif name == "i":
+      rgba[:, :] = channel[:, None]
+  return rgba.reshape(height, width, 4)
+
+def Bits(values, shift, count):
+  return ((values >> np.uint64(shift)) & np.uint64((1 << count) - 1)).astype(np.int32)
+
+def SignExtend3(values):
+  return np.where(values >= 4, values - 8, values)
+
+def Expand4(values):
+  return (values << 4) | values
+
+def Expand5(values):
+  return (values << 3) | (values >> 2)
+
+def DecodeETC(data, width, height, pixelFormat):
+  blocksX = (width + 3) // 4
+  blocksY = (height + 3) // 4
+  numBlocks = blocksX * blocksY
+  isETC2 = pixelFormat != PixelFormats.ETC1
+  punchThrough = pixelFormat == PixelFormats.ETC2_RGB_A1
+
+  blocks = np.frombuffer(data, dtype=">u8", count=numBlocks * (2 if pixelFormat == PixelFormats.ETC2_RGBA else 1))
+  if pixelFormat == PixelFormats.ETC2_RGBA:
+    # each block has an EAC alpha block before the colour block
+    alphaBlocks = blocks[0::2]
+    blocks = blocks[1::2]
+
+  # pixels are numbered down each column, p = x * 4 + y
+  pixelIndex = np.arange(16)
+  pixelX = pixelIndex // 4
+  pixelY = pixelIndex % 4
+  low = (blocks & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+  indices = (((low[:, None] >> (pixelIndex + 16).astype(np.uint32)) & 1) << 1) | ((low[:, None] >> pixelIndex.astype(np.uint32)) & 1)
+  indices = indices.astype(np.int32)
+
+  rgb = np.zeros((numBlocks, 16, 3), dtype=np.int32)
+  alpha = np.full((numBlocks, 16), 255, dtype=np.int32)
+
+  diffBit = Bits(blocks, 33, 1).astype(bool)
+  flipBit = Bits(blocks, 32, 1).astype(bool)
+  # punch-through textures reuse the diff bit as an opaque flag, and are always in differential mode
+  differential = np.ones(numBlocks, dtype=bool) if punchThrough else diffBit
+  opaque = diffBit if punchThrough else np.ones(numBlocks, dtype=bool)
+
+  r1 = Bits(blocks, 59, 5)
+  g1 = Bits(blocks, 51, 5)
+  b1 = Bits(blocks, 43, 5)
+  r2 = r1 + SignExtend3(Bits(blocks, 56, 3))
+  g2 = g1 + SignExtend3(Bits(blocks, 48, 3))
+  b2 = b1 + SignExtend3(Bits(blocks, 40, 3))
+
+  tMode = np.zeros(numBlocks, dtype=bool)
+  hMode = np.zeros(numBlocks, dtype=bool)
+  planarMode = np.zeros(numBlocks, dtype=bool)
+  if isETC2:
+    # ETC2 signals its extra modes by overflowing one of the differential colour channels
+    tMode = differential & ((r2 < 0) | (r2 > 31))
+    hMode = differential & ~tMode & ((g2 < 0) | (g2 > 31))
+    planarMode = differential & ~tMode & ~hMode & ((b2 < 0) | (b2 > 31))
+  etc1Mode = ~(tMode | hMode | planarMode)
+
+  # individual and differential modes, which are shared with ETC1
+  if etc1Mode.any():
+    m = etc1Mode
+    d = differential[m]
+    base = np.zeros((m.sum(), 2, 3), dtype=np.int32)
+    base[:, 0] = np.where(d[:, None], Expand5(np.stack([r1[m], g1[m], b1[m]], axis=1)), Expand4(np.stack([Bits(blocks[m], 60, 4), Bits(blocks[m], 52, 4), Bits(blocks[m], 44, 4)], axis=1)))
+    base[:, 1] = np.where(d[:, None], Expand5(np.stack([r2[m], g2[m], b2[m]], axis=1) & 31), Expand4(np.stack([Bits(blocks[m], 56, 4), Bits(blocks[m], 48, 4), Bits(blocks[m], 40, 4)], axis=1)))
+    tables = np.stack([Bits(blocks[m], 37, 3), Bits(blocks[m], 34, 3)], axis=1)
+    subBlock = np.where(flipBit[m][:, None], pixelY >= 2, pixelX >= 2).astype(np.int32)
+    table = np.take_along_axis(tables, subBlock, axis=1)
+    pixelIndices = indices[m]
+    modifiers = np.where(opaque[m][:, None], ETC1Modifiers[table, pixelIndices], ETC1ModifiersNonOpaque[table, pixelIndices])
+    colour = np.take_along_axis(base, subBlock[:, :, None], axis=1) + modifiers[:, :, None]
+    rgb[m] = colour
+    if punchThrough:
+      alpha[m] = np.where(~opaque[m][:, None] & (pixelIndices == 2), 0, 255)
+
+  # T and H modes pick each pixel's colour from four paint colours
+  if (tMode | hMode).any():
+    src = [Bits(blocks, 56 - 8 * i, 8) for i in range(4)]
+    paint = np.zeros((numBlocks, 4, 3), dtype=np.int32)
+    if tMode.any():
+      m = tMode
+      c1 = Expand4(np.stack([((src[0][m] & 0x18) >> 1) | (src[0][m] & 0x3), src[1][m] >> 4, src[1][m] & 0xF], axis=1))
+      c2 = Expand4(np.stack([src[2][m] >> 4, src[2][m] & 0xF, src[3][m] >> 4], axis=1))
+      distance = ETC2Distances[((src[3][m] >> 1) & 0x6) | (src[3][m] & 0x1)][:, None]
+      paint[m] = np.stack([c1, c2 + distance, c2, c2 - distance], axis=1)
+    if hMode.any():
+      m = hMode
+      c1 = np.stack([(src[0][m] >> 3) & 0xF, ((src[0][m] & 0x7) << 1) | ((src[1][m] >> 4) & 0x1), (src[1][m] & 0x8) | ((src[1][m] & 0x3) << 1) | ((src[2][m] >> 7) & 0x1)], axis=1)
+      c2 = np.stack([(src[2][m] >> 3) & 0xF, ((src[2][m] & 0x7) << 1) | ((src[3][m] >> 7) & 0x1), (src[3][m] >> 3) & 0xF], axis=1)
+      # the lowest bit of the distance index comes from the ordering of the two colours
+      order = ((c1[:, 0] << 8) | (c1[:, 1] << 4) | c1[:, 2]) >= ((c2[:, 0] << 8) | (c2[:, 1] << 4) | c2[:, 2])
+      distance = ETC2Distances[(src[3][m] & 0x4) | ((src[3][m] & 0x1) << 1) | order.astype(np.int32)][:, None]
+      c1 = Expand4(c1)
+      c2 = Expand4(c2)
+      paint[m] = np.stack([c1 + distance, c1 - distance, c2 + distance, c2 - distance], axis=1)
+    m = tMode | hMode
+    pixelIndices = indices[m]
+    rgb[m] = np.take_along_axis(paint[m], pixelIndices[:, :, None], axis=1)
+    if punchThrough:
+      alpha[m] = np.where(~opaque[m][:, None] & (pixelIndices == 2), 0, 255)
+
+  # planar mode interpolates between three colours across the block
+  if planarMode.any():
+    m = planarMode
+    src = [Bits(blocks[m], 56 - 8 * i, 8) for i in range(8)]
+    o = np.stack([(src[0] >> 1) & 0x3F, ((src[0] & 0x1) << 6) | ((src[1] >> 1) & 0x3F), ((src[1] & 0x1) << 5) | (src[2] & 0x18) | ((src[2] & 0x3) << 1) | ((src[3] >> 7) & 0x1)], axis=1)
+    h = np.stack([((src[3] >> 1) & 0x3E) | (src[3] & 0x1), (src[4] >> 1) & 0x7F, ((src[4] & 0x1) << 5) | ((src[5] >> 3) & 0x1F)], axis=1)
+    v = np.stack([((src[5] & 0x7) << 3) | ((src[6] >> 5) & 0x7), ((src[6] & 0x1F) << 2) | ((src[7] >> 6) & 0x3), src[7] & 0x3F], axis=1)
+    def expand(c):
+      return np.stack([(c[:, 0] << 2) | (c[:, 0] >> 4), (c[:, 1] << 1) | (c[:, 1] >> 6), (c[:, 2] << 2) | (c[:, 2] >> 4)], axis=1)
+    o = expand(o)[:, None, :]
+    h = expand(h)[:, None, :]
+    v = expand(v)[:, None, :]
+    rgb[m] = (pixelX[None, :, None] * (h - o) + pixelY[None, :, None] * (v - o) + 4 * o + 2) >> 2
+
+  if pixelFormat == PixelFormats.ETC2_RGBA:
+    base = Bits(alphaBlocks, 56, 8)
+    multiplier = Bits(alphaBlocks, 52, 4)
+    table = Bits(alphaBlocks, 48, 4)
+    alphaIndices = ((alphaBlocks[:, None] >> (45 - 3 * pixelIndex).astype(np.uint64)) & np.uint64(7)).astype(np.int32)
+    alpha = base[:, None] + EACModifiers[table[:, None], alphaIndices] * multiplier[:, None]
+
+  pixels = np.empty((numBlocks, 16, 4), dtype=np.uint8)
+  pixels[:, :, 0:3] = np.clip(rgb, 0, 255)
+  pixels[:, :, 3] = np.clip(alpha, 0, 255)
+  if punchThrough:
+    # transparent punch-through pixels are black as well
+    pixels[pixels[:, :, 3] == 0] = 0
+  # (block y, block x, pixel x, pixel y, channel) -> (y, x, channel)
+  pixels = pixels.reshape(blocksY, blocksX, 4, 4, 4).transpose(0, 3, 1, 2, 4).reshape(blocksY * 4, blocksX * 4, 4)
+  return np.ascontiguousarray(pixels[0:height, 0:width])
+
+def MortonIndex(blocksX, blocksY, x, y):
+  # PVRTC blocks are stored in twiddled order, with y in the lower bit of each pair
+  # bits of the larger dimension beyond the smaller one are appended on top
+  minDimension = min(blocksX, blocksY)
+  index = np.zeros_like(x)
+  bit = 1
+  shift = 0
+  while bit < minDimension:
+    index |= ((y & bit) != 0).astype(index.dtype) << (2 * shift)
+    index |= ((x & bit) != 0).astype(index.dtype) << (2 * shift + 1)
+    bit <<= 1
+    shift += 1
+  remaining = x if blocksY < blocksX else y
+  index |= (remaining >> shift) << (2 * shift)
+  return index
+
+def PVRTCColours(colourData):
+  # returns the (r, g, b, a) of colours A and B as 5-bit rgb and 4-bit alpha
+  a = np.empty(colourData.shape + (4,), dtype=np.int32)
+  b = np.empty(colourData.shape + (4,), dtype=np.int32)
+  c = colourData.astype(np.int64)
+
+  opaque = (c & 0x8000) != 0
+  a[..., 0] = np.where(opaque, (c & 0x7C00) >> 10, ((c & 0xF00) >> 7) | ((c & 0xF00) >> 11))
+  a[..., 1] = np.where(opaque, (c & 0x3E0) >> 5, ((c & 0xF0) >> 3) | ((c & 0xF0) >> 7))
+  a[..., 2] = np.where(opaque, (c & 0x1E) | ((c & 0x1E) >> 4), ((c & 0xE) << 1) | ((c & 0xE) >> 2))
+  a[..., 3] = np.where(opaque, 0xF, (c & 0x7000) >> 11)
+
+  opaque = (c & 0x80000000) != 0
+  b[..., 0] = np.where(opaque, (c & 0x7C000000) >> 26, ((c & 0xF000000) >> 23) | ((c & 0xF000000) >> 27))
+  b[..., 1] = np.where(opaque, (c & 0x3E00000) >> 21, ((c & 0xF00000) >> 19) | ((c & 0xF00000) >> 23))
+  b[..., 2] = np.where(opaque, (c & 0x1F0000) >> 16, ((c & 0xF0000) >> 15) | ((c & 0xF0000) >> 19))
+  b[..., 3] = np.where(opaque, 0xF, (c & 0x70000000) >> 27)
+  return (a, b)
+
+def DecodePVRTC(data, width, height, bpp):
+  blockWidth = 8 if bpp == 2 else 4
+  blockHeight = 4
+  blocksX = max(width // blockWidth, 2)
+  blocksY = max(height // blockHeight, 2)
+  fullWidth = blocksX * blockWidth
+  fullHeight = blocksY * blockHeight
+
+  words = np.frombuffer(data, dtype="<u4", count=blocksX * blocksY * 2).reshape(-1, 2)
+  blockY, blockX = np.mgrid[0:blocksY, 0:blocksX]
+  order = MortonIndex(blocksX, blocksY, blockX, blockY)
+  modulationData = words[order, 0].astype(np.int64)
+  colourData = words[order, 1].astype(np.int64)
+  (colourA, colourB) = PVRTCColours(colourData)
+  modulationMode = colourData & 1
+
+  # colours A and B are bilinearly upscaled, each block's colour sitting at its centre and wrapping at the edges
+  pixelX = np.arange(fullWidth) - blockWidth // 2
+  pixelY = np.arange(fullHeight) - blockHeight // 2
+  x0 = (pixelX // blockWidth) % blocksX
+  x1 = (x0 + 1) % blocksX
+  y0 = (pixelY // blockHeight) % blocksY
+  y1 = (y0 + 1) % blocksY
+  fx = (pixelX % blockWidth)[None, :, None]
+  fy = (pixelY % blockHeight)[:, None, None]
+
+  def upscale(colour):
+    p = colour[y0[:, None], x0[None, :]]
+    q = colour[y0[:, None], x1[None, :]]
+    r = colour[y1[:, None], x0[None, :]]
+    s = colour[y1[:, None], x1[None, :]]
+    result = (blockHeight - fy) * ((blockWidth - fx) * p + fx * q) + fy * ((blockWidth - fx) * r + fx * s)
+    upscaled = np.empty_like(result)
+    if bpp == 2:
+      upscaled[..., 0:3] = (result[..., 0:3] >> 7) + (result[..., 0:3] >> 2)
+      upscaled[..., 3] = (result[..., 3] >> 5) + (result[..., 3] >> 1)
+    else:
+      upscaled[..., 0:3] = (result[..., 0:3] >> 6) + (result[..., 0:3] >> 1)
+      upscaled[..., 3] = (result[..., 3] >> 4) + result[..., 3]
+    return upscaled
+
+  upscaledA = upscale(colourA)
+  upscaledB = upscale(colourB)
+
+  # per pixel modulation weights, out of 8
+  blockOfY = np.arange(fullHeight) // blockHeight
+  blockOfX = np.arange(fullWidth) // blockWidth
+  inBlockY = (np.arange(fullHeight) % blockHeight)[:, None]
+  inBlockX = (np.arange(fullWidth) % blockWidth)[None, :]
+  pixelModulation = modulationData[blockOfY[:, None], blockOfX[None, :]]
+  pixelMode = modulationMode[blockOfY[:, None], blockOfX[None, :]]
+  punchThrough = np.zeros((fullHeight, fullWidth), dtype=bool)
+  weights = np.array([0, 3, 5, 8], dtype=np.int64)
+
+  if bpp == 4:
+    values = (pixelModulation >> (2 * (inBlockY * 4 + inBlockX))) & 3
+    modulation = np.where(pixelMode == 1, np.array([0, 4, 4, 8])[values], weights[values])
+    punchThrough = (pixelMode == 1) & (values == 2)
+  else:
+    # direct mode stores one bit per pixel
+    directBits = (pixelModulation >> (inBlockY * 8 + inBlockX)) & 1
+    # interpolated mode stores two bits for every other pixel in a checkerboard, and fills in the rest from neighbours
+    modulationBits = modulationData.copy()
+    interpolated = modulationMode == 1
+    # the centre pixel's low bit selects between horizontal only and vertical only interpolation
+    singleAxis = interpolated & ((modulationBits & 1) != 0)
+    subMode = np.where(singleAxis, np.where((modulationBits & (1 << 20)) != 0, 3, 2), 1)
+    modulationBits = np.where(singleAxis, np.where((modulationBits & (1 << 21)) != 0, modulationBits | (1 << 20), modulationBits & ~(1 << 20)), modulationBits)
+    modulationBits = np.where((modulationBits & 2) != 0, modulationBits | 1, modulationBits & ~1)
+    # stored pixels are numbered in row order, skipping the ones that get interpolated
+    storedIndex = (inBlockY * 8 + inBlockX) // 2
+    storedBits = (modulationBits[blockOfY[:, None], blockOfX[None, :]] >> (2 * storedIndex)) & 3
+    # direct mode bits are doubled up, so 0 -> 00 and 1 -> 11
+    values = weights[np.where(pixelMode == 1, storedBits, directBits * 3)]
+
+    # neighbours can come from adjacent blocks, whatever mode they're in
+    up = np.roll(values, 1, axis=0)
+    down = np.roll(values, -1, axis=0)
+    left = np.roll(values, 1, axis=1)
+    right = np.roll(values, -1, axis=1)
+    pixelSubMode = subMode[blockOfY[:, None], blockOfX[None, :]]
+    interpolatedValues = np.where(pixelSubMode == 1, (up + down + left + right + 2) // 4, np.where(pixelSubMode == 2, (left + right + 1) // 2, (up + down + 1) // 2))
+    isStored = ((inBlockX ^ inBlockY) & 1) == 0
+    modulation = np.where((pixelMode == 1) & ~isStored, interpolatedValues, values)
+
+  modulation = modulation[:, :, None]
+  pixels = (upscaledA * (8 - modulation) + upscaledB * modulation) // 8
+  pixels[..., 3] = np.where(punchThrough, 0, pixels[..., 3])
+  return np.ascontiguousarray(np.clip(pixels, 0, 255).astype(np.uint8)[0:height, 0:width])
@@ -0,0 +1,57 @@
+import struct
+
+from PowerVR.PVRTexture import PVRTexture, EPVRTexture
+from PowerVR import PVRTextureDecoder
+
+# reader for PVR v3 texture files
+# http://cdn.imgtec.com/sdk-documentation/PVR%20File%20Format.Specification.pdf
+
+PVRTextureHeader = struct.Struct("<IIIIIIIIIIIII")
+
+class PVRTextureLoader:
+  def __init__(self, stream):
+    self.stream = stream
+    self.texture = PVRTexture()
+    self.data = None
+    self.Read()
+
+  @classmethod
+  def open(cls, path):
+    with open(path, "rb") as buffer:
+      return cls(buffer)
+
+  def Read(self):
+    texture = self.texture
+    header = self.stream.read(PVRTextureHeader.size)
+    if len(header) < PVRTextureHeader.size:
+      raise ValueError("file is too short to be a PVR texture")
+    (
+      texture.version,
+      texture.flags,
+      texture.pixelFormatL,
+      texture.pixelFormatH,
+      texture.colourSpace,
+      texture.channelType,
+      texture.height,
+      texture.width,
+      texture.depth,
+      texture.numSurfaces,
+      texture.numFaces,
+      texture.MIPMapCount,
+      texture.metaDataSize,
+    ) = PVRTextureHeader.unpack(header)
+    if texture.version != PVRTexture().version:
+      # this also catches files written with the opposite endianness
+      raise ValueError("not a PVR v3 texture (version 0x%08x)" % texture.version)
+    texture.metaData = self.stream.read(texture.metaDataSize)
+    # surfaces are stored largest MIP level first, then by surface, face and depth slice
+    self.data = self.stream.read()
+
+  def GetSurface(self):
+    # data for the top MIP level of the first surface, face and depth slice
+    texture = self.texture
+    return self.data[0:PVRTextureDecoder.GetDataSize(texture, texture.width, texture.height)]
+
+  def Decode(self):
+    # returns a (height, width, 4) array of 8-bit RGBA pixels
+    return PVRTextureDecoder.Decode(self.texture, self.GetSurface())
@@ -0,0 +1,95 @@
+import numpy as np
+
+from PowerVR.PVRMesh import PVRVertexDataTypeMap
+
+# repacks a mesh's vertex data so that it only holds the attributes that are kept, with no gaps between them,
+# either interleaved into a single block, or as a separate block (stream) for each attribute
+# data is copied with numpy structured arrays, one copy per source block and target block rather than per attribute or vertex
+
+# attributes that glb meshes have no use for: colors aren't converted yet, and glTF has no binormals
+PVRUnusedSemantics = ("COLOR_0", "BINORMAL")
+
+class PVRVertexLayout:
+  def __init__(self, interleaved=True, dropSemantics=()):
+    self.interleaved = interleaved
+    # attributes to leave out, on top of the unused ones
+    self.dropSemantics = tuple(dropSemantics)
+
+  def GetKeptSemantics(self, mesh):
+    return [semantic for semantic in mesh.vertexElements if semantic not in PVRUnusedSemantics and semantic not in self.dropSemantics]
+
+  def GetFormat(self, element):
+    # (dtype, shape) of one vertex's worth of the element, as a structured array field
+    dtype = np.dtype(PVRVertexDataTypeMap[element["dataType"]])
+    numComponents = element["numComponents"] * (dtype.shape[0] if dtype.shape else 1)
+    return (dtype.base, (numComponents,))
+
+  def GetSourceViews(self, mesh, semantics):
+    # [(semantics, structured view)] for each block of vertex data the semantics are in
+    numVertices = mesh.primitiveData["numVertices"]
+    blocks = {}
+    for semantic in semantics:
+      element = mesh.vertexElements[semantic]
+      dataIndex = element["dataIndex"] if element["dataIndex"] >= 0 else 0
+      blocks.setdefault((dataIndex, element["stride"]), []).append(semantic)
+    views = []
+    for ((dataIndex, stride), names) in blocks.items():
+      elements = [mesh.vertexElements[name] for name in names]
+      formats = [self.GetFormat(element) for element in elements]
+      offsets = [element["offset"] for element in elements]
+      # the itemsize only covers the fields, so the last vertex doesn't need a whole stride of data after it
+      itemSize = max(offset + np.dtype(format).itemsize for (offset, format) in zip(offsets, formats))
+      dtype = np.dtype({"names": names, "formats": formats, "offsets": offsets, "itemsize": itemSize})
+      views.append((names, np.ndarray(shape=(numVertices,), dtype=dtype, buffer=mesh.vertexElementData[dataIndex], strides=(stride,))))
+    return views
+
+  def GetStats(self, mesh, semantics):
+    # the size of the mesh's vertex data blocks, and the attributes that aren't kept
+    dataIndices = {element["dataIndex"] if element["dataIndex"] >= 0 else 0 for element in mesh.vertexElements.values()}
+    return {
+      "numVertices": mesh.primitiveData["numVertices"],
+      "bytesBefore": sum(memoryview(mesh.vertexElementData[dataIndex]).nbytes for dataIndex in dataIndices),
+      "dropped": [semantic for semantic in mesh.vertexElements if semantic not in semantics],
+    }
+
+  def Drop(self, mesh):
+    # only removes the elements that aren't kept, leaving the vertex data as it is, for when it gets repacked anyway
+    # returns the same stats as Apply without bytesAfter, which is up to whatever repacks the data
+    semantics = self.GetKeptSemantics(mesh)
+    stats = self.GetStats(mesh, semantics)
+    mesh.vertexElements = {semantic: mesh.vertexElements[semantic] for semantic in semantics}
+    return stats
+
+  def Apply(self, mesh):
+    # replaces the mesh's vertex data and elements in place
+    # returns the size of the vertex data blocks before and after
+    numVertices = mesh.primitiveData["numVertices"]
+    semantics = self.GetKeptSemantics(mesh)
+    stats = self.GetStats(mesh, semantics)
+    groups = [semantics] if self.interleaved else [[semantic] for semantic in semantics]
+    vertexElementData = []
+    vertexElements = {}
+    for group in groups:
+      if not group:
+        continue
+      formats = [self.GetFormat(mesh.vertexElements[semantic]) for semantic in group]
+      # every attribute starts on a 4 byte boundary, as the glTF spec requires for vertex attributes
+      offsets = []
+      stride = 0
+      for format in formats:
+        offsets.append(stride)
+        stride += -(-np.dtype(format).itemsize // 4) * 4
+      data = bytearray(numVertices * stride)
+      target = np.frombuffer(data, dtype=np.dtype({"names": group, "formats": formats, "offsets": offsets, "itemsize": stride}))
+      # structured assignment copies field by field, from wherever each field is in the source to where it is in the target
+      for (names, source) in self.GetSourceViews(mesh, group):
+        target[names] = source
+      dataIndex = len(vertexElementData)
+      vertexElementData.append(data)
+      for (semantic, offset) in zip(group, offsets):
+        vertexElements[semantic] = dict(mesh.vertexElements[semantic], stride=stride, offset=offset, dataIndex=dataIndex)
+
+    mesh.vertexElementData = vertexElementData
+    mesh.vertexElements = vertexElements
+    stats["bytesAfter"] = sum(len(data) for data in vertexElementData)
+    return stats
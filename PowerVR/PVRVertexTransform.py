@@ -0,0 +1,97 @@
+import numpy as np
+
+from PowerVR.PVRMesh import EPVRMesh
+
+# rewrites vertex attributes in place, working on strided numpy views of the interleaved vertex data
+# only float attributes are touched, apart from axis swaps; packed or quantized attributes are otherwise left as they are
+
+class PVRVertexTransform:
+  # attributes that are directions or positions, and so get axis swaps applied
+  vectorSemantics = ("POSITION", "NORMAL", "TANGENT", "BINORMAL")
+  # attributes that should be unit length
+  directionSemantics = ("NORMAL", "TANGENT", "BINORMAL")
+
+  def __init__(self, flipUVs=True, axisOrder=None, axisSigns=None, renormalizeNormals=False):
+    self.flipUVs = flipUVs
+    # e.g. axisOrder=(0, 2, 1), axisSigns=(1, 1, -1) converts from z-up to y-up
+    self.axisOrder = axisOrder
+    self.axisSigns = axisSigns
+    self.renormalizeNormals = renormalizeNormals
+    # the axis swaps and sign flips as a matrix, taking vectors from the pod's axes to the glb's, or None if there are none
+    self.basis = None
+    if axisOrder is not None or axisSigns is not None:
+      self.basis = np.zeros((3, 3))
+      self.basis[np.arange(3), list(axisOrder if axisOrder is not None else (0, 1, 2))] = axisSigns if axisSigns is not None else 1
+
+  def IsIdentity(self):
+    return not self.flipUVs and self.axisOrder is None and self.axisSigns is None and not self.renormalizeNormals
+
+  def IsMirrored(self):
+    return self.basis is not None and np.linalg.det(self.basis) < 0
+
+  def ApplyToTransforms(self, translations, rotations, scales):
+    # node transforms, as (n, 3) translations, (n, 4) xyzw quaternions and (n, 3) scales, in the same axes as the vertices
+    # every node matrix L becomes B L B^T, with B the basis, so that nodes still line up with their meshes
+    if self.basis is None:
+      return (translations, rotations, scales)
+    basis = self.basis.astype(np.float32)
+    translations = translations @ basis.T
+    # B R B^T rotates about B times the axis, and a mirroring basis also reverses the direction of rotation
+    rotations = np.concatenate((rotations[:, 0:3] @ basis.T * np.float32(np.linalg.det(self.basis)), rotations[:, 3:4]), axis=1)
+    # B S B^T just moves the scales around
+    scales = scales[:, np.abs(self.basis).argmax(axis=1)]
+    return (translations, rotations, scales)
+
+  def ApplyToIntegerVectors(self, vectors):
+    # axis swaps for directions the pod stores as integers; only signed types can be negated, and the most negative
+    # value is clipped so that it doesn't wrap around
+    if vectors.dtype.kind != "i":
+      if self.axisOrder is not None:
+        vectors[:] = vectors[:, list(self.axisOrder)]
+      return
+    info = np.iinfo(vectors.dtype)
+    np.maximum(vectors, info.min + 1, out=vectors)
+    vectors[:] = vectors[:, np.abs(self.basis).argmax(axis=1)] * self.basis.sum(axis=1).astype(vectors.dtype)
+
+  def Apply(self, mesh):
+    if self.IsIdentity():
+      return mesh
+    if self.basis is not None and "POSITION" in mesh.vertexElements and mesh.vertexElements["POSITION"]["dataType"] != EPVRMesh.VertexData.eFloat:
+      # positions quantized by the pod exporter are left as they are, so the axes are changed in their unpack matrix instead,
+      # which goes on the mesh's node, and glTF flips the winding of meshes whose node transform mirrors them itself
+      # positions without an unpack matrix get the basis as theirs, since integer positions always keep their node
+      basis = np.identity(4)
+      basis[0:3, 0:3] = self.basis
+      unpack = np.array(mesh.unpackMatrix, dtype=np.float64).reshape(4, 4).T if len(mesh.unpackMatrix) == 16 else np.identity(4)
+      mesh.unpackMatrix = (basis @ unpack).T.reshape(-1).tolist()
+    elif self.IsMirrored() and "POSITION" in mesh.vertexElements:
+      # mirrored positions turn every triangle inside out
+      mesh.ReverseWinding()
+    for semantic in mesh.vertexElements:
+      element = mesh.vertexElements[semantic]
+      if element["dataType"] != EPVRMesh.VertexData.eFloat:
+        if self.basis is not None and semantic in self.directionSemantics and element["numComponents"] >= 3:
+          self.ApplyToIntegerVectors(mesh.GetElementView(semantic, writable=True)[:, 0:3])
+        continue
+
+      if semantic.startswith("TEXCOORD_"):
+        if self.flipUVs and element["numComponents"] >= 2:
+          view = mesh.GetElementView(semantic, writable=True)
+          # PVR texture coordinates are inverted compared to glTF
+          np.negative(view[:, 1], out=view[:, 1])
+
+      elif semantic in self.vectorSemantics:
+        if self.axisOrder is None and self.axisSigns is None and not (self.renormalizeNormals and semantic in self.directionSemantics):
+          continue
+        view = mesh.GetElementView(semantic, writable=True)
+        vectors = view[:, 0:3]
+        if self.axisOrder is not None:
+          vectors[:] = vectors[:, list(self.axisOrder)]
+        if self.axisSigns is not None:
+          vectors *= np.asarray(self.axisSigns, dtype=vectors.dtype)
+        if self.renormalizeNormals and semantic in self.directionSemantics:
+          lengths = np.sqrt(np.einsum("ij,ij->i", vectors, vectors))
+          # leave degenerate vectors alone rather than filling them with nans
+          lengths[lengths == 0] = 1
+          vectors /= lengths[:, None]
+    return mesh
@@ -0,0 +1,205 @@
+import struct
+import numpy as np
+from os import path
+
+from PowerVR.EPOD import EPODDefines, EPODIdentifiers
+from PowerVR.PVRMesh import EPVRMesh
+from PowerVR.PVRAnimation import EPVRAnimation
+
+# writes .pod files tag by tag, the inverse of PVRPODLoader.ReadTags
+# only used to generate synthetic models for benchmarking, so it only covers the tags those need
+
+class PODWriter:
+  def __init__(self, stream):
+    self.stream = stream
+
+  def WriteTag(self, ident, data=b""):
+    self.stream.write(struct.pack("<II", ident, len(data)))
+    self.stream.write(data)
+
+  def WriteEndTag(self, ident):
+    self.stream.write(struct.pack("<II", ident | EPODDefines.endTagMask, 0))
+
+  def WriteInt(self, ident, value):
+    self.WriteTag(ident, struct.pack("<i", value))
+
+  def WriteUInt(self, ident, value):
+    self.WriteTag(ident, struct.pack("<I", value))
+
+  def WriteFloats(self, ident, values):
+    self.WriteTag(ident, np.asarray(values, dtype="<f4").tobytes())
+
+  def WriteString(self, ident, value):
+    self.WriteTag(ident, value.encode() + b"\0")
+
+  def WriteDataBlock(self, ident, dataType, numComponents, stride, data):
+    # vertex and index lists; data is either the array itself, or an offset into the mesh's interleaved data
+    self.WriteTag(ident)
+    self.WriteUInt(EPODIdentifiers.eBlockDataType, dataType)
+    self.WriteInt(EPODIdentifiers.eBlockNumComponents, numComponents)
+    self.WriteInt(EPODIdentifiers.eBlockStride, stride)
+    self.WriteTag(EPODIdentifiers.eBlockData, data)
+    self.WriteEndTag(ident)
+
+def GenerateGrid(numVertices, rng, strips=False):
+  # a bumpy (width, height) grid of vertices, with as close to numVertices vertices as a grid can have
+  # returns (vertices, indices, strip lengths), with vertices as interleaved position, normal and uv floats,
+  # and with strips, the indices as a triangle strip for each row of cells, otherwise a triangle list and None
+  width = max(int(np.sqrt(numVertices)), 2)
+  height = max(numVertices // width, 2)
+  (y, x) = np.mgrid[0:height, 0:width].astype(np.float32)
+  vertices = np.zeros((height, width, 8), dtype="<f4")
+  vertices[:, :, 0] = x
+  vertices[:, :, 1] = rng.random((height, width), dtype=np.float32)
+  vertices[:, :, 2] = y
+  vertices[:, :, 4] = 1
+  vertices[:, :, 6] = x / (width - 1)
+  vertices[:, :, 7] = y / (height - 1)
+  if strips:
+    # zigzagging down and across each row, which gives the same triangles as the list below
+    rows = np.arange(height - 1)[:, None] * width + np.arange(width)
+    indices = np.stack((rows, rows + width), axis=2)
+    return (vertices.reshape(-1, 8), indices.reshape(-1), np.full(height - 1, 2 * width - 2))
+  # two triangles per grid cell
+  corners = (np.arange(height - 1)[:, None] * width + np.arange(width - 1)).reshape(-1)
+  indices = np.stack((corners, corners + width, corners + 1, corners + 1, corners + width, corners + width + 1), axis=1)
+  return (vertices.reshape(-1, 8), indices.reshape(-1), None)
+
+def WriteMesh(writer, numVertices, rng, quantizedPositions=False, strips=False):
+  # with quantizedPositions, positions are stored as shorts along with the unpack matrix that turns them back into floats,
+  # as the PowerVR exporters can do
+  # returns (vertex count, triangle count)
+  (vertices, indices, stripLengths) = GenerateGrid(numVertices, rng, strips)
+  numTriangles = len(indices) // 3 if stripLengths is None else int(stripLengths.sum())
+  indexType = EPVRMesh.FaceData.e16Bit if len(vertices) <= 0x10000 else EPVRMesh.FaceData.e32Bit
+  indices = indices.astype("<u2" if indexType == EPVRMesh.FaceData.e16Bit else "<u4")
+  positionType = EPVRMesh.VertexData.eFloat
+  if quantizedPositions:
+    # four shorts, so that the floats after them stay aligned
+    lower = vertices[:, 0:3].min(axis=0)
+    scale = np.maximum(vertices[:, 0:3].max(axis=0) - lower, 1e-6) / 32767
+    positions = np.zeros((len(vertices), 4), dtype="<i2")
+    positions[:, 0:3] = np.round((vertices[:, 0:3] - lower) / scale)
+    data = np.concatenate((positions.view(np.uint8), vertices[:, 3:8].view(np.uint8)), axis=1)
+    positionType = EPVRMesh.VertexData.eShort
+    # column-major, like every pod matrix
+    unpackMatrix = np.identity(4, dtype=np.float32)
+    unpackMatrix[np.arange(3), np.arange(3)] = scale
+    unpackMatrix[0:3, 3] = lower
+  else:
+    data = vertices.view(np.uint8)
+  stride = data.shape[1]
+  positionSize = stride - 20
+
+  writer.WriteTag(EPODIdentifiers.eSceneMesh)
+  writer.WriteUInt(EPODIdentifiers.eMeshNumVertices, len(vertices))
+  writer.WriteUInt(EPODIdentifiers.eMeshNumFaces, numTriangles)
+  if stripLengths is not None:
+    writer.WriteUInt(EPODIdentifiers.eMeshNumStrips, len(stripLengths))
+    writer.WriteTag(EPODIdentifiers.eMeshStripLength, stripLengths.astype("<u4").tobytes())
+  writer.WriteInt(EPODIdentifiers.eMeshNumUVWChannels, 1)
+  if quantizedPositions:
+    writer.WriteFloats(EPODIdentifiers.eMeshUnpackMatrix, unpackMatrix.T.reshape(-1))
+  writer.WriteDataBlock(EPODIdentifiers.eMeshVertexIndexList, indexType, 1, indices.itemsize, indices.tobytes())
+  writer.WriteTag(EPODIdentifiers.eMeshInteravedDataList, data.tobytes())
+  writer.WriteDataBlock(EPODIdentifiers.eMeshVertexList, positionType, 4 if quantizedPositions else 3, stride, struct.pack("<I", 0))
+  writer.WriteDataBlock(EPODIdentifiers.eMeshNormalList, EPVRMesh.VertexData.eFloat, 3, stride, struct.pack("<I", positionSize))
+  writer.WriteDataBlock(EPODIdentifiers.eMeshUVWList, EPVRMesh.VertexData.eFloat, 2, stride, struct.pack("<I", positionSize + 12))
+  writer.WriteEndTag(EPODIdentifiers.eSceneMesh)
+  return (len(vertices), numTriangles)
+
+def WriteNode(writer, index, name, materialIndex, parentIndex, numFrames, position):
+  writer.WriteTag(EPODIdentifiers.eSceneNode)
+  writer.WriteInt(EPODIdentifiers.eNodeIndex, index)
+  writer.WriteString(EPODIdentifiers.eNodeName, name)
+  writer.WriteInt(EPODIdentifiers.eNodeMaterialIndex, materialIndex)
+  writer.WriteInt(EPODIdentifiers.eNodeParentIndex, parentIndex)
+  frames = np.arange(numFrames, dtype=np.float32)
+  if numFrames > 1:
+    # nodes bob up and down while turning around y
+    writer.WriteUInt(EPODIdentifiers.eNodeAnimationFlags, EPVRAnimation.eHasPositionAnimation | EPVRAnimation.eHasRotationAnimation)
+  angles = frames / max(numFrames, 1) * np.pi
+  positions = np.tile(np.asarray(position, dtype=np.float32), (numFrames, 1))
+  positions[:, 1] += np.sin(angles)
+  rotations = np.zeros((numFrames, 4), dtype=np.float32)
+  rotations[:, 1] = np.sin(angles / 2)
+  rotations[:, 3] = np.cos(angles / 2)
+  writer.WriteFloats(EPODIdentifiers.eNodeAnimationPosition, positions)
+  writer.WriteFloats(EPODIdentifiers.eNodeAnimationRotation, rotations)
+  writer.WriteFloats(EPODIdentifiers.eNodeAnimationScale, [1, 1, 1, 0, 0, 0, 1])
+  writer.WriteEndTag(EPODIdentifiers.eSceneNode)
+
+def WriteTexture(texturePath, size, rng):
+  # an uncompressed r8g8b8a8 .pvr file holding noise, so that png compression has some work to do
+  header = struct.pack("<13I",
+    0x03525650, 0,
+    # pixel format, channel names in the low word and bit widths in the high word
+    0x61626772, 0x08080808,
+    0, 0,
+    size, size, 1, 1, 1, 1,
+    0
+  )
+  with open(texturePath, "wb") as stream:
+    stream.write(header)
+    stream.write(rng.integers(0, 256, size * size * 4, dtype=np.uint8).tobytes())
+
+def WriteSyntheticPOD(podPath, numMeshes=8, numVertices=1024, nodeDepth=1, numFrames=1, numTextures=0, textureSize=256, seed=0, quantizedPositions=False, strips=False):
+  # every mesh gets a mesh node at the bottom of a chain of nodeDepth nodes
+  # textures are written as .pvr files next to the .pod, each used by its own material
+  # returns the actual counts, since meshes are rounded to a whole grid of vertices
+  rng = np.random.default_rng(seed)
+  nodeDepth = max(nodeDepth, 1)
+  numFrames = max(numFrames, 1)
+  numMaterials = max(numTextures, 1)
+  numNodes = numMeshes * nodeDepth
+  totals = {"meshes": numMeshes, "vertices": 0, "triangles": 0, "nodes": numNodes, "frames": numFrames, "textures": numTextures}
+
+  with open(podPath, "wb") as stream:
+    writer = PODWriter(stream)
+    writer.WriteString(EPODIdentifiers.eFormatVersion, EPODDefines.PODFormatVersion)
+    writer.WriteTag(EPODIdentifiers.eScene)
+    writer.WriteFloats(EPODIdentifiers.eSceneClearColour, [0, 0, 0])
+    writer.WriteFloats(EPODIdentifiers.eSceneAmbientColour, [0, 0, 0])
+    writer.WriteInt(EPODIdentifiers.eSceneNumCameras, 0)
+    writer.WriteInt(EPODIdentifiers.eSceneNumLights, 0)
+    writer.WriteInt(EPODIdentifiers.eSceneNumMeshes, numMeshes)
+    writer.WriteInt(EPODIdentifiers.eSceneNumNodes, numNodes)
+    writer.WriteInt(EPODIdentifiers.eSceneNumMeshNodes, numMeshes)
+    writer.WriteInt(EPODIdentifiers.eSceneNumTextures, numTextures)
+    writer.WriteInt(EPODIdentifiers.eSceneNumMaterials, numMaterials)
+    writer.WriteInt(EPODIdentifiers.eSceneNumFrames, numFrames)
+    writer.WriteInt(EPODIdentifiers.eSceneFPS, 30)
+
+    for meshIndex in range(numMeshes):
+      (meshVertices, meshTriangles) = WriteMesh(writer, numVertices, rng, quantizedPositions, strips)
+      totals["vertices"] += meshVertices
+      totals["triangles"] += meshTriangles
+
+    # mesh nodes come first, as in files written by the PowerVR exporters, followed by their ancestors
+    for meshIndex in range(numMeshes):
+      chainStart = numMeshes + meshIndex * (nodeDepth - 1)
+      parentIndex = chainStart + nodeDepth - 2 if nodeDepth > 1 else -1
+      WriteNode(writer, meshIndex, "mesh%d" % meshIndex, meshIndex % numMaterials, parentIndex, numFrames, (0, 0, 0))
+    for meshIndex in range(numMeshes):
+      chainStart = numMeshes + meshIndex * (nodeDepth - 1)
+      for depth in range(nodeDepth - 1):
+        parentIndex = chainStart + depth - 1 if depth > 0 else -1
+        WriteNode(writer, -1, "node%d_%d" % (meshIndex, depth), -1, parentIndex, numFrames, (meshIndex if depth == 0 else 1, 0, 0))
+
+    for textureIndex in range(numTextures):
+      name = "texture%d" % textureIndex
+      WriteTexture(path.join(path.dirname(podPath), name + ".pvr"), textureSize, rng)
+      writer.WriteTag(EPODIdentifiers.eSceneTexture)
+      writer.WriteString(EPODIdentifiers.eTextureFilename, name + ".pvr")
+      writer.WriteEndTag(EPODIdentifiers.eSceneTexture)
+
+    for materialIndex in range(numMaterials):
+      writer.WriteTag(EPODIdentifiers.eSceneMaterial)
+      writer.WriteString(EPODIdentifiers.eMaterialName, "material%d" % materialIndex)
+      writer.WriteInt(EPODIdentifiers.eMaterialDiffuseTextureIndex, materialIndex if materialIndex < numTextures else -1)
+      writer.WriteFloats(EPODIdentifiers.eMaterialDiffuseColour, [1, 1, 1])
+      writer.WriteFloats(EPODIdentifiers.eMaterialShininess, [0.5])
+      writer.WriteEndTag(EPODIdentifiers.eSceneMaterial)
+
+    writer.WriteEndTag(EPODIdentifiers.eScene)
+  return totals
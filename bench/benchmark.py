@@ -0,0 +1,183 @@
+# times parsing, conversion and saving of synthetic .pod models, and writes the results as json
+# so that runs on different commits can be compared:
+#   python3 bench/benchmark.py --output before.json
+#   python3 bench/benchmark.py --compare before.json
+import sys
+from os import path
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from bench.PODWriter import WriteSyntheticPOD
+from PowerVR.PVRPODLoader import PVRPODLoader
+from extract import POD2GLB
+import json
+import numpy as np
+import os
+import time
+import platform
+import argparse
+import tempfile
+import tracemalloc
+import statistics
+import subprocess as sp
+
+STAGES = ("parse", "convert", "textures", "save")
+
+def run_stages(podpath, glbpath, options, timer):
+  # timer(stage, function) runs one stage of the conversion
+  pod = timer("parse", lambda: PVRPODLoader.open(podpath, memoryMap=options.get("use_mmap", False)))
+  converter = POD2GLB()
+  converter.set_options(**options)
+  converter.pod = pod
+  converter.scene = pod.scene
+  timer("convert", converter.convert_scene)
+  timer("textures", converter.wait_textures)
+  timer("save", lambda: converter.glb.save(glbpath))
+
+def time_stages(podpath, glbpath, options):
+  times = {}
+  def timer(stage, function):
+    start = time.perf_counter()
+    result = function()
+    times[stage] = time.perf_counter() - start
+    return result
+  run_stages(podpath, glbpath, options, timer)
+  return times
+
+def measure_memory(podpath, glbpath, options):
+  # peak python and numpy allocations during each stage, over what was allocated when it started
+  # this is a separate run, since tracing allocations slows everything down
+  peaks = {}
+  def timer(stage, function):
+    start = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    result = function()
+    peaks[stage] = tracemalloc.get_traced_memory()[1] - start
+    return result
+  tracemalloc.start()
+  try:
+    run_stages(podpath, glbpath, options, timer)
+  finally:
+    tracemalloc.stop()
+  return peaks
+
+def get_commit():
+  try:
+    return sp.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=path.dirname(path.abspath(__file__)), stderr=sp.DEVNULL, text=True).strip()
+  except (OSError, sp.CalledProcessError):
+    return None
+
+def get_max_rss():
+  # peak resident set size of the whole process in bytes, where the platform reports it
+  try:
+    import resource
+  except ImportError:
+    return None
+  maxRSS = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+  # kilobytes on linux, bytes on macos
+  return maxRSS if sys.platform == "darwin" else maxRSS * 1024
+
+def benchmark(scene, options, repeat):
+  workdir = tempfile.mkdtemp(prefix="pod2glb-bench-")
+  cwd = os.getcwd()
+  # textures are found and written relative to the working directory
+  os.chdir(workdir)
+  try:
+    podpath = path.join(workdir, "bench.pod")
+    glbpath = path.join(workdir, "bench.glb")
+    counts = WriteSyntheticPOD(podpath, **scene)
+    runs = [time_stages(podpath, glbpath, options) for i in range(repeat)]
+    peaks = measure_memory(podpath, glbpath, options)
+    counts["podBytes"] = path.getsize(podpath)
+    counts["glbBytes"] = path.getsize(glbpath)
+  finally:
+    os.chdir(cwd)
+    for name in os.listdir(workdir):
+      os.remove(path.join(workdir, name))
+    os.rmdir(workdir)
+
+  stages = {}
+  for stage in STAGES:
+    times = [run[stage] for run in runs]
+    stages[stage] = {
+      "min": min(times),
+      "median": statistics.median(times),
+      "mean": statistics.mean(times),
+      "times": times,
+      "peakMemory": peaks[stage],
+    }
+  return {
+    "commit": get_commit(),
+    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    "python": platform.python_version(),
+    "numpy": np.__version__,
+    "platform": platform.platform(),
+    "scene": dict(scene, **counts),
+    "options": options,
+    "repeat": repeat,
+    "stages": stages,
+    "maxRSS": get_max_rss(),
+  }
+
+def print_results(results, baseline=None):
+  scene = results["scene"]
+  print("%(meshes)d meshes, %(vertices)d vertices, %(triangles)d triangles, %(nodes)d nodes, %(frames)d frames, %(textures)d textures" % scene)
+  print("%.2f MB .pod -> %.2f MB .glb" % (scene["podBytes"] / (1024 * 1024), scene["glbBytes"] / (1024 * 1024)))
+  for stage in STAGES:
+    result = results["stages"][stage]
+    line = "%-9s median %8.2fms  min %8.2fms  peak %8.2f MB" % (stage, result["median"] * 1000, result["min"] * 1000, result["peakMemory"] / (1024 * 1024))
+    if baseline and stage in baseline["stages"]:
+      before = baseline["stages"][stage]["median"]
+      line += "  (%.2fms before, x%.2f)" % (before * 1000, result["median"] / before if before else float("inf"))
+    print(line)
+
+def main(args=None):
+  parser = argparse.ArgumentParser(description="Benchmark .pod to .glb conversion on a synthetic model")
+  parser.add_argument("--meshes", type=int, default=8, help="number of meshes (default 8)")
+  parser.add_argument("--vertices", type=int, default=16384, help="vertices per mesh, rounded to a grid (default 16384)")
+  parser.add_argument("--depth", type=int, default=4, help="depth of the node chain above each mesh node (default 4)")
+  parser.add_argument("--frames", type=int, default=30, help="number of animation frames (default 30)")
+  parser.add_argument("--textures", type=int, default=2, help="number of .pvr textures (default 2)")
+  parser.add_argument("--texture-size", type=int, default=256, help="texture width and height (default 256)")
+  parser.add_argument("--seed", type=int, default=0, help="random seed for the synthetic model")
+  parser.add_argument("-n", "--repeat", type=int, default=5, help="number of timed runs (default 5)")
+  parser.add_argument("--mmap", action="store_true", help="memory map the .pod file")
+  parser.add_argument("--optimize", action="store_true", help="run the vertex cache optimizer")
+  parser.add_argument("--quantize", action="store_true", help="quantize vertex attributes")
+  parser.add_argument("--compress", action="store_true", help="compress vertex and index data")
+  parser.add_argument("--texture-jobs", metavar="N", type=int, default=4, help="number of texture conversion threads (default 4)")
+  parser.add_argument("-o", "--output", help="write the results to this json file")
+  parser.add_argument("--compare", metavar="JSON", help="compare against the results of an earlier run")
+  args = parser.parse_args(args)
+
+  scene = {
+    "numMeshes": args.meshes,
+    "numVertices": args.vertices,
+    "nodeDepth": args.depth,
+    "numFrames": args.frames,
+    "numTextures": args.textures,
+    "textureSize": args.texture_size,
+    "seed": args.seed,
+  }
+  options = {
+    "use_mmap": args.mmap,
+    "optimize_meshes": args.optimize,
+    "quantize": args.quantize,
+    "compress": args.compress,
+    "texture_workers": args.texture_jobs,
+  }
+  baseline = None
+  if args.compare:
+    with open(args.compare) as stream:
+      baseline = json.load(stream)
+    if baseline["scene"] != dict(baseline["scene"], **scene) or baseline["options"] != options:
+      print("warning: %s was run with a different model or options" % args.compare)
+
+  results = benchmark(scene, options, max(args.repeat, 1))
+  print_results(results, baseline)
+  if args.output:
+    with open(args.output, "w") as stream:
+      json.dump(results, stream, indent=2)
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
@@ -0,0 +1,151 @@
+# times how long short-lived runs of extract.py take to start up, import and convert a tiny model, in fresh processes,
+# and which modules importing extract pulls in, so that import time regressions get caught:
+#   python3 bench/startup.py --output before.json
+#   python3 bench/startup.py --compare before.json
+# with --compare the exit status is 1 if any run got slower than --tolerance allows
+import sys
+from os import path
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+from bench.PODWriter import WriteSyntheticPOD
+from bench.benchmark import get_commit
+import json
+import os
+import time
+import platform
+import argparse
+import tempfile
+import statistics
+import subprocess as sp
+
+ROOT = path.dirname(path.dirname(path.abspath(__file__)))
+EXTRACT = path.join(ROOT, "extract.py")
+
+def get_runs(podpath, glbpath):
+  # name -> command line, each run in a new python process
+  return {
+    # the interpreter by itself, which everything else includes
+    "python": [sys.executable, "-c", "pass"],
+    "import": [sys.executable, "-c", "import extract"],
+    "help": [sys.executable, EXTRACT, "--help"],
+    "convert": [sys.executable, EXTRACT, podpath, glbpath],
+  }
+
+def get_env():
+  env = dict(os.environ, PYTHONPATH=ROOT)
+  # without cached bytecode every run would include compiling the modules
+  env.pop("PYTHONDONTWRITEBYTECODE", None)
+  return env
+
+def time_run(command, env, cwd):
+  start = time.perf_counter()
+  sp.run(command, env=env, cwd=cwd, stdout=sp.DEVNULL, stderr=sp.DEVNULL, check=True)
+  return time.perf_counter() - start
+
+def get_imports(env, cwd):
+  # (module -> cumulative import time in seconds for the modules extract imports directly, every module imported)
+  script = "import sys; before = set(sys.modules); import extract; print('\\n'.join(sorted(set(sys.modules) - before)))"
+  result = sp.run([sys.executable, "-X", "importtime", "-c", script], env=env, cwd=cwd, capture_output=True, text=True, check=True)
+  # lines are "import time: self [us] | cumulative | imported package", indented by nesting depth,
+  # and each module's line comes after the lines of the modules it imports
+  imports = {}
+  children = {}
+  for line in result.stderr.splitlines():
+    if not line.startswith("import time:") or line.endswith("imported package"):
+      continue
+    (selfTime, cumulative, name) = line[len("import time:"):].split("|")
+    depth = (len(name) - len(name.lstrip())) // 2
+    if depth == 1:
+      children[name.strip()] = int(cumulative) / 1e6
+    elif depth == 0:
+      if name.strip() == "extract":
+        imports = children
+      children = {}
+  return (imports, result.stdout.split())
+
+def benchmark(repeat):
+  workdir = tempfile.mkdtemp(prefix="pod2glb-startup-")
+  env = get_env()
+  try:
+    podpath = path.join(workdir, "tiny.pod")
+    glbpath = path.join(workdir, "tiny.glb")
+    WriteSyntheticPOD(podpath, numMeshes=1, numVertices=64)
+    runs = get_runs(podpath, glbpath)
+    # one untimed run of each, which writes the bytecode caches
+    for name in runs:
+      time_run(runs[name], env, workdir)
+    # runs are interleaved so that anything else happening on the machine affects them all alike
+    times = {name: [] for name in runs}
+    for i in range(repeat):
+      for name in runs:
+        times[name].append(time_run(runs[name], env, workdir))
+    (imports, modules) = get_imports(env, workdir)
+  finally:
+    for name in os.listdir(workdir):
+      os.remove(path.join(workdir, name))
+    os.rmdir(workdir)
+
+  return {
+    "commit": get_commit(),
+    "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    "python": platform.python_version(),
+    "platform": platform.platform(),
+    "repeat": repeat,
+    "runs": {name: {
+      "min": min(times[name]),
+      "median": statistics.median(times[name]),
+      "times": times[name],
+    } for name in times},
+    "imports": imports,
+    "modules": modules,
+  }
+
+def print_results(results, baseline=None, tolerance=0.2):
+  # returns the names of runs that got slower than the tolerance allows
+  slower = []
+  for (name, result) in results["runs"].items():
+    line = "%-8s median %8.2fms  min %8.2fms" % (name, result["median"] * 1000, result["min"] * 1000)
+    if baseline and name in baseline["runs"]:
+      before = baseline["runs"][name]["median"]
+      line += "  (%.2fms before, x%.2f)" % (before * 1000, result["median"] / before if before else float("inf"))
+      if result["median"] > before * (1 + tolerance):
+        slower.append(name)
+        line += "  SLOWER"
+    print(line)
+  print("importing extract:")
+  for (name, elapsed) in sorted(results["imports"].items(), key=lambda item: -item[1]):
+    print("  %-32s %8.2fms" % (name, elapsed * 1000))
+  if baseline:
+    added = sorted(set(results["modules"]) - set(baseline["modules"]))
+    removed = sorted(set(baseline["modules"]) - set(results["modules"]))
+    if added:
+      print("newly imported: %s" % ", ".join(added))
+    if removed:
+      print("no longer imported: %s" % ", ".join(removed))
+  return slower
+
+def main(args=None):
+  parser = argparse.ArgumentParser(description="Benchmark the startup and import time of extract.py")
+  parser.add_argument("-n", "--repeat", type=int, default=20, help="number of timed runs of each command (default 20)")
+  parser.add_argument("-o", "--output", help="write the results to this json file")
+  parser.add_argument("--compare", metavar="JSON", help="compare against the results of an earlier run")
+  parser.add_argument("--tolerance", metavar="PERCENT", type=float, default=20, help="how much slower than --compare's results runs can be before failing (default 20)")
+  args = parser.parse_args(args)
+
+  baseline = None
+  if args.compare:
+    with open(args.compare) as stream:
+      baseline = json.load(stream)
+
+  results = benchmark(max(args.repeat, 1))
+  slower = print_results(results, baseline, args.tolerance / 100)
+  if args.output:
+    with open(args.output, "w") as stream:
+      json.dump(results, stream, indent=2)
+  if slower:
+    print("slower than %s: %s" % (args.compare, ", ".join(slower)))
+    return 1
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
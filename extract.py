@@ -1,10 +1,18 @@
-from PowerVR.PVRPODLoader import PVRPODLoader
+from PowerVR.PVRPODLoader import PVRPODLoader, PVRPODFormatError
+from PowerVR.PVRVertexTransform import PVRVertexTransform
+from PowerVR.PVRMesh import EPVRMesh, PVRNormalizedVertexDataTypes, PVRVertexDataTypeMap
+from PowerVR.PVRSkin import PVRSkin
 from GLB.GLBExporter import GLBExporter
-import struct
+from GLB.GLBQuantize import GLBAccessorTypes, getComponentType, getAccessorBounds, quantizePositions, quantizeDirections, quantizeTexCoords, interleave
+import io
 import json
-from sys import argv
+import numpy as np
+import sys
 from os import path
-import subprocess as sp
+import os
+import time
+# modules that are only needed by some models, options or commands are imported where they're used,
+# so that short-lived runs and other code importing this module don't pay for them
 
 PVR_TEX_TOOL_PATH = "./PVRTexToolCLI"
 
@@ -15,33 +23,232 @@ class POD2GLB:
     self.pod = None
     self.scene = None
     self.fix_uvs = True
+    # memory map the .pod file, so vertex, index and animation data are views into the file instead of copies
+    self.use_mmap = False
+    # convert each mesh as soon as it's read and write its data out to a temporary file, so only one mesh is held at a time
+    self.streaming = False
+    # vertex attribute rewriting, see PVRVertexTransform
+    self.axis_order = None
+    self.axis_signs = None
+    self.renormalize_normals = False
+    # stripped meshes are expanded to triangle lists, unless this is set and a single stitched strip would be smaller
+    self.use_strips = False
+    # reorder triangles and vertices for the gpu vertex cache, see PVRMeshOptimizer
+    self.optimize_meshes = False
+    # and then sort clusters of triangles to cut down on overdraw, at the cost of a few more vertex cache misses
+    self.optimize_overdraw = True
+    # repack vertex data without the attributes glb meshes don't use, or the ones in drop_attributes, see PVRVertexLayout
+    # "interleaved" packs each mesh's attributes into one buffer view, "streams" gives each attribute its own,
+    # and None copies the pod's vertex data as it is, unless drop_attributes is set
+    self.vertex_layout = None
+    self.drop_attributes = ()
+    # store vertex attributes as normalized integers with KHR_mesh_quantization, see GLBQuantize
+    self.quantize = False
+    # compress vertex and index data with EXT_meshopt_compression
+    self.compress = False
+    # skinned meshes are split into parts with at most this many joints each, or None for no limit
+    self.joint_limit = None
+    # write each node's world space bounds, and a bounding volume hierarchy over the mesh nodes, as extras, see PVRModel.BuildBounds
+    self.write_bounds = True
+    self.mesh_transforms = {}
+    self.mesh_skins = {}
+    # textures are decoded in-process, unless PVRTexToolCLI is requested
+    # PVRTexToolCLI is still used as a fallback for pixel formats that can't be decoded natively, if it exists
+    self.use_texture_tool = False
+    self.texture_tool_path = PVR_TEX_TOOL_PATH
+    # converted textures can be shared between models through an on-disk cache, see PVRTextureCache
+    self.texture_cache_dir = None
+    self.texture_cache_size = 1 << 30
+    self.texture_cache = None
+    # parsed scenes can be cached too, so loading the same .pod file again skips parsing it, see PVRSceneCache
+    # streamed scenes are never held whole, so they aren't cached
+    self.scene_cache_dir = None
+    self.scene_cache_size = 1 << 30
+    self.scene_cache = None
+    # textures are converted on a pool of threads while meshes and nodes are converted, set to 0 to convert them inline
+    self.texture_workers = 4
+    self.texture_pool = None
+    # .pvr textures are read from, and .png images written to, this directory rather than the working directory
+    self.texture_dir = ""
+    # or images are written here instead, which should be the .glb file's directory for its image uris to find them
+    self.image_dir = None
+    # with this off the glb's images still refer to .png files named after the textures, but no textures are converted
+    self.write_textures = True
+    # reject texture names that are absolute or go up a directory, so textures are only ever read and written inside
+    # texture_dir; the server sets this, since its .pod files come from its clients
+    self.check_texture_names = False
+    self.texture_jobs = []
+    # statistics from the vertex layout and mesh optimizer, by glb mesh index, e.g. {0: {"optimize": {"acmrBefore": ...}}}
+    # they're also passed to the observer's on_mesh_stats
+    self.mesh_stats = {}
+    # gets timings and counters for each stage of the conversion, see POD2GLBProfiler
+    # without one no timing is done at all
+    self.observer = None
 
   @classmethod
-  def open(cls, inpath):
+  def open(cls, inpath, **options):
     converter = cls()
+    converter.set_options(**options)
     converter.load(inpath)
     return converter
 
+  def set_options(self, **options):
+    for name in options:
+      if name in ("glb", "pod", "scene") or not hasattr(self, name):
+        raise TypeError("unknown option: %s" % name)
+      setattr(self, name, options[name])
+
   def load(self, inpath):
-    # create a glb exporter
-    self.glb = GLBExporter()
-    # create a pvr pod parser
-    self.pod = PVRPODLoader.open(inpath)
+    if self.streaming:
+      self.stream_scene(inpath)
+      return
+    self.run_stage("parse", self.parse, inpath)
+    self.convert_scene()
+
+  def stream_scene(self, inpath):
+    # meshes are converted as they're read, and everything else is kept until the end of the scene, as it's small
+    self.glb = GLBExporter(compress=self.compress, spool=True)
+    self.open_texture_cache()
+    self.run_stage("parse_and_convert_meshes", self.stream_meshes, inpath)
+    self.scene.BuildSceneGraph()
+    self.run_stage("convert_textures", self.convert_textures)
+    self.run_stage("convert_nodes", self.convert_nodes)
+    self.run_stage("convert_animations", self.convert_animations)
+    self.run_stage("convert_materials", self.convert_materials)
+
+  def stream_meshes(self, inpath):
+    self.pod = PVRPODLoader.open(inpath, memoryMap=self.use_mmap, observer=self.observer, streaming=True)
+    try:
+      for (listName, index, item) in self.pod.ReadItems():
+        if listName != "meshes":
+          getattr(self.pod.scene, listName).append(item)
+          continue
+        if index == 0:
+          # the mesh count comes before the meshes in the scene block
+          self.scene = self.pod.scene
+          self.begin_meshes(self.scene.numMeshes)
+        self.add_mesh(index, item)
+      self.scene = self.pod.scene
+      if not self.glb.meshes:
+        self.begin_meshes(0)
+      self.end_meshes()
+    finally:
+      # a memory mapped file has to stay open for as long as the scene's arrays are views into it, see close()
+      if not self.use_mmap:
+        self.pod.close()
+
+  def load_bytes(self, data):
+    # a .pod file's contents, for models that aren't on disk; textures are still looked up in texture_dir
+    self.run_stage("parse", self.parse_bytes, data)
+    self.convert_scene()
+
+  def parse_bytes(self, data):
+    self.pod = PVRPODLoader(io.BytesIO(data), observer=self.observer)
     self.scene = self.pod.scene
-    self.convert_meshes()
-    self.convert_nodes()
-    self.convert_textures()
-    self.convert_materials()
+
+  def open_texture_cache(self):
+    if self.texture_cache is None and self.texture_cache_dir:
+      from PowerVR.PVRTextureCache import PVRTextureCache
+      self.texture_cache = PVRTextureCache(self.texture_cache_dir, self.texture_cache_size)
+
+  def parse(self, inpath):
+    if self.scene_cache is None and self.scene_cache_dir:
+      from PowerVR.PVRSceneCache import PVRSceneCache
+      self.scene_cache = PVRSceneCache(self.scene_cache_dir, self.scene_cache_size)
+    if self.scene_cache is not None:
+      self.scene = self.scene_cache.load(inpath, self.parse_pod)
+    else:
+      self.scene = self.parse_pod(inpath)
+
+  def parse_pod(self, inpath):
+    # create a pvr pod parser
+    self.pod = PVRPODLoader.open(inpath, memoryMap=self.use_mmap, observer=self.observer)
+    return self.pod.scene
+
+  def convert_scene(self):
+    # create a glb exporter
+    self.glb = GLBExporter(compress=self.compress)
+    self.open_texture_cache()
+    # textures go first so that their conversion jobs overlap with everything else
+    self.run_stage("convert_textures", self.convert_textures)
+    self.run_stage("convert_meshes", self.convert_meshes)
+    self.run_stage("convert_nodes", self.convert_nodes)
+    self.run_stage("convert_animations", self.convert_animations)
+    self.run_stage("convert_materials", self.convert_materials)
 
   def save(self, path):
-    self.glb.save(path)
+    self.run_stage("wait_textures", self.wait_textures)
+    self.run_stage("save", self.write_glb, path)
+
+  def save_file(self, f):
+    # writes the .glb file to a binary file object
+    self.run_stage("wait_textures", self.wait_textures)
+    self.run_stage("save", self.glb.write, f)
+
+  def save_bytes(self):
+    # returns the .glb file's contents
+    f = io.BytesIO()
+    self.save_file(f)
+    return f.getvalue()
+
+  def write_glb(self, path):
+    numBytes = self.glb.save(path)
+    if self.observer is not None:
+      self.observer.on_write(path, numBytes)
+
+  def close(self):
+    # closes the .pod file, dropping the scene and glb along with it, since when the file is memory mapped
+    # their arrays are views into it; the texture and scene caches and the observer are kept
+    self.scene = None
+    self.glb = None
+    if self.pod is not None:
+      (pod, self.pod) = (self.pod, None)
+      pod.scene = None
+      pod.close()
+
+  def __enter__(self):
+    return self
+
+  def __exit__(self, *exc):
+    self.close()
+
+  def run_stage(self, name, stage, *args):
+    if self.observer is None:
+      stage(*args)
+      return
+    start = time.perf_counter()
+    stage(*args)
+    self.observer.on_stage(name, time.perf_counter() - start)
+
+  def wait_textures(self):
+    # blocks until all texture conversions are done, raising the first error if one failed
+    if self.texture_pool is None:
+      return
+    from concurrent.futures import wait
+    jobs = self.texture_jobs
+    self.texture_jobs = []
+    wait(jobs)
+    self.texture_pool.shutdown()
+    self.texture_pool = None
+    for job in jobs:
+      job.result()
+
+  def check_texture_name(self, name):
+    # windows paths are checked too, whatever system this runs on
+    parts = name.replace("\\", "/").split("/")
+    if path.isabs(name) or name[:1] in ("/", "\\") or parts[0][1:2] == ":" or ".." in parts:
+      raise PVRPODFormatError("texture name %r isn't a path inside the texture directory" % name)
 
   def convert_textures(self):  
-    for (textureIndex, texture) in enumerate(self.scene.textures):
-      self.glb.addImage({
+    for texture in self.scene.textures:
+      if self.check_texture_names:
+        self.check_texture_name(texture.name)
+      # textures sharing an image or sampler settings share a single glb image or sampler
+      numImages = len(self.glb.images)
+      imageIndex = self.glb.addImage({
         "uri": texture.getPath(dir="", ext=".png")
       })
-      self.glb.addSampler({
+      samplerIndex = self.glb.addSampler({
         "magFilter": 9729,
         "minFilter": 9987,
         "wrapS": 10497,
@@ -49,16 +256,71 @@ class POD2GLB:
       })
       self.glb.addTexture({
         "name": texture.name,
-        "sampler": textureIndex,
-        "source": textureIndex
+        "sampler": samplerIndex,
+        "source": imageIndex
       })
-      sp.call([
-        PVR_TEXT_TOOL_PATH,
-        "-f", "r8g8b8a8",
-        "-i", texture.getPath(dir="", ext=".pvr"),
-        "-d", texture.getPath(dir="", ext=".png")
-      ])
-  
+      # only convert each image once
+      if len(self.glb.images) > numImages and self.write_textures:
+        imageDir = self.texture_dir if self.image_dir is None else self.image_dir
+        self.submit_texture(texture.getPath(dir=self.texture_dir, ext=".pvr"), texture.getPath(dir=imageDir, ext=".png"))
+
+  def submit_texture(self, inpath, outpath):
+    if not self.texture_workers:
+      self.convert_texture(inpath, outpath)
+      return
+    # decoding, png compression and PVRTexToolCLI all release the GIL, so threads are enough here
+    if self.texture_pool is None:
+      from concurrent.futures import ThreadPoolExecutor
+      self.texture_pool = ThreadPoolExecutor(max_workers=self.texture_workers)
+    self.texture_jobs.append(self.texture_pool.submit(self.convert_texture, inpath, outpath))
+
+  def convert_texture(self, inpath, outpath):
+    if self.observer is None:
+      self.convert_cached_texture(inpath, outpath)
+      return
+    # called from the texture threads, so observers have to be thread safe here
+    start = time.perf_counter()
+    self.convert_cached_texture(inpath, outpath)
+    self.observer.on_texture(inpath, time.perf_counter() - start)
+    if path.exists(outpath):
+      self.observer.on_write(outpath, path.getsize(outpath))
+
+  def convert_cached_texture(self, inpath, outpath):
+    if self.texture_cache is None:
+      self.decode_texture(inpath, outpath)
+      return
+    settings = {
+      "format": "r8g8b8a8",
+      "tool": self.texture_tool_path if self.use_texture_tool else None,
+    }
+    try:
+      self.texture_cache.convert(inpath, outpath, self.decode_texture, settings)
+    except OSError as e:
+      print("could not convert texture", inpath, "--", e)
+
+  def decode_texture(self, inpath, outpath):
+    from PowerVR.PVRTextureLoader import PVRTextureLoader
+    from PowerVR.PVRTextureDecoder import PVRTextureFormatError
+    from GLB.PNGEncoder import savePNG
+    import subprocess as sp
+    if not self.use_texture_tool:
+      try:
+        savePNG(outpath, PVRTextureLoader.open(inpath).Decode())
+        return
+      except PVRTextureFormatError as e:
+        if not path.exists(self.texture_tool_path):
+          print("could not convert texture", inpath, "--", e)
+          return
+      except (OSError, ValueError) as e:
+        print("could not convert texture", inpath, "--", e)
+        return
+    sp.call([
+      self.texture_tool_path,
+      "-f", "r8g8b8a8",
+      "-i", inpath,
+      "-d", outpath
+    ])
+
   def convert_materials(self):
     for (materialIndex, material) in enumerate(self.scene.materials):
       if material.diffuseTextureIndex > -1:
@@ -80,104 +342,661 @@ class POD2GLB:
       })
 
   def convert_nodes(self):
+    meshNodes = []
+    # only needed for skins
+    worldMatrices = None
+    # the node's rest pose is the first frame of its animation, changed to the same axes as the vertices,
+    # which the scene keeps for the world matrices used by skins and bounds
+    self.scene.restTransforms = self.vertex_transform.ApplyToTransforms(*self.scene.GetRestTransforms())
+    (translations, rotations, scales) = self.scene.restTransforms
+    if self.write_bounds:
+      self.scene.BuildBounds([self.mesh_bounds.get(meshIndex) for meshIndex in range(self.num_meshes)])
+      hasBounds = np.isfinite(self.scene.nodeBounds).all(axis=(1, 2)).tolist()
+      nodeBounds = self.scene.nodeBounds.tolist()
     for (nodeIndex, node) in enumerate(self.scene.nodes):
       nodeEntry = {
         "name": node.name,
-        "children": [i for (i, node) in enumerate(self.scene.nodes) if node.parentIndex == nodeIndex],
-        "translation": node.animation.positions.tolist(),
-        "scale": node.animation.scales[0:3].tolist(),
-        "rotation": node.animation.rotations[0:4].tolist(),
+        "children": self.scene.GetChildren(nodeIndex).tolist(),
+        "translation": translations[nodeIndex].tolist(),
+        "scale": scales[nodeIndex].tolist(),
+        "rotation": rotations[nodeIndex].tolist(),
       }
+      if self.write_bounds and hasBounds[nodeIndex]:
+        nodeEntry["extras"] = {"bounds": {"min": nodeBounds[nodeIndex][0], "max": nodeBounds[nodeIndex][1]}}
       # if the node has a mesh index
       if node.index != -1: 
         meshIndex = node.index
-        nodeEntry["mesh"] = meshIndex
+        if meshIndex in self.mesh_skins:
+          # skinned meshes ignore their node's transform, which is instead folded into the inverse bind matrices
+          # along with any dequantization, so parts past the first can go straight on child nodes
+          if worldMatrices is None:
+            worldMatrices = self.scene.GetWorldMatrices()
+          for (partIndex, (glbMeshIndex, jointNodes)) in enumerate(self.mesh_skins[meshIndex]):
+            skinIndex = self.convert_skin(nodeIndex, glbMeshIndex, jointNodes, worldMatrices)
+            if partIndex == 0:
+              nodeEntry["mesh"] = glbMeshIndex
+              nodeEntry["skin"] = skinIndex
+            else:
+              nodeEntry["children"].append(len(self.scene.nodes) + len(meshNodes))
+              meshNodes.append({"name": node.name, "mesh": glbMeshIndex, "skin": skinIndex})
+        elif meshIndex in self.mesh_transforms:
+          # quantized meshes go on a child node holding the dequantization transform, so it doesn't affect the node's children
+          nodeEntry["children"].append(len(self.scene.nodes) + len(meshNodes))
+          meshNodes.append(dict(self.mesh_transforms[meshIndex], name=node.name, mesh=meshIndex))
+        else:
+          nodeEntry["mesh"] = meshIndex
         if node.materialIndex != -1:
-          self.glb.meshes[meshIndex]["primitives"][0]["material"] = node.materialIndex
+          for glbMeshIndex in [part[0] for part in self.mesh_skins.get(meshIndex, [])] or [meshIndex]:
+            self.glb.meshes[glbMeshIndex]["primitives"][0]["material"] = node.materialIndex
 
-      # if the node index is -1 it is a root node
-      if node.parentIndex == -1:
-        self.glb.addRootNodeIndex(nodeIndex)
-      
       self.glb.addNode(nodeEntry)
+
+    for meshNode in meshNodes:
+      self.glb.addNode(meshNode)
+
+    for nodeIndex in self.scene.GetRootNodes().tolist():
+      self.glb.addRootNodeIndex(nodeIndex)
+    if self.write_bounds:
+      # pod nodes keep their indices in the glb
+      bvh = self.scene.bvh
+      self.glb.setSceneExtras({"bvh": {
+        "min": bvh.bounds[:, 0].reshape(-1).tolist(),
+        "max": bvh.bounds[:, 1].reshape(-1).tolist(),
+        "offsets": bvh.offsets.tolist(),
+        "counts": bvh.counts.tolist(),
+        "nodes": bvh.items.tolist(),
+      }})
   
-  def convert_meshes(self):
-    for (meshIndex, mesh) in enumerate(self.scene.meshes):
-      attributes = {}
-      numFaces = mesh.primitiveData["numFaces"]
-      numVertices = mesh.primitiveData["numVertices"]
-
-      # face index buffer view
-      indices = mesh.faces["data"]
-      indicesAccessorIndex = self.glb.addAccessor({
-        "bufferView": self.glb.addBufferView({
-          "buffer": 0,
-          "byteOffset": self.glb.addData(indices.tobytes()),
-          "byteLength": len(indices) * indices.itemsize,
-          "target": 34963
-        }),
+  def convert_skin(self, nodeIndex, meshIndex, jointNodes, worldMatrices):
+    # inverse bind matrices take vertices from the mesh's space at the rest pose into the space of each joint
+    bindMatrix = worldMatrices[nodeIndex]
+    transform = self.mesh_transforms.get(meshIndex)
+    if transform is not None and "matrix" in transform:
+      bindMatrix = bindMatrix @ np.array(transform["matrix"]).reshape(4, 4).T
+    elif transform is not None:
+      dequantize = np.diag(transform["scale"] + [1])
+      dequantize[0:3, 3] = transform["translation"]
+      bindMatrix = bindMatrix @ dequantize
+    try:
+      inverseBindMatrices = np.linalg.inv(worldMatrices[jointNodes]) @ bindMatrix
+    except np.linalg.LinAlgError:
+      # a joint with a zero scale
+      inverseBindMatrices = np.linalg.pinv(worldMatrices[jointNodes]) @ bindMatrix
+    # glTF matrices are column-major
+    inverseBindMatrices = inverseBindMatrices.transpose(0, 2, 1).astype(np.float32).reshape(-1, 16)
+    return self.glb.addSkin({
+      "inverseBindMatrices": self.glb.addAccessor({
+        "bufferView": self.glb.addBufferViewData(inverseBindMatrices),
         "byteOffset": 0,
-        # https://github.com/KhronosGroup/glTF/blob/master/specification/2.0/README.md#accessor-element-size
-        "componentType": 5123,
-        "count": numFaces * 3,
-        "type": "SCALAR"
-      })
+        "componentType": 5126,
+        "count": len(inverseBindMatrices),
+        "type": "MAT4"
+      }),
+      "joints": jointNodes.tolist()
+    })
+
+  def convert_animations(self):
+    # all animated nodes go into a single glb animation, with keyframes at every frame
+    numFrames = self.scene.numFrames
+    if numFrames <= 1:
+      return
+    fps = self.scene.fps or 30
+    # keyframe data for each path is gathered into one buffer view
+    outputs = {"translation": [], "rotation": [], "scale": []}
+    channels = []
+    for (nodeIndex, node) in enumerate(self.scene.nodes):
+      if not node.animation.IsAnimated():
+        continue
+      (translations, rotations, scales) = self.vertex_transform.ApplyToTransforms(*node.animation.GetTransforms(numFrames))
+      for (path, keys) in (("translation", translations), ("rotation", rotations), ("scale", scales)):
+        # paths that only have a single frame are covered by the node's rest pose
+        if len(keys) > 1:
+          channels.append((nodeIndex, path, len(keys), len(outputs[path])))
+          outputs[path].append(keys)
+    if not channels:
+      return
 
-      # vertex buffer view
-      vertexElements = mesh.vertexElements
-
-      # PVR texture coordinates are inverted compared to 
-      if "TEXCOORD_0" in vertexElements:
-        element = vertexElements["TEXCOORD_0"]
-        # covnert data to a bytearray so it can be manipulated
-        data = bytearray(mesh.vertexElementData[0])
-        stride = element["stride"]
-        offset = element["offset"]
-        # loop through and fix all texture coords
-        while offset < len(data):
-          x, y = struct.unpack_from('<ff', data, offset)
-          y = (1 - y) - 1
-          struct.pack_into('<ff', data, offset, x, y)
-          offset += stride
-        mesh.vertexElementData[0] = bytes(data)
-
-      vertexBufferView = self.glb.addBufferView({
-        "buffer": 0,
-        "byteOffset": self.glb.addData(mesh.vertexElementData[0]),
-        "byteStride": vertexElements["POSITION"]["stride"],
-        "byteLength": len(mesh.vertexElementData[0]),
+    outputAccessors = {}
+    for path in outputs:
+      if not outputs[path]:
+        continue
+      keys = np.concatenate(outputs[path]).astype(np.float32)
+      if path == "rotation":
+        # glTF requires unit quaternions
+        lengths = np.linalg.norm(keys, axis=1, keepdims=True)
+        keys /= np.where(lengths == 0, 1, lengths)
+      bufferView = self.glb.addBufferViewData(keys)
+      offset = 0
+      accessors = []
+      for keyArray in outputs[path]:
+        accessors.append(self.glb.addAccessor({
+          "bufferView": bufferView,
+          "byteOffset": offset * keys.itemsize * keys.shape[1],
+          "componentType": 5126,
+          "count": len(keyArray),
+          "type": "VEC4" if path == "rotation" else "VEC3"
+        }))
+        offset += len(keyArray)
+      outputAccessors[path] = accessors
+
+    # channels with the same number of keyframes share their time input
+    times = np.arange(max(count for (nodeIndex, path, count, outputIndex) in channels), dtype=np.float32) / fps
+    timesBufferView = self.glb.addBufferViewData(times)
+    inputAccessors = {}
+    samplers = []
+    animationChannels = []
+    for (nodeIndex, path, count, outputIndex) in channels:
+      if count not in inputAccessors:
+        inputAccessors[count] = self.glb.addAccessor({
+          "bufferView": timesBufferView,
+          "byteOffset": 0,
+          "componentType": 5126,
+          "count": count,
+          "type": "SCALAR",
+          "min": [0.0],
+          "max": [times[count - 1].item()]
+        })
+      animationChannels.append({
+        "sampler": len(samplers),
+        "target": {"node": nodeIndex, "path": path}
+      })
+      samplers.append({
+        "input": inputAccessors[count],
+        "output": outputAccessors[path][outputIndex],
+        "interpolation": "LINEAR"
       })
+    self.glb.addAnimation({
+      "name": "animation",
+      "channels": animationChannels,
+      "samplers": samplers
+    })
+
+  def convert_quantized_attributes(self, meshIndex, mesh, quantizeFloats=True):
+    # packs the mesh's attributes into a new vertex buffer, using normalized integer types where possible
+    # without quantizeFloats, float attributes stay as they are, and only attributes the pod already stores as integers
+    # keep their integer types, which still need KHR_mesh_quantization
+    # position dequantization is done by a node transform, which is stored to be applied in convert_nodes
+    # returns (attributes, size of the new vertex data)
+    numVertices = mesh.primitiveData["numVertices"]
+    names = []
+    arrays = []
+    normalized = []
+    for name in mesh.vertexElements:
+      element = mesh.vertexElements[name]
+      if name == "COLOR_0": # not implemented
+        continue
+      view = mesh.GetElementView(name)
+      isFloat = element["dataType"] == EPVRMesh.VertexData.eFloat
+      isNormalized = element["dataType"] in PVRNormalizedVertexDataTypes
+      isPacked = not isFloat
+      if not isFloat and (view.dtype.itemsize == 4 or (name in ("NORMAL", "TANGENT") and not isNormalized)):
+        # glTF has no 32 bit integer attributes, and only normalized integer directions, so these become floats
+        view = view.astype(np.float32) / np.float32(65536 if element["dataType"] == EPVRMesh.VertexData.eFixed16_16 else 1)
+        isFloat = True
+      if name == "POSITION" and isFloat and quantizeFloats:
+        (view, center, scale) = quantizePositions(view[:, 0:3])
+        self.mesh_transforms[meshIndex] = {"translation": center.tolist(), "scale": [scale] * 3}
+        isNormalized = True
+      elif name == "POSITION":
+        view = view[:, 0:3]
+        # positions quantized by the POD exporter are kept as they are, and dequantized by their unpack matrix
+        if isPacked and len(mesh.unpackMatrix) == 16:
+          # a numpy array when read from a memory map or the scene cache, whose float32s json can't write
+          self.mesh_transforms[meshIndex] = {"matrix": np.asarray(mesh.unpackMatrix, dtype=np.float32).tolist()}
+      elif name == "NORMAL" and isFloat and quantizeFloats:
+        view = quantizeDirections(view[:, 0:3])
+        isNormalized = True
+      elif name == "NORMAL":
+        view = view[:, 0:3]
+      elif name.startswith("TEXCOORD_") and isFloat and quantizeFloats:
+        quantized = quantizeTexCoords(view[:, 0:2])
+        view = view[:, 0:2] if quantized is None else quantized
+        isNormalized = quantized is not None
+      elif name.startswith("TEXCOORD_"):
+        view = view[:, 0:2]
+      elif isFloat:
+        view = view[:, 0:min(element["numComponents"], 4)]
+      names.append(name)
+      arrays.append(view)
+      normalized.append(isNormalized)
+
+    # one buffer view for all of the attributes, or one for each with separate streams
+    groups = [[index] for index in range(len(names))] if self.vertex_layout == "streams" else [range(len(names))]
+    attributes = {}
+    numBytes = 0
+    for group in groups:
+      (data, stride, offsets) = interleave([arrays[index] for index in group], numVertices)
+      numBytes += data.nbytes
+      vertexBufferView = self.glb.addBufferViewData(data, byteStride=stride, target=34962)
+      for (index, offset) in zip(group, offsets):
+        (name, array) = (names[index], arrays[index])
+        accessor = {
+          "bufferView": vertexBufferView,
+          "byteOffset": offset,
+          "componentType": getComponentType(array.dtype),
+          "count": numVertices,
+          "type": GLBAccessorTypes[array.shape[1]]
+        }
+        if normalized[index]:
+          accessor["normalized"] = True
+        if name == "POSITION" and numVertices:
+          (accessor["min"], accessor["max"]) = getAccessorBounds(array[:, 0:3])
+        attributes[name] = self.glb.addAccessor(accessor)
+    if quantizeFloats or any(array.dtype != np.float32 for array in arrays):
+      self.glb.addExtension("KHR_mesh_quantization", required=True)
+    return (attributes, numBytes)
+
+  def convert_meshes(self):
+    self.begin_meshes(len(self.scene.meshes))
+    for (meshIndex, mesh) in enumerate(self.scene.meshes):
+      self.add_mesh(meshIndex, mesh)
+    self.end_meshes()
+
+  def begin_meshes(self, numMeshes):
+    # node transforms needed to dequantize mesh positions, by glb mesh index
+    self.mesh_transforms = {}
+    # the glb meshes and joint nodes that skinned meshes are split into, by pod mesh index
+    self.mesh_skins = {}
+    self.vertex_transform = PVRVertexTransform(
+      flipUVs=self.fix_uvs,
+      axisOrder=self.axis_order,
+      axisSigns=self.axis_signs,
+      renormalizeNormals=self.renormalize_normals
+    )
+    self.mesh_optimizer = None
+    if self.optimize_meshes:
+      from PowerVR.PVRMeshOptimizer import PVRMeshOptimizer
+      self.mesh_optimizer = PVRMeshOptimizer(overdrawThreshold=1.05 if self.optimize_overdraw else None)
+    self.mesh_stats = {}
+    self.mesh_layout = None
+    if self.vertex_layout not in (None, "interleaved", "streams"):
+      raise ValueError("unknown vertex layout %r" % self.vertex_layout)
+    if self.vertex_layout or self.drop_attributes:
+      from PowerVR.PVRVertexLayout import PVRVertexLayout
+      self.mesh_layout = PVRVertexLayout(interleaved=self.vertex_layout != "streams", dropSemantics=self.drop_attributes)
+    self.mesh_skin = PVRSkin(self.joint_limit)
+    # glb meshes for parts of skinned meshes past the first go after all of the pod meshes, so that pod mesh indices still line up
+    self.num_meshes = numMeshes
+    self.extra_meshes = []
+    # bounds of each pod mesh, as meshes aren't kept around when streaming
+    self.mesh_bounds = {}
+
+  def add_mesh(self, meshIndex, mesh):
+    if self.observer is not None:
+      start = time.perf_counter()
+
+    # flip uvs, swap axes, etc
+    self.vertex_transform.Apply(mesh)
+    if self.write_bounds:
+      self.mesh_bounds[meshIndex] = mesh.GetBounds()
+
+    if not mesh.IsSkinned():
+      self.glb.addMesh(self.convert_mesh(meshIndex, mesh, self.mesh_optimizer))
+    else:
+      parts = self.mesh_skin.Split(mesh)
+      self.mesh_skins[meshIndex] = []
+      for (partIndex, (jointNodes, part)) in enumerate(parts):
+        glbMeshIndex = meshIndex if partIndex == 0 else self.num_meshes + len(self.extra_meshes)
+        self.mesh_skins[meshIndex].append((glbMeshIndex, jointNodes))
+        if partIndex == 0:
+          self.glb.addMesh(self.convert_mesh(glbMeshIndex, part, self.mesh_optimizer))
+        else:
+          self.extra_meshes.append(self.convert_mesh(glbMeshIndex, part, self.mesh_optimizer))
+
+    if self.observer is not None:
+      self.observer.on_mesh(meshIndex, time.perf_counter() - start)
+
+  def end_meshes(self):
+    # the indices given to extra meshes are only right if the scene's mesh count was
+    if self.extra_meshes and len(self.glb.meshes) != self.num_meshes:
+      raise ValueError("the scene has %d meshes, but says it has %d" % (len(self.glb.meshes), self.num_meshes))
+    for extraMesh in self.extra_meshes:
+      self.glb.addMesh(extraMesh)
+    self.extra_meshes = []
+
+  def add_mesh_stats(self, meshIndex, name, stats):
+    self.mesh_stats.setdefault(meshIndex, {})[name] = stats
+    if self.observer is not None:
+      self.observer.on_mesh_stats(meshIndex, name, stats)
+
+  def convert_mesh(self, meshIndex, mesh, optimizer=None):
+    attributes = {}
+    numVertices = mesh.primitiveData["numVertices"]
+
+    # before optimizing, so that the optimizer only has the kept attributes to reorder
+    layoutStats = None
+    if self.mesh_layout and self.quantize:
+      # quantized attributes get packed into a new vertex buffer anyway, whose size goes into the stats once it's packed
+      layoutStats = self.mesh_layout.Drop(mesh)
+    elif self.mesh_layout:
+      self.add_mesh_stats(meshIndex, "layout", self.mesh_layout.Apply(mesh))
+
+    if optimizer:
+      self.add_mesh_stats(meshIndex, "optimize", optimizer.Optimize(mesh))
+
+    # face index buffer view
+    # https://github.com/KhronosGroup/glTF/blob/master/specification/2.0/README.md#primitivemode
+    indices = mesh.GetTriangleList()
+    mode = 4
+    if self.use_strips and mesh.IsStripped():
+      strip = mesh.GetTriangleStrip()
+      if len(strip) < len(indices):
+        indices = strip
+        mode = 5
+    indicesAccessorIndex = self.glb.addAccessor({
+      "bufferView": self.glb.addBufferViewData(indices, target=34963),
+      "byteOffset": 0,
+      # https://github.com/KhronosGroup/glTF/blob/master/specification/2.0/README.md#accessor-element-size
+      "componentType": 5125 if indices.itemsize == 4 else 5123,
+      "count": len(indices),
+      "type": "SCALAR"
+    })
+
+    # vertex buffer view
+    vertexElements = mesh.vertexElements
+
+    if self.quantize:
+      (attributes, numBytes) = self.convert_quantized_attributes(meshIndex, mesh)
+      if layoutStats is not None:
+        self.add_mesh_stats(meshIndex, "layout", dict(layoutStats, bytesAfter=numBytes))
+    elif any(element["dataType"] != EPVRMesh.VertexData.eFloat for (name, element) in vertexElements.items() if name not in ("COLOR_0", "JOINTS_0", "WEIGHTS_0")):
+      # attributes the pod stores as integers are repacked with their own component types, which can't be declared as floats
+      (attributes, numBytes) = self.convert_quantized_attributes(meshIndex, mesh, quantizeFloats=False)
+    else:
+      # one buffer view per block of interleaved vertex data
+      vertexBufferViews = {}
 
       for name in vertexElements:
         element = vertexElements[name]
         componentType = 5126
         type = "VEC3"
         
-        if name == "TEXCOORD_0":
+        if name.startswith("TEXCOORD_"):
           type = "VEC2"
-        
+
         elif name == "COLOR_0": # not implemented
           continue
 
-        accessorIndex = self.glb.addAccessor({
-          "bufferView": vertexBufferView,
+        elif name in ("JOINTS_0", "WEIGHTS_0"):
+          componentType = getComponentType(PVRVertexDataTypeMap[element["dataType"]])
+          type = "VEC4"
+
+        dataIndex = element["dataIndex"] if element["dataIndex"] >= 0 else 0
+        if dataIndex not in vertexBufferViews:
+          vertexBufferViews[dataIndex] = self.glb.addBufferViewData(mesh.vertexElementData[dataIndex], byteStride=element["stride"])
+
+        accessor = {
+          "bufferView": vertexBufferViews[dataIndex],
           "byteOffset": element["offset"],
           # https://github.com/KhronosGroup/glTF/blob/master/specification/2.0/README.md#accessor-element-size
           "componentType": componentType,
           "count": numVertices,
           "type": type
-        })
-        attributes[name] = accessorIndex
-
-      # POD meshes only have one primitive?
-      # https://github.com/KhronosGroup/glTF/blob/master/specification/2.0/README.md#primitive
-      self.glb.addMesh({
-        "primitives": [{
-          "attributes": attributes,
-          "indices": indicesAccessorIndex,
-          "mode": 4,
-        }],
-      })
+        }
+        # glTF requires bounds on positions, in the accessor's component type
+        # meshes with integer positions are repacked by convert_quantized_attributes, so these are always floats
+        if name == "POSITION" and numVertices:
+          (accessor["min"], accessor["max"]) = getAccessorBounds(mesh.GetElementView(name)[:, 0:3])
+        attributes[name] = self.glb.addAccessor(accessor)
+
+    # POD meshes only have one primitive?
+    # https://github.com/KhronosGroup/glTF/blob/master/specification/2.0/README.md#primitive
+    return {
+      "primitives": [{
+        "attributes": attributes,
+        "indices": indicesAccessorIndex,
+        "mode": mode,
+      }],
+    }
+
+class POD2GLBProfiler:
+  # observer for POD2GLB and PVRPODLoader, collecting stage timings and counters into a json report
+  def __init__(self, meshes=False):
+    # per-mesh timings are only kept if asked for, since there can be a lot of them
+    self.meshes = meshes
+    self.stages = {}
+    self.meshTimes = []
+    self.meshStats = []
+    self.textureTimes = []
+    self.files = []
+    self.tagsRead = 0
+    self.tagsSkipped = 0
+    self.bytesRead = 0
+    self.bytesSkipped = 0
+
+  # PVRPODLoader
+  def OnTag(self, ident, length):
+    self.tagsRead += 1
+
+  def OnSkip(self, length):
+    self.tagsSkipped += 1
+    self.bytesSkipped += length
+
+  def OnRead(self, numBytes):
+    self.bytesRead += numBytes
+
+  # POD2GLB
+  def on_stage(self, name, elapsed):
+    self.stages[name] = self.stages.get(name, 0) + elapsed
+
+  def on_mesh(self, meshIndex, elapsed):
+    if self.meshes:
+      self.meshTimes.append({"mesh": meshIndex, "time": elapsed})
+
+  def on_mesh_stats(self, meshIndex, name, stats):
+    if self.meshes:
+      self.meshStats.append(dict(stats, mesh=meshIndex, stage=name))
+
+  # textures and their files are reported from the texture threads, and list appends are atomic
+  def on_texture(self, inpath, elapsed):
+    self.textureTimes.append({"texture": inpath, "time": elapsed})
+
+  def on_write(self, path, numBytes):
+    self.files.append({"path": path, "bytes": numBytes})
+
+  def get_report(self):
+    report = {
+      "stages": dict(self.stages),
+      "total": sum(self.stages.values()),
+      "tagsParsed": self.tagsRead - self.tagsSkipped,
+      "tagsSkipped": self.tagsSkipped,
+      "bytesRead": self.bytesRead,
+      "bytesSkipped": self.bytesSkipped,
+      "bytesWritten": sum(file["bytes"] for file in self.files),
+      "files": list(self.files),
+      # textures are converted in parallel, so this can be more than the time spent waiting for them
+      "textureTime": sum(texture["time"] for texture in self.textureTimes),
+      "textures": list(self.textureTimes),
+    }
+    if self.meshes:
+      report["meshes"] = list(self.meshTimes)
+      report["meshStats"] = list(self.meshStats)
+    return report
+
+def print_mesh_stats(meshStats):
+  for (meshIndex, stats) in sorted(meshStats.items()):
+    # meshes that were already packed aren't worth a line
+    if "layout" in stats and stats["layout"]["bytesBefore"] != stats["layout"]["bytesAfter"]:
+      layout = stats["layout"]
+      saved = layout["bytesBefore"] - layout["bytesAfter"]
+      print("mesh %d: vertex data %d -> %d bytes, %d saved (%.1f%%)%s" % (
+        meshIndex, layout["bytesBefore"], layout["bytesAfter"], saved,
+        100.0 * saved / layout["bytesBefore"],
+        ", dropped %s" % ", ".join(layout["dropped"]) if layout["dropped"] else "",
+      ))
+    if "optimize" in stats:
+      print("mesh %d: %d triangles, ACMR %.3f -> %.3f, ATVR %.3f -> %.3f" % (
+        meshIndex, stats["optimize"]["numTriangles"],
+        stats["optimize"]["acmrBefore"], stats["optimize"]["acmrAfter"],
+        stats["optimize"]["atvrBefore"], stats["optimize"]["atvrAfter"],
+      ))
+
+def write_profile(reports, profilePath):
+  if profilePath == "-":
+    print(json.dumps(reports, indent=2))
+    return
+  with open(profilePath, "w") as f:
+    json.dump(reports, f, indent=2)
+
+def convert(source, out, **options):
+  # converts a .pod file, given as a path or its contents, to a .glb file, given as a path or a writable binary file
+  # options are the same as POD2GLB's; returns the converter, closed, for its caches and observer
+  converter = POD2GLB()
+  converter.set_options(**options)
+  if isinstance(source, (bytes, bytearray, memoryview)):
+    converter.load_bytes(source)
+  else:
+    converter.load(os.fspath(source))
+  if isinstance(out, (str, os.PathLike)):
+    converter.save(os.fspath(out))
+  else:
+    converter.save_file(out)
+  converter.close()
+  return converter
+
+def convert_file(job):
+  # batch worker -- errors are caught and reported so that one bad file doesn't stop the batch
+  (inpath, outpath, options) = job
+  start = time.perf_counter()
+  try:
+    converter = convert(inpath, outpath, **options)
+    cacheStats = converter.texture_cache.getStats() if converter.texture_cache else None
+    profile = converter.observer.get_report() if isinstance(converter.observer, POD2GLBProfiler) else None
+    return (inpath, outpath, path.getsize(inpath), time.perf_counter() - start, None, cacheStats, profile)
+  except Exception as e:
+    return (inpath, outpath, 0, time.perf_counter() - start, "%s: %s" % (type(e).__name__, e), None, None)
+
+def find_batch_jobs(inputs, outdir, options):
+  import glob
+  # inputs can be directories (searched recursively for .pod files), glob patterns or single files
+  jobs = []
+  for pattern in inputs:
+    if path.isdir(pattern):
+      root = pattern
+      inpaths = glob.glob(path.join(pattern, "**", "*.pod"), recursive=True)
+    else:
+      # output paths mirror everything below the first directory containing a wildcard
+      root = pattern
+      while glob.has_magic(root):
+        root = path.dirname(root)
+      inpaths = glob.glob(pattern, recursive=True)
+    for inpath in sorted(inpaths):
+      relpath = path.relpath(inpath, root) if root else inpath
+      outpath = path.join(outdir, path.splitext(relpath)[0] + ".glb")
+      # textures are read from next to each .pod file, and converted next to its .glb file
+      jobs.append((inpath, outpath, dict(options, texture_dir=path.dirname(inpath), image_dir=path.dirname(outpath))))
+  return jobs
+
+def batch_convert(jobs, workers=None):
+  # returns (number of failed jobs, profile reports of the converted files)
+  from concurrent.futures import ProcessPoolExecutor
+  start = time.perf_counter()
+  for (inpath, outpath, options) in jobs:
+    os.makedirs(path.dirname(outpath) or ".", exist_ok=True)
+
+  numFailed = 0
+  numBytes = 0
+  cacheTotals = None
+  profiles = []
+  with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+    # map() yields results in job order, so progress is reported in order too
+    for (jobIndex, (inpath, outpath, size, elapsed, error, cacheStats, profile)) in enumerate(pool.map(convert_file, jobs)):
+      progress = "[%d/%d]" % (jobIndex + 1, len(jobs))
+      if error:
+        numFailed += 1
+        print(progress, "FAILED", inpath, "--", error)
+      else:
+        numBytes += size
+        print(progress, inpath, "->", outpath, "(%.2fs)" % elapsed)
+      if cacheStats:
+        cacheTotals = {key: (cacheTotals or {}).get(key, 0) + cacheStats[key] for key in cacheStats}
+      if profile:
+        profiles.append(dict(profile, input=inpath, output=outpath))
+
+  elapsed = time.perf_counter() - start
+  numConverted = len(jobs) - numFailed
+  print("converted %d of %d files (%d failed) in %.2fs -- %.2f files/s, %.2f MB/s" % (
+    numConverted, len(jobs), numFailed, elapsed,
+    numConverted / elapsed if elapsed else 0,
+    numBytes / (1024 * 1024) / elapsed if elapsed else 0,
+  ))
+  if cacheTotals:
+    print("texture cache: %(hits)d hits, %(misses)d misses, %(evictions)d evictions" % cacheTotals)
+  return (numFailed, profiles)
+
+def main(args=None):
+  import argparse
+  import contextlib
+  parser = argparse.ArgumentParser(description="Convert PowerVR .pod models to binary glTF (.glb)")
+  parser.add_argument("input", nargs="+", help=".pod model path, or with --batch, directories and/or glob patterns")
+  parser.add_argument("output", help=".glb output path, or with --batch, the output directory")
+  parser.add_argument("--batch", action="store_true", help="convert many files with a pool of worker processes")
+  parser.add_argument("-j", "--jobs", type=int, default=None, help="number of worker processes (defaults to the number of cpu cores)")
+  parser.add_argument("--mmap", action="store_true", help="memory map .pod files instead of reading them")
+  parser.add_argument("--stream", action="store_true", help="convert meshes as they are read, keeping only one in memory at a time, for models too big to fit into memory")
+  parser.add_argument("--strips", action="store_true", help="keep triangle strips as strips when that is smaller than expanding them to triangle lists")
+  parser.add_argument("--optimize", action="store_true", help="reorder triangles and vertices for the gpu vertex cache and to reduce overdraw, reporting ACMR/ATVR before and after")
+  parser.add_argument("--no-overdraw", action="store_true", help="with --optimize, only reorder for the vertex cache")
+  parser.add_argument("--vertex-layout", choices=("interleaved", "streams"), default=None, help="repack vertex data without attributes glb meshes don't use, interleaved into one buffer view per mesh or as one buffer view per attribute, reporting bytes saved per mesh")
+  parser.add_argument("--drop-attributes", metavar="NAMES", default=None, help="comma separated attributes to leave out, e.g. TANGENT,TEXCOORD_1 (implies --vertex-layout interleaved unless given)")
+  parser.add_argument("--quantize", action="store_true", help="store positions, normals and uvs as normalized integers, using the KHR_mesh_quantization extension")
+  parser.add_argument("--compress", action="store_true", help="compress vertex and index data with the EXT_meshopt_compression extension")
+  parser.add_argument("--no-bounds", action="store_true", help="don't write node bounds and a bounding volume hierarchy of the scene's mesh nodes as extras")
+  parser.add_argument("--joint-limit", metavar="N", type=int, default=None, help="split skinned meshes so that each skin has at most N joints")
+  parser.add_argument("--texture-tool", nargs="?", const=PVR_TEX_TOOL_PATH, default=None, help="convert textures with PVRTexToolCLI instead of the built-in decoder, optionally giving its path")
+  parser.add_argument("--texture-jobs", metavar="N", type=int, default=4, help="number of threads converting textures alongside each model (default 4, 0 converts them one by one)")
+  parser.add_argument("--texture-cache", metavar="DIR", default=None, help="reuse converted textures across models and runs through a cache directory")
+  parser.add_argument("--texture-cache-size", metavar="MB", type=int, default=1024, help="maximum texture cache size, least recently used textures are evicted beyond this (default 1024)")
+  parser.add_argument("--scene-cache", metavar="DIR", default=None, help="cache parsed scenes in a directory, so converting the same .pod file again skips parsing it (not with --stream)")
+  parser.add_argument("--scene-cache-size", metavar="MB", type=int, default=1024, help="maximum scene cache size, least recently used scenes are evicted beyond this (default 1024)")
+  parser.add_argument("--profile", metavar="PATH", default=None, help="write a json report of per-stage timings and counters to PATH ('-' for stdout)")
+  parser.add_argument("--profile-meshes", action="store_true", help="include per-mesh timings in the --profile report")
+  args = parser.parse_args(args)
+  options = {
+    "use_mmap": args.mmap,
+    "streaming": args.stream,
+    "use_strips": args.strips,
+    "optimize_meshes": args.optimize,
+    "optimize_overdraw": not args.no_overdraw,
+    "vertex_layout": args.vertex_layout,
+    "drop_attributes": tuple(args.drop_attributes.split(",")) if args.drop_attributes else (),
+    "quantize": args.quantize,
+    "compress": args.compress,
+    "joint_limit": args.joint_limit,
+    "write_bounds": not args.no_bounds,
+    "texture_cache_dir": args.texture_cache,
+    "texture_cache_size": args.texture_cache_size * 1024 * 1024,
+    "texture_workers": args.texture_jobs,
+    "scene_cache_dir": args.scene_cache,
+    "scene_cache_size": args.scene_cache_size * 1024 * 1024,
+  }
+  if args.texture_tool:
+    options["use_texture_tool"] = True
+    options["texture_tool_path"] = args.texture_tool
+  if args.profile:
+    options["observer"] = POD2GLBProfiler(meshes=args.profile_meshes)
+
+  if len(args.input) != 1 and not args.batch:
+    parser.error("only one input can be given without --batch")
+  if args.stream and args.scene_cache:
+    # streamed scenes are never held whole, so there's nothing to cache
+    parser.error("--scene-cache can't be used with --stream")
+  # with the profile going to stdout, everything else is printed to stderr, so that stdout only holds the json report
+  with contextlib.redirect_stdout(sys.stderr if args.profile == "-" else sys.stdout):
+    if args.batch:
+      (numFailed, reports) = batch_convert(find_batch_jobs(args.input, args.output, options), args.jobs)
+    else:
+      converter = convert(args.input[0], args.output, **options)
+      print_mesh_stats(converter.mesh_stats)
+      if converter.texture_cache:
+        print("texture cache: %(hits)d hits, %(misses)d misses, %(evictions)d evictions" % converter.texture_cache.getStats())
+      if converter.scene_cache:
+        print("scene cache: %(hits)d hits, %(misses)d misses, %(evictions)d evictions" % converter.scene_cache.getStats())
+      numFailed = 0
+      reports = dict(converter.observer.get_report(), input=args.input[0], output=args.output) if args.profile else None
+  if args.profile:
+    write_profile(reports, args.profile)
+  return 1 if numFailed else 0
 
-converter = POD2GLB.open(argv[1])
-converter.save(argv[2])
\ No newline at end of file
+if __name__ == "__main__":
+  sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,344 @@
+# long-running conversion server, so that converting a model doesn't pay for python startup, imports and cold caches every time
+# models are converted on a pool of worker processes that are started before the server starts listening:
+#   python3 server.py --socket /tmp/pod2glb.sock
+#   curl --unix-socket /tmp/pod2glb.sock --data-binary @model.pod -o model.glb "http://localhost/convert?quantize=1"
+from extract import POD2GLB, POD2GLBProfiler
+from PowerVR.PVRPODLoader import PVRPODFormatError
+from PowerVR.PVRTextureCache import PVRTextureCache
+from PowerVR.PVRSceneCache import PVRSceneCache
+import json
+import sys
+from os import path
+import os
+import time
+import signal
+import asyncio
+import argparse
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor
+
+def parse_vertex_layout(value):
+  if value not in ("interleaved", "streams"):
+    raise ValueError("vertex_layout should be interleaved or streams")
+  return value
+
+def parse_attributes(value):
+  return tuple(value.split(","))
+
+def parse_joint_limit(value):
+  if int(value) < 1:
+    raise ValueError("joint_limit should be at least 1")
+  return int(value)
+
+# query string options of /convert requests, and the converter options they set
+REQUEST_OPTIONS = {
+  "strips": ("use_strips", bool),
+  "optimize": ("optimize_meshes", bool),
+  "vertex_layout": ("vertex_layout", parse_vertex_layout),
+  "drop_attributes": ("drop_attributes", parse_attributes),
+  "quantize": ("quantize", bool),
+  "compress": ("compress", bool),
+  "joint_limit": ("joint_limit", parse_joint_limit),
+}
+
+HTTP_REASONS = {
+  200: "OK",
+  400: "Bad Request",
+  404: "Not Found",
+  405: "Method Not Allowed",
+  411: "Length Required",
+  413: "Payload Too Large",
+  500: "Internal Server Error",
+  503: "Service Unavailable",
+}
+
+# response bodies are written a chunk at a time, waiting for slow clients to catch up in between
+WRITE_CHUNK_SIZE = 1 << 20
+
+# converter options shared by every request on a worker, including its texture and scene caches, see init_worker
+worker_options = {}
+
+def init_worker(options):
+  # ctrl+c is handled by the server, which shuts the workers down
+  signal.signal(signal.SIGINT, signal.SIG_IGN)
+  worker_options.update(options)
+  # caches are opened once per worker rather than once per request, so their directories are only scanned once
+  if options.get("texture_cache_dir"):
+    worker_options["texture_cache"] = PVRTextureCache(options["texture_cache_dir"], options.get("texture_cache_size", 1 << 30))
+  if options.get("scene_cache_dir"):
+    worker_options["scene_cache"] = PVRSceneCache(options["scene_cache_dir"], options.get("scene_cache_size", 1 << 30))
+
+def warm_worker():
+  return os.getpid()
+
+def convert_request(source, options):
+  # runs on a worker; source is either a .pod path or a .pod file's contents
+  # returns (glb, stage timings, total time)
+  start = time.perf_counter()
+  profiler = POD2GLBProfiler()
+  # textures of a .pod file given by path are read from and written next to it, as extract.py does, and uploaded ones
+  # have nowhere to come from, so their images are only referred to; texture names can't reach outside either way
+  converter = POD2GLB()
+  converter.set_options(**dict(worker_options, observer=profiler, check_texture_names=True, **options))
+  if isinstance(source, str):
+    converter.set_options(texture_dir=path.dirname(source))
+    converter.load(source)
+  else:
+    converter.set_options(write_textures=False)
+    converter.load_bytes(source)
+  glb = converter.save_bytes()
+  converter.close()
+  return (glb, profiler.stages, time.perf_counter() - start)
+
+def parse_option(name, value):
+  (option, kind) = REQUEST_OPTIONS[name]
+  if kind is bool:
+    if value.lower() not in ("1", "0", "true", "false", "yes", "no"):
+      raise ValueError("%s should be 1 or 0" % name)
+    return (option, value.lower() in ("1", "true", "yes"))
+  return (option, kind(value))
+
+class HTTPError(Exception):
+  def __init__(self, status, message, headers=None):
+    Exception.__init__(self, message)
+    self.status = status
+    self.headers = headers or {}
+
+class POD2GLBServer:
+  def __init__(self, workers=None, queue_size=16, max_request_size=256 << 20, options=None):
+    self.workers = workers or os.cpu_count()
+    # requests beyond the ones being converted and this many waiting for a worker are turned away with a 503,
+    # before their bodies are read, so that a burst of requests can't pile up in memory
+    self.queue_size = queue_size
+    self.max_request_size = max_request_size
+    # converter options for every request, see init_worker
+    self.options = options or {}
+    self.pool = None
+    self.slots = None
+    self.active = 0
+    self.queued = 0
+    self.completed = 0
+    self.failed = 0
+    self.rejected = 0
+    self.start_time = time.time()
+
+  async def start(self):
+    loop = asyncio.get_running_loop()
+    self.pool = ProcessPoolExecutor(max_workers=self.workers, initializer=init_worker, initargs=(self.options,))
+    # one job per worker, so that they have all started up and opened their caches before the first request
+    await asyncio.gather(*[loop.run_in_executor(self.pool, warm_worker) for i in range(self.workers)])
+    self.slots = asyncio.Semaphore(self.workers)
+
+  def stop(self):
+    if self.pool is not None:
+      self.pool.shutdown(cancel_futures=True)
+      self.pool = None
+
+  async def serve(self, socketPath=None, host="127.0.0.1", port=8080):
+    try:
+      # stop cleanly on SIGTERM too, as sent by service managers
+      asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    except (NotImplementedError, AttributeError):
+      # there are no signal handlers on windows
+      pass
+    await self.start()
+    try:
+      if socketPath:
+        server = await asyncio.start_unix_server(self.handle_connection, socketPath)
+        print("listening on", socketPath, "with %d workers" % self.workers)
+      else:
+        server = await asyncio.start_server(self.handle_connection, host, port)
+        print("listening on http://%s:%d with %d workers" % (host, port, self.workers))
+      async with server:
+        await server.serve_forever()
+    finally:
+      self.stop()
+      if socketPath and path.exists(socketPath):
+        os.remove(socketPath)
+
+  async def handle_connection(self, reader, writer):
+    # connections are kept open between requests, unless the client asks otherwise or a request fails
+    try:
+      while True:
+        try:
+          head = await self.read_head(reader)
+          if head is None:
+            break
+          (method, target, version, headers) = head
+          keepAlive = headers.get("connection", "keep-alive" if version == "HTTP/1.1" else "close").lower() != "close"
+          (status, responseHeaders, body) = await self.handle_request(method, target, headers, reader)
+        except HTTPError as e:
+          # the request's body may not have been read, so the connection can't be reused
+          (status, responseHeaders, body) = (e.status, dict(e.headers, **{"Content-Type": "text/plain"}), (str(e) + "\n").encode())
+          keepAlive = False
+        await self.write_response(writer, status, responseHeaders, body, keepAlive)
+        if not keepAlive:
+          break
+    except (ConnectionError, asyncio.IncompleteReadError):
+      pass
+    finally:
+      writer.close()
+
+  async def read_head(self, reader):
+    # returns (method, target, version, headers), or None once the client has closed the connection
+    line = await self.read_line(reader)
+    if not line.strip():
+      return None
+    parts = line.decode("latin-1").split()
+    if len(parts) != 3:
+      raise HTTPError(400, "bad request line: %s" % line.decode("latin-1").strip())
+    (method, target, version) = parts
+    headers = {}
+    while True:
+      line = await self.read_line(reader)
+      if not line.strip():
+        break
+      if b":" not in line:
+        raise HTTPError(400, "bad header: %s" % line.decode("latin-1").strip())
+      (name, value) = line.decode("latin-1").split(":", 1)
+      headers[name.strip().lower()] = value.strip()
+    return (method, target, version, headers)
+
+  async def read_line(self, reader):
+    try:
+      return await reader.readline()
+    except ValueError:
+      # readline gives up on lines longer than the reader's limit
+      raise HTTPError(400, "request line or header is too long")
+
+  async def handle_request(self, method, target, headers, reader):
+    # returns (status, headers, body)
+    url = urllib.parse.urlsplit(target)
+    if url.path == "/stats":
+      if method != "GET":
+        raise HTTPError(405, "/stats only supports GET", {"Allow": "GET"})
+      return (200, {"Content-Type": "application/json"}, json.dumps(self.get_stats()).encode())
+    if url.path != "/convert":
+      raise HTTPError(404, "unknown path: %s" % url.path)
+    if method != "POST":
+      raise HTTPError(405, "/convert only supports POST", {"Allow": "POST"})
+
+    query = urllib.parse.parse_qs(url.query)
+    options = {}
+    for name in query:
+      if name == "path":
+        continue
+      if name not in REQUEST_OPTIONS:
+        raise HTTPError(400, "unknown option: %s" % name)
+      try:
+        (option, value) = parse_option(name, query[name][-1])
+      except ValueError as e:
+        raise HTTPError(400, str(e))
+      options[option] = value
+    if "transfer-encoding" in headers:
+      raise HTTPError(411, "request bodies need a Content-Length")
+    try:
+      length = int(headers.get("content-length", 0))
+    except ValueError:
+      raise HTTPError(400, "bad Content-Length: %s" % headers["content-length"])
+    if length < 0:
+      raise HTTPError(400, "bad Content-Length: %d" % length)
+    if length > self.max_request_size:
+      raise HTTPError(413, "request body is over %d bytes" % self.max_request_size)
+    if "path" in query:
+      if length:
+        raise HTTPError(400, "give either a path or a .pod file, not both")
+      if not path.isfile(query["path"][-1]):
+        raise HTTPError(404, "no such file: %s" % query["path"][-1])
+    elif not length:
+      raise HTTPError(400, "no .pod file or path given")
+
+    if self.active + self.queued >= self.workers + self.queue_size:
+      self.rejected += 1
+      raise HTTPError(503, "too many requests, try again later", {"Retry-After": "1"})
+    start = time.perf_counter()
+    self.queued += 1
+    waiting = True
+    try:
+      source = query["path"][-1] if "path" in query else await reader.readexactly(length)
+      async with self.slots:
+        (self.queued, self.active, waiting) = (self.queued - 1, self.active + 1, False)
+        queueTime = time.perf_counter() - start
+        try:
+          (glb, stages, convertTime) = await asyncio.get_running_loop().run_in_executor(self.pool, convert_request, source, options)
+        except PVRPODFormatError as e:
+          # the .pod file itself is broken, rather than the server
+          self.failed += 1
+          raise HTTPError(400, str(e))
+        except Exception as e:
+          self.failed += 1
+          raise HTTPError(500, "%s: %s" % (type(e).__name__, e))
+        finally:
+          self.active -= 1
+    finally:
+      # the body couldn't be read, or the client went away while waiting for a worker
+      if waiting:
+        self.queued -= 1
+    self.completed += 1
+    return (200, {
+      "Content-Type": "model/gltf-binary",
+      "Server-Timing": self.get_timing(queueTime, stages, convertTime, time.perf_counter() - start),
+    }, glb)
+
+  def get_timing(self, queueTime, stages, convertTime, totalTime):
+    # a Server-Timing header, with times in milliseconds
+    timings = [("queue", queueTime)] + list(stages.items()) + [("worker", convertTime), ("total", totalTime)]
+    return ", ".join("%s;dur=%.2f" % (name, elapsed * 1000) for (name, elapsed) in timings)
+
+  def get_stats(self):
+    return {
+      "workers": self.workers,
+      "active": self.active,
+      "queued": self.queued,
+      "queueSize": self.queue_size,
+      "completed": self.completed,
+      "failed": self.failed,
+      "rejected": self.rejected,
+      "uptime": time.time() - self.start_time,
+    }
+
+  async def write_response(self, writer, status, headers, body, keepAlive):
+    head = ["HTTP/1.1 %d %s" % (status, HTTP_REASONS[status])]
+    head += ["%s: %s" % (name, value) for (name, value) in headers.items()]
+    head += ["Content-Length: %d" % len(body), "Connection: %s" % ("keep-alive" if keepAlive else "close"), "", ""]
+    writer.write("\r\n".join(head).encode("latin-1"))
+    # drain() waits while the transport's buffer is full, so large responses to slow clients aren't buffered whole
+    body = memoryview(body)
+    for offset in range(0, len(body), WRITE_CHUNK_SIZE):
+      writer.write(body[offset:offset + WRITE_CHUNK_SIZE])
+      await writer.drain()
+    await writer.drain()
+
+def main(args=None):
+  parser = argparse.ArgumentParser(description="Serve .pod to .glb conversions from a pool of warm worker processes")
+  listen = parser.add_mutually_exclusive_group(required=True)
+  listen.add_argument("--socket", metavar="PATH", help="listen on a unix socket")
+  listen.add_argument("--port", type=int, help="listen on a localhost http port")
+  parser.add_argument("--host", default="127.0.0.1", help="address to listen on with --port (default 127.0.0.1)")
+  parser.add_argument("-j", "--jobs", type=int, default=None, help="number of worker processes (defaults to the number of cpu cores)")
+  parser.add_argument("--queue", metavar="N", type=int, default=16, help="number of requests that can wait for a worker before new ones are turned away (default 16)")
+  parser.add_argument("--max-request-size", metavar="MB", type=int, default=256, help="largest .pod file that can be sent (default 256)")
+  parser.add_argument("--mmap", action="store_true", help="memory map .pod files given by path instead of reading them")
+  parser.add_argument("--texture-jobs", metavar="N", type=int, default=4, help="number of threads converting textures alongside each model (default 4, 0 converts them one by one)")
+  parser.add_argument("--texture-cache", metavar="DIR", default=None, help="reuse converted textures across models through a cache directory")
+  parser.add_argument("--texture-cache-size", metavar="MB", type=int, default=1024, help="maximum texture cache size (default 1024)")
+  parser.add_argument("--scene-cache", metavar="DIR", default=None, help="cache parsed scenes of .pod files given by path in a directory")
+  parser.add_argument("--scene-cache-size", metavar="MB", type=int, default=1024, help="maximum scene cache size (default 1024)")
+  args = parser.parse_args(args)
+  options = {
+    "use_mmap": args.mmap,
+    "texture_workers": args.texture_jobs,
+    "texture_cache_dir": args.texture_cache,
+    "texture_cache_size": args.texture_cache_size * 1024 * 1024,
+    "scene_cache_dir": args.scene_cache,
+    "scene_cache_size": args.scene_cache_size * 1024 * 1024,
+  }
+  server = POD2GLBServer(args.jobs, args.queue, args.max_request_size * 1024 * 1024, options)
+  try:
+    asyncio.run(server.serve(args.socket, args.host, args.port))
+  except (KeyboardInterrupt, asyncio.CancelledError):
+    pass
+  return 0
+
+if __name__ == "__main__":
+  sys.exit(main())
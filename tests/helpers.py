@@ -0,0 +1,84 @@
+# shared by the tests: writing synthetic .pod files, converting them, and reading the .glb files back
+import sys
+from os import path
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+import io
+import json
+from struct import unpack
+import numpy as np
+
+from bench.PODWriter import WriteSyntheticPOD
+from extract import convert
+
+ComponentTypes = {5120: "i1", 5121: "u1", 5122: "<i2", 5123: "<u2", 5125: "<u4", 5126: "<f4"}
+AccessorSizes = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4, "MAT4": 16}
+
+def writePOD(directory, name="model.pod", **options):
+  # options are WriteSyntheticPOD's, with a smaller model by default
+  podPath = path.join(str(directory), name)
+  WriteSyntheticPOD(podPath, **dict({"numMeshes": 2, "numVertices": 64}, **options))
+  return podPath
+
+def readGLB(data):
+  # returns (gltf, bin chunk)
+  (magic, version, length) = unpack("<III", data[0:12])
+  assert (magic, version, length) == (0x46546C67, 2, len(data))
+  (jsonLength, jsonType) = unpack("<II", data[12:20])
+  gltf = json.loads(data[20:20 + jsonLength])
+  binChunk = b""
+  if 20 + jsonLength < len(data):
+    (binLength, binType) = unpack("<II", data[20 + jsonLength:28 + jsonLength])
+    binChunk = data[28 + jsonLength:28 + jsonLength + binLength]
+  return (gltf, binChunk)
+
+def convertGLB(source, **options):
+  # converts a .pod path or contents with extract.convert, returning (gltf, bin chunk) of the .glb
+  f = io.BytesIO()
+  convert(source, f, **options)
+  return readGLB(f.getvalue())
+
+def readAccessor(gltf, binChunk, accessorIndex):
+  # (count, components) array of an uncompressed accessor, in its own component type
+  accessor = gltf["accessors"][accessorIndex]
+  bufferView = gltf["bufferViews"][accessor["bufferView"]]
+  dtype = np.dtype(ComponentTypes[accessor["componentType"]])
+  numComponents = AccessorSizes[accessor["type"]]
+  stride = bufferView.get("byteStride", dtype.itemsize * numComponents)
+  return np.ndarray(
+    shape=(accessor["count"], numComponents),
+    dtype=dtype,
+    buffer=binChunk,
+    offset=bufferView.get("byteOffset", 0) + accessor.get("byteOffset", 0),
+    strides=(stride, dtype.itemsize),
+  ).copy()
+
+def getNodeMatrix(node):
+  # column vector matrix of a node's transform
+  if "matrix" in node:
+    return np.array(node["matrix"], dtype=np.float64).reshape(4, 4).T
+  (x, y, z, w) = node.get("rotation", [0, 0, 0, 1])
+  rotation = np.array([
+    [1 - 2 * (y * y + z * z), 2 * (x * y - z * w), 2 * (x * z + y * w)],
+    [2 * (x * y + z * w), 1 - 2 * (x * x + z * z), 2 * (y * z - x * w)],
+    [2 * (x * z - y * w), 2 * (y * z + x * w), 1 - 2 * (x * x + y * y)],
+  ])
+  matrix = np.identity(4)
+  matrix[0:3, 0:3] = rotation * np.array(node.get("scale", [1, 1, 1]))
+  matrix[0:3, 3] = node.get("translation", [0, 0, 0])
+  return matrix
+
+def getMeshPositions(gltf, binChunk, nodeIndex):
+  # positions of a node's mesh in the node's space, dequantized by the mesh's own child node if it has one
+  node = gltf["nodes"][nodeIndex]
+  transform = np.identity(4)
+  if "mesh" not in node:
+    meshNodes = [child for child in node["children"] if "mesh" in gltf["nodes"][child] and gltf["nodes"][child]["name"] == node["name"]]
+    node = gltf["nodes"][meshNodes[0]]
+    transform = getNodeMatrix(node)
+  accessorIndex = gltf["meshes"][node["mesh"]]["primitives"][0]["attributes"]["POSITION"]
+  accessor = gltf["accessors"][accessorIndex]
+  positions = readAccessor(gltf, binChunk, accessorIndex).astype(np.float64)
+  if accessor.get("normalized"):
+    positions /= np.iinfo(ComponentTypes[accessor["componentType"]]).max
+  return positions @ transform[0:3, 0:3].T + transform[0:3, 3]
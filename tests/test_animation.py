@@ -0,0 +1,66 @@
+# node animation of the synthetic models, which bob up and down while turning around y, exported as a glTF animation
+#   python3 -m pytest -q tests
+import numpy as np
+import pytest
+
+from helpers import writePOD, convertGLB, readAccessor, getNodeMatrix
+
+def getExpectedFrames(numFrames, position):
+  angles = np.arange(numFrames) / numFrames * np.pi
+  positions = np.tile(np.asarray(position, dtype=np.float64), (numFrames, 1))
+  positions[:, 1] += np.sin(angles)
+  rotations = np.zeros((numFrames, 4))
+  rotations[:, 1] = np.sin(angles / 2)
+  rotations[:, 3] = np.cos(angles / 2)
+  return (positions, rotations)
+
+def getChannels(gltf, binChunk):
+  # {(node, path): (times, values)}
+  (animation,) = gltf["animations"]
+  channels = {}
+  for channel in animation["channels"]:
+    sampler = animation["samplers"][channel["sampler"]]
+    assert sampler["interpolation"] == "LINEAR"
+    key = (channel["target"]["node"], channel["target"]["path"])
+    channels[key] = (readAccessor(gltf, binChunk, sampler["input"]).reshape(-1), readAccessor(gltf, binChunk, sampler["output"]))
+  return channels
+
+def test_keyframes(tmp_path):
+  numFrames = 6
+  (gltf, binChunk) = convertGLB(writePOD(tmp_path, numMeshes=2, nodeDepth=2, numFrames=numFrames))
+  channels = getChannels(gltf, binChunk)
+  # translation and rotation for each of the four nodes, and no scale channels as the scales aren't animated
+  assert sorted(channels) == sorted((nodeIndex, path) for nodeIndex in range(4) for path in ("translation", "rotation"))
+  # the mesh nodes come first, then the chains above them, whose first node is offset along x by its mesh index
+  positions = [(0, 0, 0), (0, 0, 0), (0, 0, 0), (1, 0, 0)]
+  for nodeIndex in range(4):
+    (expectedTranslations, expectedRotations) = getExpectedFrames(numFrames, positions[nodeIndex])
+    (times, translations) = channels[(nodeIndex, "translation")]
+    assert np.allclose(times, np.arange(numFrames) / 30)
+    assert np.allclose(translations, expectedTranslations, atol=1e-6)
+    (times, rotations) = channels[(nodeIndex, "rotation")]
+    assert np.allclose(rotations, expectedRotations, atol=1e-6)
+    # the rest pose is the first frame
+    assert np.allclose(gltf["nodes"][nodeIndex]["translation"], expectedTranslations[0])
+    assert np.allclose(gltf["nodes"][nodeIndex]["rotation"], expectedRotations[0])
+  # channels with as many keyframes share their time input
+  animation = gltf["animations"][0]
+  assert len({sampler["input"] for sampler in animation["samplers"]}) == 1
+  assert gltf["accessors"][animation["samplers"][0]["input"]]["max"] == [pytest.approx((numFrames - 1) / 30)]
+
+def test_still(tmp_path):
+  (gltf, binChunk) = convertGLB(writePOD(tmp_path, numFrames=1))
+  assert "animations" not in gltf
+
+def test_axis_swap(tmp_path):
+  # z-up to y-up, which mirrors, turns every keyframe L into B L B^T
+  basis = np.array([[1, 0, 0], [0, 0, 1], [0, -1, 0]], dtype=np.float64)
+  numFrames = 4
+  (gltf, binChunk) = convertGLB(writePOD(tmp_path, numMeshes=1, numFrames=numFrames), axis_order=(0, 2, 1), axis_signs=(1, 1, -1))
+  channels = getChannels(gltf, binChunk)
+  (expectedTranslations, expectedRotations) = getExpectedFrames(numFrames, (0, 0, 0))
+  assert np.allclose(channels[(0, "translation")][1], expectedTranslations @ basis.T, atol=1e-6)
+  for (rotation, expected) in zip(channels[(0, "rotation")][1], expectedRotations):
+    matrix = getNodeMatrix({"rotation": rotation.tolist()})[0:3, 0:3]
+    expectedMatrix = getNodeMatrix({"rotation": expected.tolist()})[0:3, 0:3]
+    assert np.allclose(matrix, basis @ expectedMatrix @ basis.T, atol=1e-6)
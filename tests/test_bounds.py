@@ -0,0 +1,41 @@
+# position accessor bounds against the node bounds written into the extras
+#   python3 -m pytest -q tests
+import itertools
+import numpy as np
+import pytest
+
+from helpers import writePOD, convertGLB, getNodeMatrix, readAccessor, ComponentTypes
+
+def getAccessorBox(gltf, nodeIndex):
+  # the node's position accessor bounds, dequantized and moved into the node's space like getMeshPositions
+  node = gltf["nodes"][nodeIndex]
+  transform = np.identity(4)
+  if "mesh" not in node:
+    node = gltf["nodes"][[child for child in node["children"] if "mesh" in gltf["nodes"][child]][0]]
+    transform = getNodeMatrix(node)
+  accessor = gltf["accessors"][gltf["meshes"][node["mesh"]]["primitives"][0]["attributes"]["POSITION"]]
+  bounds = np.array([accessor["min"], accessor["max"]], dtype=np.float64)
+  if accessor.get("normalized"):
+    bounds /= np.iinfo(ComponentTypes[accessor["componentType"]]).max
+  corners = np.array([[bounds[index, axis] for (axis, index) in enumerate(corner)] for corner in itertools.product((0, 1), repeat=3)])
+  corners = corners @ transform[0:3, 0:3].T + transform[0:3, 3]
+  return np.stack((corners.min(axis=0), corners.max(axis=0)))
+
+@pytest.mark.parametrize("quantizedPositions", (False, True))
+@pytest.mark.parametrize("quantize", (False, True))
+def test_accessor_bounds(tmp_path, quantizedPositions, quantize):
+  (gltf, binChunk) = convertGLB(writePOD(tmp_path, quantizedPositions=quantizedPositions), quantize=quantize)
+  for nodeIndex in range(2):
+    node = gltf["nodes"][nodeIndex]
+    meshIndex = node["mesh"] if "mesh" in node else gltf["nodes"][node["children"][-1]]["mesh"]
+    accessorIndex = gltf["meshes"][meshIndex]["primitives"][0]["attributes"]["POSITION"]
+    accessor = gltf["accessors"][accessorIndex]
+    # the bounds are exactly those of the accessor's own values, in its component type
+    positions = readAccessor(gltf, binChunk, accessorIndex)
+    assert accessor["min"] == positions.min(axis=0).tolist()
+    assert accessor["max"] == positions.max(axis=0).tolist()
+    if accessor["componentType"] != 5126:
+      assert all(isinstance(value, int) for value in accessor["min"] + accessor["max"])
+    # mesh nodes have identity transforms, so their world space bounds are the mesh's
+    extras = node["extras"]["bounds"]
+    assert np.allclose(getAccessorBox(gltf, nodeIndex), [extras["min"], extras["max"]], atol=1e-3)
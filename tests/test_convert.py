@@ -0,0 +1,66 @@
+# round trips of synthetic .pod files from bench/PODWriter through the converter
+#   python3 -m pytest -q tests
+import json
+import numpy as np
+
+from helpers import writePOD, convertGLB, getMeshPositions
+from extract import main
+
+def test_quantized_positions(tmp_path):
+  # positions stored as shorts keep their component type, and are dequantized by the unpack matrix on a child node
+  floatGLB = convertGLB(writePOD(tmp_path, "float.pod"))
+  (gltf, binChunk) = convertGLB(writePOD(tmp_path, "short.pod", quantizedPositions=True))
+  assert "KHR_mesh_quantization" in gltf["extensionsRequired"]
+  for meshIndex in range(2):
+    mesh = gltf["meshes"][meshIndex]["primitives"][0]["attributes"]
+    assert gltf["accessors"][mesh["POSITION"]]["componentType"] == 5122
+    assert "normalized" not in gltf["accessors"][mesh["POSITION"]]
+    assert gltf["accessors"][mesh["NORMAL"]]["componentType"] == 5126
+    meshNodes = [node for node in gltf["nodes"] if node.get("mesh") == meshIndex]
+    assert len(meshNodes) == 1 and "matrix" in meshNodes[0]
+    expected = getMeshPositions(*floatGLB, meshIndex)
+    assert np.allclose(getMeshPositions(gltf, binChunk, meshIndex), expected, atol=1e-3)
+
+def test_float_positions(tmp_path):
+  # without any integer attributes there's nothing for KHR_mesh_quantization to do
+  (gltf, binChunk) = convertGLB(writePOD(tmp_path))
+  assert "KHR_mesh_quantization" not in gltf.get("extensionsUsed", [])
+  for mesh in gltf["meshes"]:
+    for accessorIndex in mesh["primitives"][0]["attributes"].values():
+      assert gltf["accessors"][accessorIndex]["componentType"] == 5126
+
+def test_quantize(tmp_path):
+  # --quantize quantizes float positions, and keeps the ones the pod already stores as shorts
+  for quantizedPositions in (False, True):
+    podPath = writePOD(tmp_path, quantizedPositions=quantizedPositions)
+    expected = getMeshPositions(*convertGLB(podPath), 0)
+    (gltf, binChunk) = convertGLB(podPath, quantize=True)
+    assert "KHR_mesh_quantization" in gltf["extensionsRequired"]
+    assert np.allclose(getMeshPositions(gltf, binChunk, 0), expected, atol=1e-3)
+
+def test_quantized_axis_swap(tmp_path):
+  # z-up to y-up, which mirrors, goes into the unpack matrix of positions stored as shorts
+  options = {"axis_order": (0, 2, 1), "axis_signs": (1, 1, -1)}
+  expected = getMeshPositions(*convertGLB(writePOD(tmp_path, "float.pod"), **options), 0)
+  (gltf, binChunk) = convertGLB(writePOD(tmp_path, "short.pod", quantizedPositions=True), **options)
+  assert np.allclose(getMeshPositions(gltf, binChunk, 0), expected, atol=1e-3)
+  assert not np.allclose(expected, getMeshPositions(*convertGLB(tmp_path / "float.pod"), 0))
+
+def test_profile_stdout(tmp_path, capsys):
+  # with the profile going to stdout, mesh stats go to stderr so that stdout is only json
+  podPath = writePOD(tmp_path)
+  assert main([podPath, str(tmp_path / "out.glb"), "--optimize", "--vertex-layout", "interleaved", "--profile", "-"]) == 0
+  (out, err) = capsys.readouterr()
+  assert json.loads(out)["input"] == podPath
+  assert "ACMR" in err
+
+def test_batch_textures(tmp_path, capsys):
+  # each model's textures are read from its own directory and converted next to its .glb file
+  for name in ("a", "b"):
+    (tmp_path / "in" / name).mkdir(parents=True)
+    writePOD(tmp_path / "in" / name, numTextures=1, textureSize=4)
+  assert main(["--batch", str(tmp_path / "in"), str(tmp_path / "out"), "-j", "1"]) == 0
+  for name in ("a", "b"):
+    assert (tmp_path / "out" / name / "model.glb").is_file()
+    assert (tmp_path / "out" / name / "texture0.png").is_file()
+    assert not (tmp_path / "in" / name / "texture0.png").exists()
@@ -0,0 +1,57 @@
+# deduplication of identical data and items in GLBExporter, and in the glb files the converter writes
+#   python3 -m pytest -q tests
+import io
+import numpy as np
+import pytest
+
+from helpers import writePOD, convertGLB, readGLB, readAccessor
+from GLB.GLBExporter import GLBExporter
+
+def writeGLB(glb):
+  f = io.BytesIO()
+  glb.write(f)
+  return readGLB(f.getvalue())
+
+@pytest.mark.parametrize("dedupe", (False, True))
+def test_exporter(dedupe):
+  glb = GLBExporter(dedupe=dedupe)
+  indices = np.arange(6, dtype=np.uint16)
+  first = glb.addBufferViewData(indices, target=34963)
+  assert (glb.addBufferViewData(indices.copy(), target=34963) == first) == dedupe
+  # the same data in a view with different settings only stores the data once
+  other = glb.addBufferViewData(indices, byteStride=4, target=34962)
+  assert other != first
+  assert (glb.bufferViews[other]["byteOffset"] == glb.bufferViews[first]["byteOffset"]) == dedupe
+  accessor = {"bufferView": first, "componentType": 5123, "count": 6, "type": "SCALAR"}
+  assert (glb.addAccessor(dict(accessor)) == glb.addAccessor(dict(accessor))) == dedupe
+  assert glb.addAccessor(dict(accessor, count=3)) != glb.addAccessor(dict(accessor))
+  assert (glb.addImage({"uri": "a.png"}) == glb.addImage({"uri": "a.png"})) == dedupe
+  assert glb.addImage({"uri": "a.png"}) != glb.addImage({"uri": "b.png"})
+  assert (glb.addSampler({"magFilter": 9729}) == glb.addSampler({"magFilter": 9729})) == dedupe
+  (gltf, binChunk) = writeGLB(glb)
+  assert len(binChunk) == (12 if dedupe else 36)
+  assert readAccessor(gltf, binChunk, 0).reshape(-1).tolist() == list(range(6))
+
+def test_compressed():
+  pytest.importorskip("meshoptimizer")
+  glb = GLBExporter(compress=True)
+  indices = np.arange(300, dtype=np.uint16)
+  first = glb.addBufferViewData(indices, target=34963)
+  assert glb.addBufferViewData(indices.copy(), target=34963) == first
+  assert glb.addBufferViewData(indices[::-1].copy(), target=34963) != first
+  assert len(glb.bufferViews) == 2
+
+def test_convert(tmp_path):
+  # the synthetic meshes are grids of the same size, so they share their index data, and every texture has the same sampler
+  (gltf, binChunk) = convertGLB(writePOD(tmp_path, numMeshes=3, numTextures=2, textureSize=4), texture_dir=str(tmp_path))
+  indexAccessors = [mesh["primitives"][0]["indices"] for mesh in gltf["meshes"]]
+  assert len(set(indexAccessors)) == 1
+  assert len(gltf["samplers"]) == 1 and len(gltf["images"]) == 2
+  # vertex data differs, so it isn't shared
+  positionAccessors = [mesh["primitives"][0]["attributes"]["POSITION"] for mesh in gltf["meshes"]]
+  assert len({gltf["accessors"][index]["bufferView"] for index in positionAccessors}) == 3
+  views = [(view["byteOffset"], view["byteLength"]) for view in gltf["bufferViews"]]
+  assert len(set(views)) == len(views)
+  # and the shared indices still decode to every mesh's triangles
+  indices = readAccessor(gltf, binChunk, indexAccessors[0]).reshape(-1)
+  assert len(indices) == 3 * 98 and indices.max() < gltf["accessors"][positionAccessors[0]]["count"]
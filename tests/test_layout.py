@@ -0,0 +1,47 @@
+# repacking vertex data with PVRVertexLayout, through the converter's vertex_layout and drop_attributes options
+#   python3 -m pytest -q tests
+import io
+import numpy as np
+import pytest
+
+from helpers import writePOD, readGLB, readAccessor
+from extract import convert
+
+def convertWithStats(podPath, **options):
+  f = io.BytesIO()
+  converter = convert(podPath, f, **options)
+  return (readGLB(f.getvalue()), converter.mesh_stats)
+
+def readAttributes(gltf, binChunk, meshIndex):
+  attributes = gltf["meshes"][meshIndex]["primitives"][0]["attributes"]
+  return {name: readAccessor(gltf, binChunk, attributes[name]) for name in attributes}
+
+@pytest.mark.parametrize("layout", ("interleaved", "streams"))
+def test_repacked_attributes(tmp_path, layout):
+  podPath = writePOD(tmp_path)
+  (expected, stats) = convertWithStats(podPath)
+  assert stats == {}
+  ((gltf, binChunk), stats) = convertWithStats(podPath, vertex_layout=layout)
+  for meshIndex in range(2):
+    attributes = readAttributes(gltf, binChunk, meshIndex)
+    for (name, values) in readAttributes(*expected, meshIndex).items():
+      assert (attributes[name] == values).all()
+    # position, normal and uv floats, with nothing to drop
+    assert stats[meshIndex]["layout"] == {"numVertices": 64, "bytesBefore": 64 * 32, "dropped": [], "bytesAfter": 64 * 32}
+  views = {gltf["accessors"][index]["bufferView"] for index in gltf["meshes"][0]["primitives"][0]["attributes"].values()}
+  assert len(views) == (1 if layout == "interleaved" else 3)
+  assert all(gltf["bufferViews"][view]["byteStride"] % 4 == 0 for view in views)
+
+def test_drop_attributes(tmp_path):
+  podPath = writePOD(tmp_path)
+  ((gltf, binChunk), stats) = convertWithStats(podPath, drop_attributes=("NORMAL",))
+  assert set(gltf["meshes"][0]["primitives"][0]["attributes"]) == {"POSITION", "TEXCOORD_0"}
+  assert stats[0]["layout"] == {"numVertices": 64, "bytesBefore": 64 * 32, "dropped": ["NORMAL"], "bytesAfter": 64 * 20}
+
+def test_quantized_stats(tmp_path):
+  # quantized attributes are packed into a new buffer, whose size is what the stats report
+  podPath = writePOD(tmp_path)
+  ((gltf, binChunk), stats) = convertWithStats(podPath, quantize=True, drop_attributes=("NORMAL",))
+  assert set(gltf["meshes"][0]["primitives"][0]["attributes"]) == {"POSITION", "TEXCOORD_0"}
+  # four shorts of position and two of uvs
+  assert stats[0]["layout"] == {"numVertices": 64, "bytesBefore": 64 * 32, "dropped": ["NORMAL"], "bytesAfter": 64 * 12}
@@ -0,0 +1,113 @@
+# reading synthetic .pod files from bench/PODWriter with the loader's different modes
+#   python3 -m pytest -q tests
+import io
+import numpy as np
+import pytest
+
+from helpers import writePOD
+from bench.PODWriter import PODWriter, WriteMesh
+from PowerVR.EPOD import EPODDefines, EPODIdentifiers
+from PowerVR.PVRPODLoader import PVRPODLoader, PVRPODFormatError
+
+def readScene(data, mode):
+  if mode == "streaming":
+    pod = PVRPODLoader(io.BytesIO(data), streaming=True)
+    return list(pod.ReadItems())
+  pod = PVRPODLoader(io.BytesIO(data), lazy=mode == "lazy")
+  # lazy scenes only read their blocks once they're used
+  return [mesh.primitiveData for mesh in pod.scene.meshes] + [node.name for node in pod.scene.nodes]
+
+@pytest.mark.parametrize("mode", ("eager", "lazy", "streaming"))
+def test_truncated(tmp_path, mode):
+  with open(writePOD(tmp_path), "rb") as f:
+    data = f.read()
+  readScene(data, mode)
+  # cut in the middle of a payload, in the middle of a tag, and just before the scene's end tag
+  for end in (len(data) // 2, len(data) - 4, len(data) - 8):
+    with pytest.raises(PVRPODFormatError):
+      readScene(data[:end], mode)
+  with pytest.raises(PVRPODFormatError):
+    readScene(b"not a pod file", mode)
+
+def getMeshData(mesh):
+  return (dict(mesh.primitiveData, stripLengths=None), mesh.vertexElements, [bytes(data) for data in mesh.vertexElementData], bytes(mesh.faces["data"]), list(mesh.unpackMatrix))
+
+def getNodeData(node):
+  animation = node.animation
+  return (node.index, node.name, node.materialIndex, node.parentIndex, animation.flags, list(animation.positions), list(animation.rotations))
+
+@pytest.mark.parametrize("memoryMap", (False, True))
+def test_lazy(tmp_path, memoryMap):
+  # lazy scenes only decode their blocks once they're used, and then match eagerly read ones
+  podPath = writePOD(tmp_path, numMeshes=3, nodeDepth=2, numFrames=3, numTextures=2, textureSize=4, quantizedPositions=True)
+  eager = PVRPODLoader.open(podPath, memoryMap=memoryMap).scene
+  # left open, as the scene's arrays are views into a memory mapped file
+  pod = PVRPODLoader.open(podPath, memoryMap=memoryMap, lazy=True)
+  lazy = pod.scene
+  assert [len(lazy.meshes), len(lazy.nodes), len(lazy.textures), len(lazy.materials)] == [3, 6, 2, 2]
+  assert not any(lazy.meshes.IsLoaded(index) for index in range(3))
+  # out of order, with the stream moved between loads
+  assert getMeshData(lazy.meshes[2]) == getMeshData(eager.meshes[2])
+  assert lazy.meshes.IsLoaded(2) and not lazy.meshes.IsLoaded(0)
+  pod.stream.seek(0)
+  assert [getMeshData(mesh) for mesh in lazy.meshes] == [getMeshData(mesh) for mesh in eager.meshes]
+  assert [getNodeData(node) for node in lazy.nodes[::-1]] == [getNodeData(node) for node in eager.nodes[::-1]]
+  assert [texture.name for texture in lazy.textures] == [texture.name for texture in eager.textures]
+  assert [(material.name, material.diffuseTextureIndex) for material in lazy.materials] == [(material.name, material.diffuseTextureIndex) for material in eager.materials]
+  assert (lazy.meshes[-1] is lazy.meshes[2]) and lazy.meshes[1:] == [lazy.meshes[1], lazy.meshes[2]]
+  with pytest.raises(IndexError):
+    lazy.meshes[3]
+  # the scene graph is built once every node has been read
+  lazy.BuildSceneGraph()
+  assert lazy.nodeParents.tolist() == eager.nodeParents.tolist()
+
+def writeSchemaPOD():
+  # a scene with a mesh, node and material holding tags the synthetic models don't have, and tags no schema knows
+  f = io.BytesIO()
+  writer = PODWriter(f)
+  writer.WriteString(EPODIdentifiers.eFormatVersion, EPODDefines.PODFormatVersion)
+  writer.WriteTag(EPODIdentifiers.eScene)
+  writer.WriteInt(EPODIdentifiers.eSceneNumMeshes, 1)
+  writer.WriteInt(EPODIdentifiers.eSceneUnits, 3)
+  writer.WriteTag(1999, b"unknown scene tag")
+  WriteMesh(writer, 16, np.random.default_rng(0))
+  # bone batches are added to the end of the mesh block
+  f.seek(-8, 1)
+  writer.WriteUInt(EPODIdentifiers.eMeshNumBoneBatches, 2)
+  writer.WriteUInt(EPODIdentifiers.eMeshMaxNumBonesPerBatch, 8)
+  writer.WriteTag(6999, b"unknown mesh tag")
+  writer.WriteEndTag(EPODIdentifiers.eSceneMesh)
+  writer.WriteTag(EPODIdentifiers.eSceneNode)
+  writer.WriteString(EPODIdentifiers.eNodeName, "node")
+  writer.WriteTag(EPODIdentifiers.eNodeUserData, b"user data")
+  writer.WriteEndTag(EPODIdentifiers.eSceneNode)
+  writer.WriteTag(EPODIdentifiers.eSceneMaterial)
+  writer.WriteString(EPODIdentifiers.eMaterialName, "material")
+  writer.WriteFloats(EPODIdentifiers.eMaterialSpecularColour, [0.25, 0.5, 0.75])
+  writer.WriteFloats(EPODIdentifiers.eMaterialShininess, [0.125])
+  writer.WriteFloats(EPODIdentifiers.eMaterialOpacity, [0.5])
+  writer.WriteInt(EPODIdentifiers.eMaterialSpecularColourTextureIndex, 4)
+  writer.WriteUInt(EPODIdentifiers.eMaterialBlendingRGBSrc, 6)
+  writer.WriteEndTag(EPODIdentifiers.eSceneMaterial)
+  writer.WriteEndTag(EPODIdentifiers.eScene)
+  return f.getvalue()
+
+@pytest.mark.parametrize("mode", ("eager", "lazy"))
+def test_schema(mode):
+  scene = PVRPODLoader(io.BytesIO(writeSchemaPOD()), lazy=mode == "lazy").scene
+  assert scene.units == 3
+  mesh = scene.meshes[0]
+  assert mesh.primitiveData["numVertices"] == 16
+  assert set(mesh.vertexElements) == {"POSITION", "NORMAL", "TEXCOORD_0"}
+  # eMeshNumBoneBatches used to be skipped, as its branch tested for eMeshMaxNumBonesPerBatch again
+  assert (mesh.boneBatches["count"], mesh.boneBatches["boneMax"]) == (2, 8)
+  assert (scene.nodes[0].name, scene.nodes[0].userData) == ("node", b"user data")
+  material = scene.materials[0]
+  assert material.name == "material"
+  # eMaterialShininess used to overwrite the specular colour
+  assert list(material.specular) == [0.25, 0.5, 0.75]
+  assert material.shininess == 0.125
+  assert material.opacity == 0.5
+  # eMaterialSpecularColourTextureIndex used to set an attribute PVRMaterial doesn't have
+  assert material.specularTextureIndex == 4
+  assert material.blendSrcRGB == 6
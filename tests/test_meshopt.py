@@ -0,0 +1,66 @@
+# round trips for the meshopt vertex and index codecs
+#   python3 -m pytest -q tests
+import sys
+from os import path
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+import numpy as np
+import pytest
+
+from GLB.GLBMeshopt import encodeVertexBuffer, decodeVertexBuffer, encodeIndexSequence, decodeIndexSequence
+
+def makeVertices(count, stride, seed=0):
+  # smooth data, like real vertex attributes, with a few random bytes mixed in
+  rng = np.random.default_rng(seed)
+  values = np.cumsum(rng.integers(-3, 4, size=(count, stride // 4)), axis=0).astype(np.float32)
+  data = bytearray(values.tobytes())
+  noise = rng.integers(0, len(data), size=len(data) // 16) if data else []
+  for i in noise:
+    data[i] = rng.integers(0, 256)
+  return bytes(data)
+
+@pytest.mark.parametrize("stride", [4, 12, 16, 32, 64, 256])
+@pytest.mark.parametrize("count", [1, 15, 16, 17, 255, 256, 1000])
+def test_vertex_round_trip(stride, count):
+  data = makeVertices(count, stride, seed=stride * count)
+  encoded = encodeVertexBuffer(data, count, stride)
+  assert bytes(decodeVertexBuffer(encoded, count, stride)) == data
+
+def test_vertex_round_trip_constant():
+  # every delta after the first vertex is zero
+  data = bytes(range(24)) * 300
+  encoded = encodeVertexBuffer(data, 300, 24)
+  assert len(encoded) < len(data) // 4
+  assert bytes(decodeVertexBuffer(encoded, 300, 24)) == data
+
+@pytest.mark.parametrize("count", [0, 3, 300, 30000])
+def test_index_round_trip(count):
+  rng = np.random.default_rng(count)
+  indices = rng.integers(0, 70000, size=count).astype(np.uint32)
+  # runs of nearby indices, and the largest ones, for every varint length
+  indices[0:count // 2] = np.arange(count // 2)
+  if count:
+    indices[-1] = 0xFFFFFFFF
+  encoded = encodeIndexSequence(indices)
+  assert bytes(decodeIndexSequence(encoded, count)) == indices.tobytes()
+  # 16 bit indices come from the same encoding
+  indices = indices.astype(np.uint16)
+  encoded = encodeIndexSequence(indices)
+  assert bytes(decodeIndexSequence(encoded, count, indexSize=2)) == indices.tobytes()
+
+@pytest.mark.parametrize("stride", [4, 12, 32])
+def test_vertex_reference_decoder(stride):
+  meshoptimizer = pytest.importorskip("meshoptimizer")
+  data = makeVertices(500, stride, seed=stride)
+  encoded = encodeVertexBuffer(data, 500, stride)
+  assert meshoptimizer.decode_vertex_buffer(500, stride, encoded).tobytes() == data
+  reference = meshoptimizer.encode_vertex_buffer(np.frombuffer(data, dtype=np.uint8).reshape(500, stride))
+  assert bytes(decodeVertexBuffer(reference, 500, stride)) == data
+
+def test_index_reference_decoder():
+  meshoptimizer = pytest.importorskip("meshoptimizer")
+  indices = np.random.default_rng(1).integers(0, 5000, size=3000).astype(np.uint32)
+  encoded = encodeIndexSequence(indices)
+  assert meshoptimizer.decode_index_sequence(3000, 4, encoded).astype(np.uint32).tobytes() == indices.tobytes()
+  reference = meshoptimizer.encode_index_sequence(indices)
+  assert bytes(decodeIndexSequence(reference, 3000)) == indices.tobytes()
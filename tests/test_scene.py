@@ -0,0 +1,77 @@
+# the scene graph index built by PVRModel.BuildSceneGraph, against walking the parent indices one node at a time
+#   python3 -m pytest -q tests
+import numpy as np
+
+from helpers import writePOD, convertGLB
+from PowerVR.PVRPODLoader import PVRPODLoader
+from PowerVR.PVRModel import PVRModel
+from PowerVR.PVRNode import PVRNode
+
+def makeModel(parentIndices):
+  model = PVRModel()
+  for parentIndex in parentIndices:
+    node = PVRNode()
+    node.parentIndex = parentIndex
+    model.nodes.append(node)
+  return model
+
+def getDepth(parents, nodeIndex):
+  # None for nodes that can't reach a root
+  depth = 0
+  seen = set()
+  while parents[nodeIndex] != -1:
+    if nodeIndex in seen:
+      return None
+    seen.add(nodeIndex)
+    nodeIndex = parents[nodeIndex]
+    depth += 1
+  return depth
+
+def checkSceneGraph(model):
+  numNodes = len(model.nodes)
+  parents = [node.parentIndex if 0 <= node.parentIndex < numNodes and node.parentIndex != nodeIndex else -1 for (nodeIndex, node) in enumerate(model.nodes)]
+  model.BuildSceneGraph()
+  assert model.nodeParents.tolist() == parents
+  assert model.GetRootNodes().tolist() == [nodeIndex for nodeIndex in range(numNodes) if parents[nodeIndex] == -1]
+  for nodeIndex in range(numNodes):
+    assert model.GetChildren(nodeIndex).tolist() == [child for child in range(numNodes) if parents[child] == nodeIndex]
+  depths = [getDepth(parents, nodeIndex) for nodeIndex in range(numNodes)]
+  levels = model.GetLevels()
+  for (depth, level) in enumerate(levels):
+    assert sorted(level.tolist()) == [nodeIndex for nodeIndex in range(numNodes) if depths[nodeIndex] == depth]
+  assert model.GetNodeOrder().tolist() == [nodeIndex for level in levels for nodeIndex in level.tolist()]
+
+def test_synthetic(tmp_path):
+  scene = PVRPODLoader.open(writePOD(tmp_path, numMeshes=3, nodeDepth=4)).scene
+  checkSceneGraph(scene)
+  assert len(scene.GetLevels()) == 4
+  # the glb keeps the pod's node indices and hierarchy
+  (gltf, binChunk) = convertGLB(writePOD(tmp_path, numMeshes=3, nodeDepth=4))
+  assert gltf["scenes"][0]["nodes"] == scene.GetRootNodes().tolist()
+  for nodeIndex in range(len(scene.nodes)):
+    assert gltf["nodes"][nodeIndex].get("children", []) == scene.GetChildren(nodeIndex).tolist()
+
+def test_unusual_parents():
+  # out of range and self parents make roots, and nodes in a parent cycle are left out of the node order
+  checkSceneGraph(makeModel([-1, 0, 0, 7, 2, 5, 6, 5, 4, 1]))
+  model = makeModel([3, 2, 1, 0])
+  checkSceneGraph(model)
+  assert model.GetNodeOrder().tolist() == []
+  checkSceneGraph(makeModel([]))
+
+def test_world_matrices(tmp_path):
+  scene = PVRPODLoader.open(writePOD(tmp_path, numMeshes=2, nodeDepth=3, numFrames=4)).scene
+  world = scene.GetWorldMatrices()
+  local = [np.identity(4) for node in scene.nodes]
+  (translations, rotations, scales) = scene.GetRestTransforms()
+  for nodeIndex in range(len(scene.nodes)):
+    # only translations, as the rest pose has no rotation
+    assert (rotations[nodeIndex] == [0, 0, 0, 1]).all() and (scales[nodeIndex] == 1).all()
+    local[nodeIndex][0:3, 3] = translations[nodeIndex]
+  for nodeIndex in range(len(scene.nodes)):
+    expected = local[nodeIndex]
+    parentIndex = scene.nodes[nodeIndex].parentIndex
+    while parentIndex != -1:
+      expected = local[parentIndex] @ expected
+      parentIndex = scene.nodes[parentIndex].parentIndex
+    assert np.allclose(world[nodeIndex], expected)
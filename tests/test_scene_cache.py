@@ -0,0 +1,67 @@
+# the parsed scene cache, against converting straight from the .pod file
+#   python3 -m pytest -q tests
+import io
+import os
+import shutil
+import pytest
+
+from helpers import writePOD
+from extract import convert
+from PowerVR.PVRPODLoader import PVRPODLoader
+from PowerVR.PVRSceneCache import PVRSceneCache
+
+def convertCached(podPath, cacheDir, **options):
+  # returns (glb, cache stats)
+  f = io.BytesIO()
+  converter = convert(podPath, f, scene_cache_dir=str(cacheDir), **options)
+  return (f.getvalue(), converter.scene_cache.getStats())
+
+@pytest.mark.parametrize("options", (
+  {},
+  {"quantize": True},
+  {"use_mmap": True},
+  # changes the vertex data in place, which mustn't reach the cached entry
+  {"axis_order": (0, 2, 1), "axis_signs": (1, 1, -1), "renormalize_normals": True},
+))
+def test_same_glb(tmp_path, options):
+  podPath = writePOD(tmp_path, numMeshes=3, nodeDepth=2, numFrames=3, numTextures=1, textureSize=4, quantizedPositions=True)
+  f = io.BytesIO()
+  convert(podPath, f, texture_dir=str(tmp_path), **options)
+  expected = f.getvalue()
+  for hits in (0, 1, 1):
+    (glb, stats) = convertCached(podPath, tmp_path / "cache", texture_dir=str(tmp_path), **options)
+    assert (stats["hits"], stats["misses"]) == (hits, 1 - hits)
+    assert glb == expected
+
+def test_changed_file(tmp_path):
+  podPath = writePOD(tmp_path)
+  convertCached(podPath, tmp_path / "cache")
+  # a different model at the same path is parsed again
+  writePOD(tmp_path, numMeshes=3)
+  (glb, stats) = convertCached(podPath, tmp_path / "cache")
+  assert stats["misses"] == 1
+  f = io.BytesIO()
+  convert(podPath, f)
+  assert glb == f.getvalue()
+
+def test_broken_entry(tmp_path):
+  podPath = writePOD(tmp_path)
+  cache = PVRSceneCache(str(tmp_path / "cache"))
+  key = cache.getKey(podPath)
+  cache.load(podPath, lambda podPath: PVRPODLoader.open(podPath).scene)
+  with open(cache.getPath(key), "r+b") as f:
+    f.truncate(16)
+  assert cache.get(key) is None
+  # and gets replaced by the next load
+  scene = cache.load(podPath, lambda podPath: PVRPODLoader.open(podPath).scene)
+  assert cache.get(key) is not None
+  assert [mesh.primitiveData["numVertices"] for mesh in scene.meshes] == [64, 64]
+
+def test_hash_key(tmp_path):
+  # with useHash, copies of a file share an entry, while entries are otherwise keyed by path
+  podPath = writePOD(tmp_path)
+  copyPath = str(tmp_path / "copy.pod")
+  shutil.copy(podPath, copyPath)
+  assert PVRSceneCache(str(tmp_path / "cache")).getKey(podPath) != PVRSceneCache(str(tmp_path / "cache")).getKey(copyPath)
+  cache = PVRSceneCache(str(tmp_path / "cache"), useHash=True)
+  assert cache.getKey(podPath) == cache.getKey(copyPath)
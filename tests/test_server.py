@@ -0,0 +1,78 @@
+# status codes of the conversion server, talking http to it over a localhost port
+#   python3 -m pytest -q tests
+import asyncio
+from os import path
+import pytest
+
+from helpers import writePOD, readGLB
+from server import POD2GLBServer
+
+async def request(port, head, body=b""):
+  # returns (status, body) of a raw request
+  (reader, writer) = await asyncio.open_connection("127.0.0.1", port)
+  writer.write(head.encode("latin-1") + b"\r\n\r\n" + body)
+  await writer.drain()
+  response = await reader.read()
+  writer.close()
+  (responseHead, responseBody) = response.split(b"\r\n\r\n", 1)
+  return (int(responseHead.split()[1]), responseBody)
+
+def post(port, target, body=b""):
+  return request(port, "POST %s HTTP/1.1\r\nConnection: close\r\nContent-Length: %d" % (target, len(body)), body)
+
+def run(requests):
+  # runs requests(port) against a server with a single worker, and returns its results
+  async def main():
+    server = POD2GLBServer(workers=1, queue_size=4)
+    await server.start()
+    try:
+      listener = await asyncio.start_server(server.handle_connection, "127.0.0.1", 0)
+      async with listener:
+        return await requests(listener.sockets[0].getsockname()[1])
+    finally:
+      server.stop()
+  return asyncio.run(main())
+
+def test_status_codes(tmp_path):
+  podPath = writePOD(tmp_path, numTextures=1, textureSize=4)
+  with open(podPath, "rb") as f:
+    data = f.read()
+  # the same file with a texture name that goes up a directory
+  escaping = data.replace(b"texture0.pvr", b"../ture0.pvr")
+  async def requests(port):
+    return [
+      await post(port, "/convert", data),
+      await post(port, "/convert?path=%s" % podPath),
+      await post(port, "/convert?quantize=1", data),
+      await post(port, "/convert", data[:len(data) // 2]),
+      await post(port, "/convert", b"not a pod file"),
+      await post(port, "/convert", escaping),
+      await post(port, "/convert"),
+      await post(port, "/convert?path=%s" % path.join(str(tmp_path), "missing.pod")),
+      await post(port, "/convert?quantize=maybe", data),
+      await post(port, "/convert?colour=1", data),
+      await post(port, "/convert?joint_limit=0", data),
+      await post(port, "/missing"),
+      await request(port, "GET /convert HTTP/1.1\r\nConnection: close"),
+      await request(port, "GET /stats HTTP/1.1\r\nConnection: close"),
+      await request(port, "garbage"),
+      await request(port, "POST /convert HTTP/1.1\r\nno colon here"),
+      await request(port, "POST /convert HTTP/1.1\r\nContent-Length: lots"),
+    ]
+  responses = run(requests)
+  assert [status for (status, body) in responses] == [200, 200, 200, 400, 400, 400, 400, 404, 400, 400, 400, 404, 405, 200, 400, 400, 400]
+  for (status, body) in responses[0:3]:
+    readGLB(body)
+
+def test_textures(tmp_path):
+  # textures of a .pod file given by path are converted next to it, and uploaded ones aren't converted anywhere
+  podPath = writePOD(tmp_path, numTextures=1, textureSize=4)
+  with open(podPath, "rb") as f:
+    data = f.read()
+  async def requests(port):
+    return [await post(port, "/convert", data), await post(port, "/convert?path=%s" % podPath)]
+  ((uploadStatus, uploadBody), (pathStatus, pathBody)) = run(requests)
+  assert (uploadStatus, pathStatus) == (200, 200)
+  assert readGLB(uploadBody)[0]["images"] == readGLB(pathBody)[0]["images"] == [{"uri": "texture0.png"}]
+  assert path.isfile(path.join(str(tmp_path), "texture0.png"))
+  assert not path.exists("texture0.png")
@@ -0,0 +1,50 @@
+# joint limits for skinned meshes that get split into parts
+#   python3 -m pytest -q tests
+import sys
+from os import path
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+import numpy as np
+import pytest
+
+from PowerVR.PVRSkin import PVRSkin
+
+def test_triangle_over_limit():
+  # a single triangle whose three vertices use six joints between them
+  triangles = np.array([[0, 1, 2]])
+  nodes = np.array([[10, 11], [12, 13], [14, 10]])
+  weights = np.array([[0.7, 0.3], [0.6, 0.4], [0.9, 0.1]])
+  skin = PVRSkin(jointLimit=3)
+  assert skin.LimitTriangleJoints(triangles, nodes, weights) == 1
+  # joints 14, 10 and 12 have the largest total weights
+  joints = set(nodes[weights > 0].tolist())
+  assert joints == {10, 12, 14}
+  assert (weights[0] == [0.7, 0]).all()
+  assert (weights[1] == [0.6, 0]).all()
+  assert (weights[2] == [0.9, 0.1]).all()
+  groups = skin.GroupTriangles(triangles, np.zeros(1, dtype=np.int64), nodes, weights)
+  assert [group.tolist() for group in groups] == [[0]]
+
+def test_shared_vertices():
+  # the second triangle is already within the limit, and only loses joints through the vertex it shares
+  triangles = np.array([[0, 1, 2], [2, 3, 4]])
+  nodes = np.array([[1, 2], [1, 3], [1, 4], [1, 0], [1, 0]])
+  weights = np.array([[0.8, 0.2], [0.7, 0.3], [0.9, 0.1], [1.0, 0], [1.0, 0]])
+  skin = PVRSkin(jointLimit=2)
+  assert skin.LimitTriangleJoints(triangles, nodes, weights) == 1
+  for corners in triangles:
+    assert len(set(nodes[corners][weights[corners] > 0].tolist())) <= 2
+  # every vertex keeps its strongest joint
+  assert (weights[:, 0] > 0).all()
+
+def test_limit_too_low():
+  # three vertices bound to three different joints can't share two
+  triangles = np.array([[0, 1, 2]])
+  nodes = np.array([[1, 0], [2, 0], [3, 0]])
+  weights = np.array([[1.0, 0], [1.0, 0], [1.0, 0]])
+  with pytest.raises(ValueError, match="joint limit of 2"):
+    PVRSkin(jointLimit=2).LimitTriangleJoints(triangles, nodes, weights)
+
+def test_invalid_limit():
+  with pytest.raises(ValueError):
+    PVRSkin(jointLimit=0)
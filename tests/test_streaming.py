@@ -0,0 +1,40 @@
+# streaming conversion, which reads and converts a mesh at a time, against converting the whole scene at once
+#   python3 -m pytest -q tests
+import io
+import pytest
+
+from helpers import writePOD
+from extract import convert, main
+from PowerVR.PVRPODLoader import PVRPODLoader
+
+@pytest.mark.parametrize("options", (
+  {},
+  {"use_mmap": True},
+  {"quantize": True, "compress": True},
+  {"optimize_meshes": True, "vertex_layout": "streams", "use_strips": True},
+))
+def test_same_glb(tmp_path, options):
+  podPath = writePOD(tmp_path, numMeshes=3, nodeDepth=2, numFrames=4, numTextures=1, textureSize=4)
+  outputs = []
+  for streaming in (False, True):
+    f = io.BytesIO()
+    convert(podPath, f, streaming=streaming, texture_dir=str(tmp_path), **options)
+    outputs.append(f.getvalue())
+  assert outputs[0] == outputs[1]
+
+def test_read_items(tmp_path):
+  podPath = writePOD(tmp_path, numMeshes=3, nodeDepth=2, numTextures=2, textureSize=4)
+  scene = PVRPODLoader.open(podPath).scene
+  with PVRPODLoader.open(podPath, streaming=True) as pod:
+    items = list(pod.ReadItems())
+  for listName in ("meshes", "nodes", "textures", "materials"):
+    streamed = [(index, item) for (name, index, item) in items if name == listName]
+    assert [index for (index, item) in streamed] == list(range(len(getattr(scene, listName))))
+  assert [item.name for (name, index, item) in items if name == "nodes"] == [node.name for node in scene.nodes]
+  assert [item.primitiveData["numVertices"] for (name, index, item) in items if name == "meshes"] == [mesh.primitiveData["numVertices"] for mesh in scene.meshes]
+
+def test_no_scene_cache(tmp_path, capsys):
+  # streamed scenes can't be cached
+  with pytest.raises(SystemExit):
+    main([writePOD(tmp_path), str(tmp_path / "out.glb"), "--stream", "--scene-cache", str(tmp_path / "cache")])
+  assert "--scene-cache" in capsys.readouterr().err
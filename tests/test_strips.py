@@ -0,0 +1,50 @@
+# triangle strips, written by bench/PODWriter as one strip per row of its grid, which covers the same triangles as its list
+#   python3 -m pytest -q tests
+import numpy as np
+import pytest
+
+from helpers import writePOD, convertGLB, readAccessor
+from PowerVR.PVRPODLoader import PVRPODLoader
+
+def getTriangles(indices):
+  # each triangle rotated to start at its smallest index, keeping its winding, in sorted order
+  triangles = np.asarray(indices, dtype=np.int64).reshape(-1, 3)
+  triangles = np.array([np.roll(triangle, -int(np.argmin(triangle))) for triangle in triangles])
+  return sorted(map(tuple, triangles.tolist()))
+
+def getStripTriangles(strip):
+  # the glTF triangle strip rules, one triangle at a time
+  triangles = []
+  for index in range(len(strip) - 2):
+    (a, b, c) = strip[index:index + 3] if index % 2 == 0 else (strip[index + 1], strip[index], strip[index + 2])
+    if a != b and b != c and a != c:
+      triangles += [a, b, c]
+  return getTriangles(triangles)
+
+def test_expand(tmp_path):
+  listMesh = PVRPODLoader.open(writePOD(tmp_path, "list.pod")).scene.meshes[0]
+  stripMesh = PVRPODLoader.open(writePOD(tmp_path, "strips.pod", strips=True)).scene.meshes[0]
+  assert stripMesh.IsStripped() and not listMesh.IsStripped()
+  expected = getTriangles(listMesh.GetTriangleList())
+  assert getTriangles(stripMesh.GetTriangleList()) == expected
+  # stitched into one strip with degenerate triangles, which are the only extra ones
+  assert getStripTriangles(stripMesh.GetTriangleStrip().tolist()) == expected
+
+def test_reverse_winding(tmp_path):
+  mesh = PVRPODLoader.open(writePOD(tmp_path, strips=True)).scene.meshes[0]
+  expected = getTriangles(mesh.GetTriangleList().reshape(-1, 3)[:, [0, 2, 1]])
+  mesh.ReverseWinding()
+  assert getTriangles(mesh.GetTriangleList()) == expected
+
+@pytest.mark.parametrize("useStrips", (False, True))
+def test_convert(tmp_path, useStrips):
+  # the glb gets the stitched strip when asked for strips and it's smaller, and a triangle list otherwise
+  expected = convertGLB(writePOD(tmp_path, "list.pod"))
+  (gltf, binChunk) = convertGLB(writePOD(tmp_path, "strips.pod", strips=True), use_strips=useStrips)
+  for meshIndex in range(2):
+    primitive = gltf["meshes"][meshIndex]["primitives"][0]
+    indices = readAccessor(gltf, binChunk, primitive["indices"]).reshape(-1).tolist()
+    expectedIndices = readAccessor(expected[0], expected[1], expected[0]["meshes"][meshIndex]["primitives"][0]["indices"]).reshape(-1)
+    assert primitive.get("mode", 4) == (5 if useStrips else 4)
+    triangles = getStripTriangles(indices) if useStrips else getTriangles(indices)
+    assert triangles == getTriangles(expectedIndices)
@@ -0,0 +1,142 @@
+# known blocks for the texture decoders, and round trips for the png encoder
+#   python3 -m pytest -q tests
+import sys
+from os import path
+sys.path.insert(0, path.dirname(path.dirname(path.abspath(__file__))))
+
+import zlib
+from struct import pack, unpack
+import numpy as np
+import pytest
+
+from GLB.PNGEncoder import encodePNG, PNG_SIGNATURE
+from PowerVR.PVRTexture import PVRTexture, EPVRTexture
+from PowerVR import PVRTextureDecoder
+
+PixelFormats = EPVRTexture.PixelFormats
+
+def makeTexture(pixelFormat, width, height):
+  texture = PVRTexture()
+  texture.pixelFormatL = pixelFormat
+  texture.width = width
+  texture.height = height
+  return texture
+
+# etc
+
+def etcBlock(high, msb, lsb):
+  return pack(">Q", (high << 32) | (msb << 16) | lsb)
+
+def test_etc1_individual():
+  # r 8/2, g 4/c, b 2/f, tables 0/7, diff 0, flip 0, every index 0 (+small modifier)
+  high = (0x82 << 24) | (0x4C << 16) | (0x2F << 8) | (0 << 5) | (7 << 2)
+  pixels = PVRTextureDecoder.Decode(makeTexture(PixelFormats.ETC1, 4, 4), etcBlock(high, 0, 0))
+  assert pixels.shape == (4, 4, 4)
+  # the left half is 0x88, 0x44, 0x22 + 2, the right half 0x22, 0xcc, 0xff + 47, clamped
+  assert (pixels[:, 0:2] == [0x8A, 0x46, 0x24, 255]).all()
+  assert (pixels[:, 2:4] == [0x51, 0xFB, 0xFF, 255]).all()
+
+def differentialBlock(flags):
+  # r 16 + 1, g 10 - 2, b 31 + 0, tables 3/1, flip 1
+  return (((16 << 3) | 1) << 24) | (((10 << 3) | 6) << 16) | ((31 << 3) << 8) | (3 << 5) | (1 << 2) | flags | 1
+
+def test_etc1_differential():
+  # the top half uses index 1 (+big), the bottom half index 3 (-big)
+  data = etcBlock(differentialBlock(2), 0xCCCC, 0xFFFF)
+  pixels = PVRTextureDecoder.Decode(makeTexture(PixelFormats.ETC1, 4, 4), data)
+  # base colours are 132, 82, 255 and 140, 66, 255, with table 3 at +42 and table 1 at -17
+  assert (pixels[0:2] == [174, 124, 255, 255]).all()
+  assert (pixels[2:4] == [123, 49, 238, 255]).all()
+
+def test_etc_partial_blocks():
+  # a 6x5 texture is stored as 2x2 blocks and cropped
+  data = etcBlock(differentialBlock(2), 0xCCCC, 0xFFFF) * 4
+  pixels = PVRTextureDecoder.Decode(makeTexture(PixelFormats.ETC2_RGB, 6, 5), data)
+  assert pixels.shape == (5, 6, 4)
+  assert (pixels[4] == [174, 124, 255, 255]).all()
+
+def test_etc2_punch_through():
+  # without the opaque bit, index 1 keeps its modifier and index 2 is transparent black
+  data = etcBlock(differentialBlock(0), 0xCCCC, 0x3333)
+  pixels = PVRTextureDecoder.Decode(makeTexture(PixelFormats.ETC2_RGB_A1, 4, 4), data)
+  assert (pixels[0:2] == [174, 124, 255, 255]).all()
+  assert (pixels[2:4] == [0, 0, 0, 0]).all()
+
+def test_eac_alpha():
+  # base 128, multiplier 2, table 0: index 3 is -15 and index 7 is +14
+  indices = 0
+  for p in range(16):
+    indices |= (3 if p < 8 else 7) << (45 - 3 * p)
+  alphaBlock = pack(">Q", (128 << 56) | (2 << 52) | (0 << 48) | indices)
+  data = alphaBlock + etcBlock(differentialBlock(2), 0xCCCC, 0xFFFF)
+  pixels = PVRTextureDecoder.Decode(makeTexture(PixelFormats.ETC2_RGBA, 4, 4), data)
+  # pixels are numbered down columns, so the first 8 are the left half
+  assert (pixels[:, 0:2, 3] == 98).all()
+  assert (pixels[:, 2:4, 3] == 156).all()
+  assert (pixels[0:2, :, 0:3] == [174, 124, 255]).all()
+
+# pvrtc
+
+# opaque colour a is 31, 0, 10 (4 bit blue), colour b is 0, 31, 16
+PVRTCColours = (1 << 31) | (31 << 21) | (16 << 16) | (1 << 15) | (31 << 10) | (10 << 1)
+
+@pytest.mark.parametrize("pixelFormat", [PixelFormats.PVRTCI_4bpp_RGB, PixelFormats.PVRTCI_4bpp_RGBA])
+@pytest.mark.parametrize(("modulation", "mode", "expected"), [
+  (0x00000000, 0, [255, 0, 173, 255]),
+  (0xFFFFFFFF, 0, [0, 255, 132, 255]),
+  # punch-through mode, where index 2 is halfway and transparent
+  (0xAAAAAAAA, 1, [127, 127, 152, 0]),
+])
+def test_pvrtc_4bpp_uniform(pixelFormat, modulation, mode, expected):
+  # every block is the same, so the upscaled colours are too
+  data = pack("<II", modulation, PVRTCColours | mode) * 4
+  pixels = PVRTextureDecoder.Decode(makeTexture(pixelFormat, 8, 8), data)
+  assert pixels.shape == (8, 8, 4)
+  assert (pixels == expected).all()
+
+@pytest.mark.parametrize(("modulation", "expected"), [
+  (0x00000000, [255, 0, 173, 255]),
+  (0xFFFFFFFF, [0, 255, 132, 255]),
+])
+def test_pvrtc_2bpp_direct(modulation, expected):
+  data = pack("<II", modulation, PVRTCColours) * 4
+  pixels = PVRTextureDecoder.Decode(makeTexture(PixelFormats.PVRTCI_2bpp_RGB, 16, 8), data)
+  assert pixels.shape == (8, 16, 4)
+  assert (pixels == expected).all()
+
+# png
+
+def readPNG(data):
+  # just enough of a decoder for what encodePNG writes: one IDAT chunk, 8-bit RGBA, sub filtered rows
+  assert data[0:8] == PNG_SIGNATURE
+  offset = 8
+  chunks = []
+  while offset < len(data):
+    (length,) = unpack(">I", data[offset:offset + 4])
+    kind = data[offset + 4:offset + 8]
+    body = data[offset + 8:offset + 8 + length]
+    (crc,) = unpack(">I", data[offset + 8 + length:offset + 12 + length])
+    assert crc == zlib.crc32(kind + body) & 0xFFFFFFFF
+    chunks.append((kind, body))
+    offset += 12 + length
+  assert [kind for (kind, body) in chunks] == [b'IHDR', b'IDAT', b'IEND']
+  (width, height, depth, colourType, compression, filterMethod, interlace) = unpack(">IIBBBBB", chunks[0][1])
+  assert (depth, colourType, compression, filterMethod, interlace) == (8, 6, 0, 0, 0)
+  rows = np.frombuffer(zlib.decompress(chunks[1][1]), dtype=np.uint8).reshape(height, width * 4 + 1)
+  assert (rows[:, 0] == 1).all()
+  return np.cumsum(rows[:, 1:].reshape(height, width, 4), axis=1, dtype=np.uint8)
+
+@pytest.mark.parametrize(("width", "height"), [(1, 1), (5, 7), (64, 3)])
+def test_png_round_trip(width, height):
+  pixels = np.random.default_rng(width * height).integers(0, 256, size=(height, width, 4), dtype=np.uint8)
+  data = encodePNG(pixels)
+  assert (readPNG(data) == pixels).all()
+
+def test_png_reference_decoder(tmp_path):
+  Image = pytest.importorskip("PIL.Image")
+  pixels = np.random.default_rng(2).integers(0, 256, size=(13, 9, 4), dtype=np.uint8)
+  filename = tmp_path / "pixels.png"
+  filename.write_bytes(encodePNG(pixels, level=9))
+  with Image.open(filename) as image:
+    assert image.mode == "RGBA"
+    assert (np.asarray(image) == pixels).all()